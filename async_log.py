@@ -0,0 +1,159 @@
+"""
+异步日志
+====================================
+热键、截图等热路径上的日志调用只做一次入队（deque.append，不加锁、不碰磁盘），
+由后台写线程批量格式化并写入常开的文件句柄：
+  - 攒够 batch 条或每 flush_interval 秒写一次；
+  - 文件超过 max_bytes 时轮转为 .1 / .2 / ...（最多 backups 个），不再整文件读入重写；
+  - 每条记录可带结构化字段（key=value 附在行尾，或 fmt="json" 时整行 JSON）；
+  - 队列满（写盘卡住）时丢弃最旧的记录并计数，绝不阻塞调用方；
+  - flush() 登记一个序号，写线程把登记时已在队列里的记录全部写完后才确认该序号，
+    不会在一批记录刚出队、尚未写盘时提前返回；序号不进队列，队列满时也不会被挤掉。
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+
+
+class AsyncLogger:
+    def __init__(self, path: str, max_bytes: int = 2 * 1024 * 1024, backups: int = 3,
+                 flush_interval: float = 0.5, batch: int = 256, max_queue: int = 10000,
+                 fmt: str = "text"):
+        self.path      = path
+        self.max_bytes = max_bytes
+        self.backups   = max(1, backups)
+        self.interval  = flush_interval
+        self.batch     = batch
+        self.fmt       = fmt
+        self._q        = deque(maxlen=max_queue)
+        self._max_q    = max_queue
+        self._wake     = threading.Event()
+        self._wlock    = threading.Lock()        # 文件句柄（写线程与 clear/close 互斥）
+        self._fcv      = threading.Condition()   # flush 登记 / 确认
+        self._flush_req  = 0                     # 最近一次 flush 登记的序号
+        self._flush_done = 0                     # 写线程已确认写完的序号
+        self._fh       = None
+        self._closed   = False
+        self.dropped   = 0
+        self.written   = 0
+        self._thread   = threading.Thread(target=self._run, daemon=True, name="async-log")
+        self._thread.start()
+
+    # ── 调用方（任意线程） ───────────────────
+    def log(self, msg: str, level: str = "info", **fields):
+        if self._closed:
+            return
+        if len(self._q) >= self._max_q:
+            self.dropped += 1           # deque(maxlen) 会自动挤掉最旧一条
+        self._q.append((time.time(), level, msg, fields))
+        if len(self._q) >= self.batch:
+            self._wake.set()
+
+    def flush(self, timeout: float = 2.0) -> bool:
+        """等待调用前已入队的记录全部落盘（读日志文件前调用）；超时返回 False"""
+        if self._closed:
+            return not self._q
+        with self._fcv:
+            self._flush_req += 1
+            req = self._flush_req
+        self._wake.set()
+        with self._fcv:
+            return self._fcv.wait_for(lambda: self._flush_done >= req, timeout)
+
+    def clear(self):
+        """删除当前日志及所有轮转文件"""
+        self.flush()
+        with self._wlock:
+            self._close_fh()
+            for p in [self.path] + [f"{self.path}.{i}" for i in range(1, self.backups + 1)]:
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+
+    def close(self):
+        self.flush()
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=2)
+        with self._wlock:
+            self._close_fh()
+
+    def stats(self) -> dict:
+        return {"queued": len(self._q), "written": self.written, "dropped": self.dropped}
+
+    # ── 写线程 ───────────────────────────────
+    def _format(self, rec) -> str:
+        ts, level, msg, fields = rec
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)) + f".{int(ts % 1 * 1000):03d}"
+        if self.fmt == "json":
+            return json.dumps(dict(fields, ts=stamp, level=level, msg=msg),
+                              ensure_ascii=False, default=str) + "\n"
+        extra = "".join(f"  {k}={v}" for k, v in fields.items())
+        return f"{stamp} [{level.upper()}] {msg}{extra}\n"
+
+    def _close_fh(self):
+        if self._fh is not None:
+            try:
+                self._fh.close()
+            except Exception:
+                pass
+            self._fh = None
+
+    def _rotate(self):
+        self._close_fh()
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _write(self, lines):
+        with self._wlock:
+            try:
+                if self._fh is None:
+                    self._fh = open(self.path, "a", encoding="utf-8")
+                self._fh.write("".join(lines))
+                self._fh.flush()
+                self.written += len(lines)
+                if self._fh.tell() > self.max_bytes:
+                    self._rotate()
+            except Exception:
+                self._close_fh()        # 下次重新打开；日志失败不影响主程序
+
+    def _confirm(self, req: int):
+        with self._fcv:
+            if req > self._flush_done:
+                self._flush_done = req
+                self._fcv.notify_all()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._fcv:
+                req = self._flush_req
+            # 登记 req 之前入队的记录此刻都在队列前 todo 条里（被挤掉的不用再等）
+            todo = len(self._q)
+            while self._q:
+                lines = []
+                while self._q and len(lines) < self.batch:
+                    try:
+                        rec = self._q.popleft()
+                    except IndexError:
+                        break
+                    todo -= 1
+                    try:
+                        lines.append(self._format(rec))
+                    except Exception:
+                        continue
+                if lines:
+                    self._write(lines)
+                if todo <= 0:
+                    self._confirm(req)
+            self._confirm(req)
+            if self._closed and not self._q:
+                return
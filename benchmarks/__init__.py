@@ -0,0 +1,7 @@
+"""
+离线基准测试（无界面、无网络、可在 Linux 上运行）
+
+    python -m benchmarks.run -o result.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+"""
@@ -0,0 +1,150 @@
+"""
+替身：OCR 引擎与翻译服务
+====================================
+  - FakeWcocr：与 wcocr 模块同接口（init / ocr），按图片路径返回录制好的响应，
+    注入 sys.modules["wcocr"] 后即可在没有微信 OCR 的环境导入 screenshot_tool；
+  - StubTranslateServer：本机 HTTP 服务，按各翻译接口的真实响应格式返回；
+    redirect_https() / redirect_aio() 把程序里写死的 https://<host>/... 请求转发到它，
+    从而完整走一遍 urllib（或 asyncio 流）请求、签名、JSON 解析的代码路径。
+"""
+
+import json
+import os
+import threading
+import time
+import types
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeWcocr(types.ModuleType):
+    """录制响应的 wcocr 替身；未录制的路径返回空结果"""
+
+    def __init__(self):
+        super().__init__("wcocr")
+        self.responses = {}
+        self.calls = 0
+
+    def init(self, exe_path, lib_dir):
+        return True
+
+    def ocr(self, path):
+        self.calls += 1
+        return self.responses.get(os.path.abspath(path), {"ocr_response": []})
+
+    def record(self, path, items, as_bytes: bool = True):
+        """按 wcocr 的原始格式录制一条响应（文字默认为 bytes，与真实引擎一致）"""
+        resp = [{"text": it["text"].encode("utf-8") if as_bytes else it["text"],
+                 "left": float(it["left"]), "top": float(it["top"]),
+                 "right": float(it["right"]), "bottom": float(it["bottom"]),
+                 "rate": 0.98} for it in items]
+        self.responses[os.path.abspath(path)] = {"errcode": 0, "ocr_response": resp}
+
+    def load(self, json_path):
+        """加载录制文件：{图片路径: wcocr.ocr 的原始返回}"""
+        with open(json_path, "r", encoding="utf-8") as f:
+            for k, v in json.load(f).items():
+                self.responses[os.path.abspath(k)] = v
+
+
+def _translate_stub(text: str) -> str:
+    return "".join(reversed(text))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *a):
+        pass
+
+    def _reply(self, obj):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n).decode("utf-8")
+        host = self.path.lstrip("/").split("/", 1)[0]
+        self.server.hits[host] = self.server.hits.get(host, 0) + 1
+        if host.startswith("tmt."):
+            text = json.loads(raw).get("SourceText", "")
+            return self._reply({"Response": {"TargetText": _translate_stub(text), "RequestId": "x"}})
+        form = urllib.parse.parse_qs(raw)
+        if "baidu" in host:
+            text = form.get("query", [""])[0]
+            return self._reply({"data": [{"src": text, "dst": _translate_stub(text)}]})
+        if "youdao" in host:
+            text = form.get("q", [""])[0]
+            return self._reply({"translation": [_translate_stub(text)]})
+        self._reply({})
+
+    def do_GET(self):
+        host, _, rest = self.path.lstrip("/").partition("/")
+        self.server.hits[host] = self.server.hits.get(host, 0) + 1
+        q = urllib.parse.parse_qs(urllib.parse.urlsplit("/" + rest).query)
+        text = q.get("q", [""])[0]
+        self._reply({"responseData": {"translatedText": _translate_stub(text)}})
+
+
+class StubTranslateServer:
+    def __init__(self, latency_ms: float = 0.0):
+        self._srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._srv.latency = latency_ms / 1000.0
+        self._srv.hits = {}
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._srv.server_address[1]
+
+    @property
+    def hits(self) -> dict:
+        return self._srv.hits
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._srv.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._srv.shutdown()
+        self._srv.server_close()
+
+
+def redirect_https(port: int):
+    """全局 urllib：https://host/path → http://127.0.0.1:port/host/path；返回还原函数"""
+
+    class _Redirect(urllib.request.HTTPSHandler):
+        def https_open(self, req):
+            parts = urllib.parse.urlsplit(req.full_url)
+            url = f"http://127.0.0.1:{port}/{parts.netloc}{parts.path or '/'}"
+            if parts.query:
+                url += "?" + parts.query
+            new = urllib.request.Request(url, data=req.data, method=req.get_method(),
+                                         headers=dict(req.header_items()))
+            new.timeout = req.timeout
+            return urllib.request.HTTPHandler().http_open(new)
+
+    old = urllib.request._opener
+    urllib.request.install_opener(urllib.request.build_opener(_Redirect))
+    return lambda: urllib.request.install_opener(old)
+
+
+def redirect_aio(port: int):
+    """wxocr_core.aio 的请求：https://host/path → http://127.0.0.1:port/host/path；返回还原函数"""
+    from wxocr_core import aio
+    old = aio._route
+
+    def _route(url):
+        parts = urllib.parse.urlsplit(url)
+        return "127.0.0.1", port, False, f"/{parts.netloc}{old(url)[3]}"
+
+    aio._route = _route
+    return lambda: setattr(aio, "_route", old)
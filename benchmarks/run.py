@@ -0,0 +1,362 @@
+"""
+基准测试入口
+====================================
+在临时目录下使用 wxocr_core（wcocr 换成录制响应的替身，翻译请求转发到本机替身服务），
+对合成语料逐项计时，输出 JSON；给出 --baseline 时逐项与基线对比，中位数变慢超过阈值即判为退化。
+
+    python -m benchmarks.run [-o result.json] [--baseline base.json] [--threshold 0.15]
+                             [--save-baseline base.json] [--quick] [-k 关键字]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import make_corpus, SIZES       # noqa: E402
+from benchmarks.fakes import FakeWcocr, StubTranslateServer, redirect_https, redirect_aio   # noqa: E402
+
+_BENCHES = []
+
+
+def bench(fn):
+    """注册一个基准：fn(ctx) 返回 [(用例名, 无参可调用)]，抛 ImportError 表示依赖缺失而跳过"""
+    _BENCHES.append(fn)
+    return fn
+
+
+def measure(fn, repeat: int, min_time: float):
+    """预热一次后至少运行 repeat 次且累计不少于 min_time 秒，返回统计（ms）"""
+    fn()
+    times, t_end = [], time.perf_counter() + min_time
+    while len(times) < repeat or time.perf_counter() < t_end:
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+        if len(times) >= repeat * 20:
+            break
+    times.sort()
+    return {"median_ms": round(statistics.median(times), 4),
+            "min_ms":    round(times[0], 4),
+            "mean_ms":   round(statistics.fmean(times), 4),
+            "p90_ms":    round(times[min(len(times) - 1, int(len(times) * 0.9))], 4),
+            "n":         len(times)}
+
+
+# ─────────────────────────────────────────────
+#  运行环境
+# ─────────────────────────────────────────────
+_CONFIG = {
+    "tencent": {"secret_id": "bench-id", "secret_key": "bench-key", "region": "ap-beijing"},
+    "hotkeys": {"translate": "alt+1", "ocr": "alt+2"},
+    "watch": {"interval_ms": 500, "translate": True},
+    "history": {"enabled": True, "max_mb": 200},
+    "executor": {"workers": 3},
+    "tm": {"enabled": False},       # 翻译基准测的是完整请求路径，不让翻译记忆把重复请求挡在本地
+}
+
+
+class Context:
+    def __init__(self, quick: bool):
+        self.tmp = tempfile.mkdtemp(prefix="wxocr_bench_")
+        os.environ["WXOCR_HOME"] = self.tmp     # 可写目录（config.json）指向临时目录
+        self.fake = FakeWcocr()
+        sys.modules["wcocr"] = self.fake
+        import wxocr_core
+        self.core   = wxocr_core
+        self.engine = wxocr_core.WcocrEngine()
+        with open(wxocr_core.paths.config_path(), "w", encoding="utf-8") as f:
+            json.dump(_CONFIG, f, ensure_ascii=False)
+        self.corpus = make_corpus()
+        if quick:
+            self.corpus = [s for s in self.corpus if not s.name.startswith("large")]
+        self.paths = {}
+        for s in self.corpus:
+            p = os.path.join(self.tmp, f"{s.name}.png")
+            s.image.save(p)
+            self.fake.record(p, s.items)
+            self.paths[s.name] = p
+
+    def close(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+
+# ─────────────────────────────────────────────
+#  基准项
+# ─────────────────────────────────────────────
+@bench
+def ocr_parse(ctx):
+    """do_ocr_raw：录制响应 → items（bytes 解码、坐标提取）"""
+    return [(f"ocr_parse/{s.name}", lambda p=ctx.paths[s.name]: ctx.engine.ocr_raw(p))
+            for s in ctx.corpus]
+
+
+@bench
+def layout(ctx):
+    """fit_items：按文字框选字号并折行（固定字宽度量，与字体无关）"""
+    from text_layout import GlyphMetrics, fit_items, REF_PX
+    cjk = lambda ch: REF_PX if ord(ch) > 0x2e80 else REF_PX * 0.55
+    out = []
+    for s in ctx.corpus:
+        def run(s=s):
+            m = GlyphMetrics(cjk, REF_PX * 1.3)     # 每次新建：包含首次量字的开销
+            fit_items(s.items, s.translations, m)
+        out.append((f"layout/{s.name}", run))
+    return out
+
+
+@bench
+def erase(ctx):
+    """erase_text_regions：原文区域用背景色抹除（含一次整图 copy）"""
+    from overlay_render import erase_text_regions
+    return [(f"erase/{s.name}", lambda s=s: erase_text_regions(s.image.copy(), s.items))
+            for s in ctx.corpus]
+
+
+@bench
+def sample_color(ctx):
+    """sample_text_color：逐框估计文字颜色"""
+    from overlay_render import sample_text_color
+    def run(s):
+        for it in s.items:
+            sample_text_color(s.image, it["left"], it["top"], it["right"], it["bottom"])
+    return [(f"sample_color/{s.name}", lambda s=s: run(s)) for s in ctx.corpus]
+
+
+@bench
+def composite(ctx):
+    """选区遮罩：底图准备（缩放 + 压暗）与拖动时每帧的亮显合成，步骤同 SelectionOverlay"""
+    from PIL import Image
+    out = []
+    for s in ctx.corpus:
+        if not s.name.endswith("-normal"):
+            continue
+        full = s.image
+        vw, vh = full.size
+
+        def init(full=full, vw=vw, vh=vh):
+            canvas = full.resize((vw, vh), Image.BILINEAR)
+            return Image.blend(canvas, Image.new("RGB", (vw, vh), (0, 0, 0)), 0.25)
+
+        dim = init()
+
+        def frame(full=full, dim=dim, vw=vw, vh=vh):
+            comp = dim.copy()
+            box = (vw // 8, vh // 8, vw * 5 // 8, vh * 5 // 8)
+            comp.paste(full.crop(box), box[:2])
+            return comp
+
+        size = s.name.split("-")[0]
+        out += [(f"composite_init/{size}", init), (f"composite_frame/{size}", frame)]
+    return out
+
+
+@bench
+def qr_generate(ctx):
+    """qr_gen.render：冷启动（清空缓存）与缓存命中"""
+    import qrcode  # noqa: F401  缺少时跳过
+    import qr_gen
+    texts = ["https://example.com/" + "x" * n for n in (8, 64, 300)]
+
+    def cold():
+        qr_gen.render.cache_clear()
+        qr_gen.qr_matrix.cache_clear()
+        for t in texts:
+            qr_gen.render(t)
+
+    def warm():
+        for t in texts:
+            qr_gen.render(t)
+    return [("qr_generate/cold", cold), ("qr_generate/warm", warm)]
+
+
+@bench
+def config_load(ctx):
+    return [("config_load", ctx.core.load_config)]
+
+
+@bench
+def detect(ctx):
+    """langdetect.plan：逐行文字体系统计 + 拉丁语种打分（翻译前的本地过滤）"""
+    from wxocr_core import langdetect
+    out = []
+    for s in ctx.corpus:
+        if s.name.endswith("-dense"):
+            text = "\n".join([it["text"] for it in s.items] + s.translations)
+            out.append((f"detect/{s.name.split('-')[0]}", lambda text=text: langdetect.plan(text, "zh")))
+    return out
+
+
+@bench
+def glossary(ctx):
+    """glossary：5000 词条的 Aho–Corasick 词库对密集截图逐行整行翻译 / 占位符替换"""
+    from wxocr_core.glossary import Glossary
+    rng = random.Random(0)
+    words = sorted({w.lower() for s in ctx.corpus for it in s.items for w in it["text"].split() if w.isalpha()})
+    pairs = {}
+    while len(pairs) < 5000 and words:
+        n = rng.choice((1, 1, 2, 3))
+        pairs[" ".join(rng.choice(words) for _ in range(n))] = f"词{len(pairs)}"
+    gl = Glossary(pairs)
+    out = []
+    for s in ctx.corpus:
+        if s.name.endswith("-dense"):
+            lines = [it["text"] for it in s.items]
+            out.append((f"glossary/{s.name.split('-')[0]}",
+                        lambda lines=lines: [gl.translate_line(l) or gl.protect(l) for l in lines]))
+    return out
+
+
+@bench
+def tm(ctx):
+    """翻译记忆：10 万条记忆中各 200 次查询（模板精确命中 / 模糊命中 / 未命中）"""
+    from wxocr_core.tm import Memory
+    rng = random.Random(0)
+    words = sorted({w for s in ctx.corpus for it in s.items for w in it["text"].split() if w.isalpha()})
+    mem = Memory()
+    rows = []
+    while len(mem) < 100000:
+        src = " ".join(rng.choice(words) for _ in range(rng.randint(3, 8))) + f" {rng.randint(1, 999)}"
+        if mem.add(src, f"译文{len(rows)} {src.rsplit(' ', 1)[1]}"):
+            rows.append(src)
+    exact = [r.rsplit(" ", 1)[0] + " 1000" for r in rows[:200]]
+    fuzzy = [r.replace("o", "0", 1) for r in rows[200:400]]     # OCR 形近字
+    miss  = [" ".join(rng.choice(words) for _ in range(6)) for _ in range(200)]
+    return [(f"tm/{name}", lambda qs=qs: [mem.lookup(q) for q in qs])
+            for name, qs in (("exact", exact), ("fuzzy", fuzzy), ("miss", miss))]
+
+
+@bench
+def translate(ctx):
+    """do_translate：各引擎对本机替身服务的一次完整请求（签名、编码、HTTP、解析）"""
+    from wxocr_core.translate import _API
+    text = "\n".join(ctx.corpus[0].translations + [it["text"] for it in ctx.corpus[-1].items][:20])
+    srv = StubTranslateServer().__enter__()
+    undo = redirect_https(srv.port)
+    ctx.cleanups.append(lambda: (undo(), srv.__exit__(None, None, None)))
+    return [(f"translate/{eng}",
+             lambda eng=eng: ctx.core.do_translate(text, "zh", engine=eng, cache=False))
+            for eng in ctx.core.ENGINES if eng in _API]
+
+
+@bench
+def translate_async(ctx):
+    """aio.translate：20 行逐行并发请求（asyncio 流 HTTP，每引擎限流）"""
+    import asyncio
+    from wxocr_core import aio
+    lines = [it["text"] for it in ctx.corpus[-1].items][:20]
+    srv = StubTranslateServer().__enter__()
+    undo = redirect_aio(srv.port)
+    ctx.cleanups.append(lambda: (undo(), srv.__exit__(None, None, None)))
+    return [(f"translate_async/{eng}",
+             lambda eng=eng: asyncio.run(aio.translate(lines, "zh", engine=eng, cache=False)))
+            for eng in ("腾讯翻译", "百度翻译")]
+
+
+# ─────────────────────────────────────────────
+#  对比 / 输出
+# ─────────────────────────────────────────────
+def compare(result: dict, baseline: dict, threshold: float):
+    """返回 (报告行, 退化项列表)"""
+    lines, regressions = [], []
+    base = baseline.get("results", {})
+    for name, cur in sorted(result["results"].items()):
+        old = base.get(name)
+        if not old:
+            lines.append(f"{name:<36}{cur['median_ms']:>10.3f}ms   (新增)")
+            continue
+        ratio = cur["median_ms"] / old["median_ms"] if old["median_ms"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  ▲ 退化"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  ▼ 提升"
+        lines.append(f"{name:<36}{cur['median_ms']:>10.3f}ms  基线 {old['median_ms']:>10.3f}ms"
+                     f"  x{ratio:5.2f}{flag}")
+    return lines, regressions
+
+
+def run(quick: bool = False, keyword: str = None):
+    ctx = Context(quick)
+    ctx.cleanups = []
+    repeat, min_time = (5, 0.05) if quick else (20, 0.3)
+    results, skipped = {}, {}
+    try:
+        for b in _BENCHES:
+            try:
+                cases = b(ctx)
+            except ImportError as e:
+                skipped[b.__name__] = f"缺少依赖: {e}"
+                continue
+            for name, fn in cases:
+                if keyword and keyword not in name:
+                    continue
+                try:
+                    results[name] = measure(fn, repeat, min_time)
+                except Exception as e:
+                    skipped[name] = f"{type(e).__name__}: {e}"
+                print(f"  {name:<36}{results.get(name, {}).get('median_ms', float('nan')):>10.3f}ms",
+                      file=sys.stderr)
+    finally:
+        for fn in ctx.cleanups:
+            fn()
+        ctx.close()
+    try:
+        from PIL import __version__ as pil_ver
+    except ImportError:
+        pil_ver = None
+    return {
+        "meta": {"time": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                 "platform": platform.platform(), "pillow": pil_ver, "quick": quick,
+                 "corpus": {k: list(v) for k, v in SIZES.items()}},
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="WeChat OCR 工具离线基准测试")
+    ap.add_argument("-o", "--out", help="结果 JSON 输出路径（默认打印到标准输出）")
+    ap.add_argument("--baseline", help="与该基线 JSON 对比")
+    ap.add_argument("--threshold", type=float, default=0.15, help="判定退化的中位数变慢比例")
+    ap.add_argument("--save-baseline", help="把本次结果另存为基线")
+    ap.add_argument("--quick", action="store_true", help="跳过大图、减少重复次数")
+    ap.add_argument("-k", dest="keyword", help="只运行名称包含该关键字的用例")
+    args = ap.parse_args(argv)
+
+    result = run(args.quick, args.keyword)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif not args.baseline:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+    for name, why in result["skipped"].items():
+        print(f"[跳过] {name}: {why}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            lines, regressions = compare(result, json.load(f), args.threshold)
+        print("\n".join(lines))
+        if regressions:
+            print(f"\n{len(regressions)} 项退化超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
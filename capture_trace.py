@@ -0,0 +1,141 @@
+"""
+截图链路追踪
+====================================
+每次截图带一个 Trace，在各阶段打点（time.perf_counter 单调时钟）：
+  hotkey → overlay_shown → mouse_release → crop_saved → result_shown
+  → ocr_done → translate:<引擎> → first_paint
+TraceBook 保存最近若干条完成的 Trace，并按“距上一阶段的耗时”维护每个阶段的
+滚动直方图（最近 window 个样本），用于回答“慢在哪一步”；export() 导出 JSON Lines。
+
+本模块不依赖 Tk，可在任意线程打点；finish() 之后的打点会被忽略。
+"""
+
+import json
+import time
+import threading
+from collections import deque
+
+# 直方图桶上界（ms），最后一桶为溢出
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+class Trace:
+    __slots__ = ("mode", "t0", "wall", "marks", "info", "status", "_done")
+
+    def __init__(self, mode: str, t0: float = None):
+        self.mode   = mode
+        self.t0     = t0 if t0 is not None else time.perf_counter()
+        self.wall   = time.time() - (time.perf_counter() - self.t0)
+        self.marks  = [("hotkey", self.t0)]
+        self.info   = {}
+        self.status = "ok"
+        self._done  = False
+
+    def mark(self, stage: str, t: float = None, **info):
+        if self._done:
+            return
+        self.marks.append((stage, t if t is not None else time.perf_counter()))
+        if info:
+            self.info[stage] = info
+
+    def stages(self):
+        """[(阶段, 距热键 ms, 距上一阶段 ms)]，按时间排序"""
+        out, prev = [], self.t0
+        for stage, t in sorted(self.marks, key=lambda m: m[1]):
+            out.append((stage, (t - self.t0) * 1000, (t - prev) * 1000))
+            prev = t
+        return out
+
+    def total_ms(self) -> float:
+        return (max(t for _, t in self.marks) - self.t0) * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            "mode":   self.mode,
+            "start":  time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.wall)),
+            "status": self.status,
+            "total_ms": round(self.total_ms(), 2),
+            "stages": [{"stage": s, "at_ms": round(a, 2), "delta_ms": round(d, 2),
+                        **self.info.get(s, {})} for s, a, d in self.stages()],
+        }
+
+
+class RollingHistogram:
+    """最近 window 个样本的直方图与分位数"""
+
+    def __init__(self, window: int = 500):
+        self._vals = deque(maxlen=window)
+
+    def add(self, ms: float):
+        self._vals.append(ms)
+
+    def __len__(self):
+        return len(self._vals)
+
+    def percentile(self, p: float) -> float:
+        if not self._vals:
+            return 0.0
+        vs = sorted(self._vals)
+        return vs[min(len(vs) - 1, int(p / 100 * len(vs)))]
+
+    def buckets(self):
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for v in self._vals:
+            i = 0
+            while i < len(BUCKETS_MS) and v > BUCKETS_MS[i]:
+                i += 1
+            counts[i] += 1
+        return counts
+
+    def summary(self) -> dict:
+        return {"n": len(self._vals), "p50": self.percentile(50),
+                "p90": self.percentile(90), "p99": self.percentile(99),
+                "max": max(self._vals) if self._vals else 0.0}
+
+
+class TraceBook:
+    def __init__(self, keep: int = 500, window: int = 500):
+        self._lock   = threading.Lock()
+        self._traces = deque(maxlen=keep)
+        self._window = window
+        self._hist   = {}           # stage -> RollingHistogram（距上一阶段耗时）
+        self._total  = {}           # mode  -> RollingHistogram（总耗时）
+
+    def start(self, mode: str, t0: float = None) -> Trace:
+        return Trace(mode, t0)
+
+    def finish(self, trace: Trace, status: str = None):
+        """结束一条 Trace 并计入直方图；重复调用无效"""
+        if trace is None or trace._done:
+            return
+        trace._done = True
+        if status:
+            trace.status = status
+        with self._lock:
+            self._traces.append(trace)
+            for stage, _, delta in trace.stages()[1:]:
+                self._hist.setdefault(stage, RollingHistogram(self._window)).add(delta)
+            self._total.setdefault(trace.mode, RollingHistogram(self._window)).add(trace.total_ms())
+
+    def recent(self, n: int = 50):
+        with self._lock:
+            return list(self._traces)[-n:]
+
+    def summary(self):
+        """{'stages': {stage: summary}, 'total': {mode: summary}}"""
+        with self._lock:
+            return {"stages": {k: h.summary() for k, h in self._hist.items()},
+                    "total":  {k: h.summary() for k, h in self._total.items()}}
+
+    def histogram(self, stage: str):
+        with self._lock:
+            h = self._hist.get(stage)
+            return h.buckets() if h else [0] * (len(BUCKETS_MS) + 1)
+
+    def export(self, path: str) -> int:
+        """把保存的 Trace 逐行写成 JSON，返回条数"""
+        traces = self.recent(len(self._traces) or 1)
+        with open(path, "w", encoding="utf-8") as f:
+            for tr in traces:
+                f.write(json.dumps(tr.to_dict(), ensure_ascii=False) + "\n")
+        return len(traces)
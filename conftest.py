@@ -0,0 +1,2 @@
+# test_ocr.py 是调用 WeChatOCR 的手动演示脚本（需要 Windows 下的 wcocr），不属于单元测试
+collect_ignore = ["test_ocr.py"]
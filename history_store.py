@@ -0,0 +1,202 @@
+"""
+截图历史
+====================================
+每次识别 / 翻译的结果（原文、文字框、译文、时间、压缩缩略图）写入 SQLite：
+  - 全文检索用 FTS5 trigram 分词（SQLite ≥ 3.34），中英文任意子串都能走索引；
+    不足 3 个字符的关键词或不支持 FTS5 / trigram 的环境退回 LIKE 扫描
+    （在支持 trigram 的环境建的库拿到不支持的环境打开也一样，写入不受影响）；
+  - 文件大小超过上限时按时间删除最旧的记录并回收空间；
+  - 连接可跨线程使用，所有操作串行；写入应放到后台任务里做。
+
+本模块不依赖 Tk。
+"""
+
+import io
+import json
+import time
+import sqlite3
+import threading
+
+THUMB_PX      = 320         # 缩略图最长边
+THUMB_QUALITY = 60          # JPEG 质量
+PRUNE_EVERY   = 50          # 每写入多少条检查一次容量
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS captures (
+    id          INTEGER PRIMARY KEY,
+    ts          REAL NOT NULL,
+    mode        TEXT,
+    text        TEXT NOT NULL DEFAULT '',
+    translation TEXT NOT NULL DEFAULT '',
+    boxes       TEXT,
+    thumb       BLOB
+);
+CREATE INDEX IF NOT EXISTS captures_ts ON captures(ts);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS captures_fts USING fts5(
+    text, translation, content='captures', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS captures_ai AFTER INSERT ON captures BEGIN
+    INSERT INTO captures_fts(rowid, text, translation) VALUES (new.id, new.text, new.translation);
+END;
+CREATE TRIGGER IF NOT EXISTS captures_ad AFTER DELETE ON captures BEGIN
+    INSERT INTO captures_fts(captures_fts, rowid, text, translation)
+        VALUES ('delete', old.id, old.text, old.translation);
+END;
+CREATE TRIGGER IF NOT EXISTS captures_au AFTER UPDATE ON captures BEGIN
+    INSERT INTO captures_fts(captures_fts, rowid, text, translation)
+        VALUES ('delete', old.id, old.text, old.translation);
+    INSERT INTO captures_fts(rowid, text, translation) VALUES (new.id, new.text, new.translation);
+END;
+"""
+
+
+def make_thumb(img, max_px: int = THUMB_PX, quality: int = THUMB_QUALITY) -> bytes:
+    """PIL 图 → JPEG 缩略图字节"""
+    im = img.convert("RGB")
+    im.thumbnail((max_px, max_px))
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def _fts_query(terms) -> str:
+    # 每个词作为短语加引号，避免用户输入里的 AND / * / 括号被当成语法
+    return " AND ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+class HistoryStore:
+    def __init__(self, path: str, max_mb: float = 200):
+        self.path      = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock     = threading.Lock()
+        self._added    = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            # auto_vacuum 只能在建表前设定，已有库上无效也无害
+            self._db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.executescript(_SCHEMA)
+            self.fts = self._init_fts()
+            self._db.commit()
+
+    def _init_fts(self) -> bool:
+        """
+        建立 / 检查全文索引，返回是否可用。
+        库是在支持 trigram 的 SQLite 上建的、现在却换了不支持的版本时，索引表打不开，
+        插入触发器会让每次 add() 都报错：这时拆掉触发器退回 LIKE（索引表本身删不掉，留着不动）。
+        """
+        db = self._db
+        had = db.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' "
+                         "AND name = 'captures_ai'").fetchone()
+        try:
+            db.executescript(_FTS_SCHEMA)
+            db.execute("SELECT rowid FROM captures_fts LIMIT 0").fetchall()
+        except sqlite3.OperationalError:
+            for t in ("captures_ai", "captures_ad", "captures_au"):
+                db.execute(f"DROP TRIGGER IF EXISTS {t}")
+            return False
+        if not had:
+            # 索引刚建好，或之前在不支持的环境里停用过（期间的记录没进索引）：按现有记录重建
+            db.execute("INSERT INTO captures_fts(captures_fts) VALUES ('rebuild')")
+        return True
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ── 写入 ─────────────────────────────────
+    def add(self, text: str, translation: str = "", boxes=None, image=None,
+            mode: str = "", ts: float = None) -> int:
+        thumb = make_thumb(image) if image is not None else None
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO captures(ts, mode, text, translation, boxes, thumb) VALUES (?,?,?,?,?,?)",
+                (ts or time.time(), mode, text or "", translation or "",
+                 json.dumps(boxes, ensure_ascii=False) if boxes else None, thumb))
+            self._db.commit()
+            self._added += 1
+            rid = cur.lastrowid
+        if self._added % PRUNE_EVERY == 0:
+            self.prune()
+        return rid
+
+    def set_translation(self, rid: int, translation: str):
+        with self._lock:
+            self._db.execute("UPDATE captures SET translation = ? WHERE id = ?", (translation, rid))
+            self._db.commit()
+
+    def delete(self, rid: int):
+        with self._lock:
+            self._db.execute("DELETE FROM captures WHERE id = ?", (rid,))
+            self._db.commit()
+
+    # ── 容量 ─────────────────────────────────
+    def size_bytes(self) -> int:
+        page = self._db.execute("PRAGMA page_size").fetchone()[0]
+        used = (self._db.execute("PRAGMA page_count").fetchone()[0]
+                - self._db.execute("PRAGMA freelist_count").fetchone()[0])
+        return page * used
+
+    def prune(self) -> int:
+        """超过容量上限时删除最旧的记录（每轮 10%），返回删除条数"""
+        removed = 0
+        with self._lock:
+            while self.size_bytes() > self.max_bytes:
+                n = self._db.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
+                if n == 0:
+                    break
+                k = max(1, n // 10)
+                self._db.execute(
+                    "DELETE FROM captures WHERE id IN (SELECT id FROM captures ORDER BY ts LIMIT ?)", (k,))
+                self._db.commit()
+                removed += k
+            if removed:
+                self._db.execute("PRAGMA incremental_vacuum")
+                self._db.commit()
+        return removed
+
+    # ── 查询 ─────────────────────────────────
+    def search(self, query: str = "", limit: int = 100):
+        """
+        空格分隔的关键词全部命中（原文或译文中的子串），按时间倒序。
+        返回 [{'id','ts','mode','text','translation'}]，不含缩略图。
+        """
+        terms = [t for t in (query or "").split() if t]
+        cols = "c.id, c.ts, c.mode, c.text, c.translation"
+        with self._lock:
+            if not terms:
+                rows = self._db.execute(
+                    f"SELECT {cols} FROM captures c ORDER BY c.ts DESC LIMIT ?", (limit,)).fetchall()
+            elif self.fts and all(len(t) >= 3 for t in terms):
+                rows = self._db.execute(
+                    f"SELECT {cols} FROM captures_fts f JOIN captures c ON c.id = f.rowid "
+                    f"WHERE captures_fts MATCH ? ORDER BY c.ts DESC LIMIT ?",
+                    (_fts_query(terms), limit)).fetchall()
+            else:
+                where = " AND ".join("(c.text LIKE ? ESCAPE '\\' OR c.translation LIKE ? ESCAPE '\\')"
+                                     for _ in terms)
+                args = []
+                for t in terms:
+                    pat = "%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                    args += [pat, pat]
+                rows = self._db.execute(
+                    f"SELECT {cols} FROM captures c WHERE {where} ORDER BY c.ts DESC LIMIT ?",
+                    (*args, limit)).fetchall()
+        return [dict(r) for r in rows]
+
+    def get(self, rid: int):
+        """单条完整记录（boxes 已解析，thumb 为 JPEG 字节）"""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM captures WHERE id = ?", (rid,)).fetchone()
+        if row is None:
+            return None
+        rec = dict(row)
+        rec["boxes"] = json.loads(rec["boxes"]) if rec["boxes"] else []
+        return rec
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM captures").fetchone()[0]
@@ -0,0 +1,223 @@
+"""
+离屏译图渲染
+====================================
+与 InPlaceOverlay 相同的"抹去原文 + 原位绘制译文"效果，但只用 PIL 生成图片，
+不依赖 Tk / Windows，可在无界面的批处理任务中使用。
+
+命令行批量模式（每行一个 JSON 任务）：
+  python overlay_render.py jobs.jsonl [--font 字体路径]
+  {"image": "a.png", "items": [{"left":..,"top":..,"right":..,"bottom":..}, ...],
+   "translations": ["...", ...], "out": "a_zh.png"}
+"""
+
+import os
+import sys
+import json
+import threading
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont, ImageStat
+
+from text_layout import fit_items, pil_metrics
+
+# 按顺序查找可用的 CJK 字体（Windows 优先微软雅黑，与屏幕覆盖层一致）；
+# 只列含中文字形的字体，找不到时宁可报错也不退回 DejaVu 之类的西文字体画出一排方框
+_WIN_FONTS = os.path.join(os.environ.get("WINDIR", r"C:\Windows"), "Fonts")
+FONT_CANDIDATES = [
+    os.path.join(_WIN_FONTS, "msyh.ttc"),
+    os.path.join(_WIN_FONTS, "msyh.ttf"),
+    os.path.join(_WIN_FONTS, "simhei.ttf"),
+    os.path.join(_WIN_FONTS, "simsun.ttc"),
+    os.path.join(_WIN_FONTS, "Deng.ttf"),
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/usr/share/fonts/wqy-microhei/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/arphic/uming.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "/Library/Fonts/Arial Unicode.ttf",
+]
+
+ERASE_BORDER = 4    # 向外采样这么多像素作为背景色
+
+
+def find_font(font_path: str = None) -> str:
+    """返回可用的字体文件路径；都找不到时抛 FileNotFoundError"""
+    if font_path:
+        if os.path.exists(font_path):
+            return font_path
+        raise FileNotFoundError(font_path)
+    for p in FONT_CANDIDATES:
+        if os.path.exists(p):
+            return p
+    raise FileNotFoundError("未找到可用的中文字体，请通过 font_path 指定")
+
+
+_font_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def _load_font(font_path: str, px: int):
+    return ImageFont.truetype(font_path, px)
+
+
+def get_font(font_path: str, px: int):
+    """字体对象缓存：同一 (字体, 字号) 只加载一次"""
+    with _font_lock:
+        return _load_font(font_path, px)
+
+
+# ─────────────────────────────────────────────
+#  像素处理（InPlaceOverlay 共用）
+# ─────────────────────────────────────────────
+def erase_text_regions(pil_img, items, border: int = ERASE_BORDER):
+    """
+    把 OCR 识别到的每个文字区域用周边背景色填充，
+    彻底抹去原文像素，避免翻译文字与原文叠加错乱。
+    返回处理后的新 PIL Image（不修改原图）。
+    """
+    img  = pil_img.copy().convert("RGB")
+    draw = ImageDraw.Draw(img)
+    iw, ih = img.size
+
+    for item in items:
+        x1 = max(0, int(item.get("left",  0)))
+        y1 = max(0, int(item.get("top",   0)))
+        x2 = min(iw, int(item.get("right", 0)))
+        y2 = min(ih, int(item.get("bottom",0)))
+        if x2 <= x1 or y2 <= y1:
+            continue
+
+        # 采样四条边外侧的像素作为背景色估计（上、下、左、右）
+        ox1, ox2 = max(0, x1 - border), min(iw, x2 + border)
+        strips = (
+            (ox1, max(0, y1 - border), ox2, y1),
+            (ox1, y2, ox2, min(ih, y2 + border)),
+            (ox1, y1, x1, y2),
+            (x2, y1, min(iw, x2 + border), y2),
+        )
+        sums, count = [0, 0, 0], 0
+        for sx1, sy1, sx2, sy2 in strips:
+            if sx2 <= sx1 or sy2 <= sy1:
+                continue
+            st = ImageStat.Stat(img.crop((sx1, sy1, sx2, sy2)))
+            for c in range(3):
+                sums[c] += int(st.sum[c])
+            count += (sx2 - sx1) * (sy2 - sy1)
+
+        fill = tuple(s // count for s in sums) if count else (240, 240, 240)
+
+        # 填充文字区域（稍微向外扩 1px 覆盖边缘）
+        draw.rectangle(
+            [max(0, x1 - 1), max(0, y1 - 1),
+             min(iw, x2 + 1), min(ih, y2 + 1)],
+            fill=fill
+        )
+    return img
+
+
+def sample_text_color(pil_img, x1, y1, x2, y2) -> str:
+    """从原图文字区域采样前景色（亮底取暗像素、暗底取亮像素），返回 #rrggbb"""
+    if not pil_img:
+        return "#ffffff"
+    try:
+        iw, ih = pil_img.size
+        rx1, ry1 = max(0, x1), max(0, y1)
+        rx2, ry2 = min(iw, x2), min(ih, y2)
+        if rx2 <= rx1 or ry2 <= ry1:
+            return "#ffffff"
+        region = pil_img.crop((rx1, ry1, rx2, ry2)).convert("RGB")
+        pixels = list(region.getdata())
+        if not pixels:
+            return "#ffffff"
+        brightnesses = [(r * 299 + g * 587 + b * 114) // 1000 for r, g, b in pixels]
+        avg_br = sum(brightnesses) // len(brightnesses)
+        if avg_br > 128:
+            cands = [pixels[i] for i, b in enumerate(brightnesses) if b < avg_br - 30]
+            if not cands:
+                return "#111111"
+        else:
+            cands = [pixels[i] for i, b in enumerate(brightnesses) if b > avg_br + 30]
+            if not cands:
+                return "#ffffff"
+        r = sum(p[0] for p in cands) // len(cands)
+        g = sum(p[1] for p in cands) // len(cands)
+        b = sum(p[2] for p in cands) // len(cands)
+        return f"#{r:02x}{g:02x}{b:02x}"
+    except Exception:
+        return "#ffffff"
+
+
+# ─────────────────────────────────────────────
+#  离屏渲染
+# ─────────────────────────────────────────────
+def render_translated(pil_img, items, translations, font_path: str = None,
+                      min_px: int = 8, max_px: int = 48, wrap: bool = True):
+    """
+    生成译图：抹掉 items 中的原文，再在原坐标用采样色绘制对应译文。
+    items 与 translations 一一对应（坐标为图片像素）；返回新的 RGB Image。
+    """
+    font_path = find_font(font_path)
+    pairs = [(it, t) for it, t in zip(items, translations)
+             if it.get("text", "x").strip() and t and t.strip()]
+    if not pairs:
+        return pil_img.copy().convert("RGB")
+    boxes = [it for it, _ in pairs]
+
+    metrics = pil_metrics(font_path)
+    out  = erase_text_regions(pil_img, boxes)
+    fits = fit_items(boxes, [t for _, t in pairs], metrics,
+                     min_px=min_px, max_px=max_px, wrap=wrap)
+
+    # 一次性采样颜色，再用同一个 ImageDraw 批量绘制
+    draw = ImageDraw.Draw(out)
+    for item, (x, y, fit) in zip(boxes, fits):
+        color = sample_text_color(pil_img, int(item["left"]), int(item["top"]),
+                                  int(item["right"]), int(item["bottom"]))
+        font   = get_font(font_path, fit.px)
+        line_h = metrics.line_height(fit.px)
+        for i, line in enumerate(fit.lines):
+            draw.text((x, y + i * line_h), line, fill=color, font=font)
+    return out
+
+
+def save_translated(src, items, translations, dst: str, **kw) -> str:
+    """src 可为路径或 PIL Image；渲染后保存到 dst 并返回 dst"""
+    img = Image.open(src) if isinstance(src, str) else src
+    render_translated(img, items, translations, **kw).save(dst)
+    return dst
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="批量生成原位译图")
+    ap.add_argument("jobs", help="JSON Lines 任务文件，- 表示标准输入")
+    ap.add_argument("--font", default=None, help="字体文件路径")
+    args = ap.parse_args(argv)
+
+    font_path = find_font(args.font)
+    src = sys.stdin if args.jobs == "-" else open(args.jobs, "r", encoding="utf-8")
+    ok = failed = 0
+    with src:
+        for line in src:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+                out = job.get("out") or os.path.splitext(job["image"])[0] + "_trans.png"
+                save_translated(job["image"], job["items"], job["translations"],
+                                out, font_path=font_path)
+                ok += 1
+            except Exception as e:
+                failed += 1
+                print(f"[失败] {line[:80]}  {e}", file=sys.stderr)
+    print(f"完成 {ok} 张，失败 {failed} 张")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
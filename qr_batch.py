@@ -0,0 +1,126 @@
+"""
+批量扫码（命令行，无界面）
+====================================
+递归扫描文件夹 / 单个文件（含多页 TIFF 的每一页），用进程池并行识别二维码，
+每个工作进程只创建一次检测器（见 qr_scan），结果按完成顺序逐行输出 JSON：
+
+  {"file": "a.tif", "page": 2, "payload": "...", "points": [[x, y], ...]}
+
+默认相同内容只输出第一次出现的位置（--keep-dups 保留全部）；汇总信息写到 stderr。
+
+用法：python qr_batch.py 路径 [路径 ...] [-o 结果.jsonl] [-j 进程数]
+"""
+
+import os
+import sys
+import json
+import time
+
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff"}
+
+
+def iter_files(paths):
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _, files in os.walk(p):
+                for fn in sorted(files):
+                    if os.path.splitext(fn)[1].lower() in IMAGE_EXTS:
+                        yield os.path.join(root, fn)
+        elif os.path.isfile(p):
+            yield p
+
+
+def _page_count(path) -> int:
+    if os.path.splitext(path)[1].lower() not in (".tif", ".tiff", ".gif", ".webp"):
+        return 1
+    try:
+        from PIL import Image
+        with Image.open(path) as im:
+            return getattr(im, "n_frames", 1)
+    except Exception:
+        return 1
+
+
+def iter_jobs(paths):
+    """(文件, 页号)；多页文件在主进程只读头部取页数，解码交给工作进程"""
+    for path in iter_files(paths):
+        for page in range(_page_count(path)):
+            yield path, page
+
+
+def _init_worker():
+    import qr_scan
+    qr_scan.warmup()
+
+
+def scan_page(job, retry: bool = True):
+    """工作进程：识别一页，返回 (文件, 页号, [(文本, 角点)], 错误)"""
+    path, page = job
+    try:
+        import qr_scan
+        from PIL import Image
+        with Image.open(path) as im:
+            if page:
+                im.seek(page)
+            im = im.convert("RGB")
+        return path, page, qr_scan.decode(im, retry=retry), None
+    except Exception as e:
+        return path, page, [], str(e)
+
+
+def _scan_page_noretry(job):
+    return scan_page(job, retry=False)
+
+
+def run(paths, out=sys.stdout, workers: int = None, retry: bool = True,
+        keep_dups: bool = False):
+    """批量识别并写出 JSON Lines，返回统计字典"""
+    import multiprocessing as mp
+    fn = scan_page if retry else _scan_page_noretry
+    seen = set()
+    st = {"pages": 0, "codes": 0, "dups": 0, "errors": 0}
+    t0 = time.perf_counter()
+    with mp.Pool(workers or os.cpu_count() or 2, initializer=_init_worker) as pool:
+        for path, page, found, err in pool.imap_unordered(fn, iter_jobs(paths), chunksize=4):
+            st["pages"] += 1
+            if err:
+                st["errors"] += 1
+                print(f"[失败] {path}#{page}  {err}", file=sys.stderr)
+                continue
+            for text, pts in found:
+                if text in seen and not keep_dups:
+                    st["dups"] += 1
+                    continue
+                seen.add(text)
+                st["codes"] += 1
+                out.write(json.dumps({"file": path, "page": page, "payload": text,
+                                      "points": [[round(x, 1), round(y, 1)] for x, y in pts]},
+                                     ensure_ascii=False) + "\n")
+            out.flush()
+    st["seconds"] = round(time.perf_counter() - t0, 2)
+    return st
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="批量识别图片 / 多页 TIFF 中的二维码")
+    ap.add_argument("paths", nargs="+", help="图片文件或文件夹（递归）")
+    ap.add_argument("-o", "--out", default="-", help="输出 JSON Lines 文件，默认标准输出")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="进程数，默认 CPU 核数")
+    ap.add_argument("--no-retry", action="store_true", help="不做放大 / 分块重试（更快）")
+    ap.add_argument("--keep-dups", action="store_true", help="保留重复内容")
+    args = ap.parse_args(argv)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        st = run(args.paths, out, args.jobs, retry=not args.no_retry, keep_dups=args.keep_dups)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"共 {st['pages']} 页，识别 {st['codes']} 个二维码（重复 {st['dups']}），"
+          f"失败 {st['errors']} 页，耗时 {st['seconds']}s", file=sys.stderr)
+    return 1 if st["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
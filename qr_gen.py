@@ -0,0 +1,51 @@
+"""
+二维码生成（带缓存）
+====================================
+输入框每敲一个字都会刷新预览，这里把代价压到最低：
+  - 模块矩阵按 (文本, 纠错级别) 做 LRU 缓存，回退 / 重复输入直接命中；
+  - 由模块矩阵直接按整数倍最近邻放大到显示尺寸，不再用 LANCZOS 缩放整张图
+    （二维码只有黑白两色，插值只会让边缘发糊）；
+  - 只生成内存图像，写盘留给“复制 / 另存为”时再做。
+"""
+
+from functools import lru_cache
+
+DISPLAY_PX = 260
+BORDER     = 2
+EC_LEVELS  = {"L": 1, "M": 0, "Q": 3, "H": 2}   # 对应 qrcode.constants.ERROR_CORRECT_*
+
+
+@lru_cache(maxsize=128)
+def qr_matrix(text: str, ec: str = "M"):
+    """返回含留白的模块矩阵（tuple of tuple[bool]），True 为黑"""
+    import qrcode
+    qr = qrcode.QRCode(version=None, error_correction=EC_LEVELS.get(ec, 0),
+                       box_size=1, border=BORDER)
+    qr.add_data(text)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+@lru_cache(maxsize=32)
+def render(text: str, ec: str = "M", size: int = DISPLAY_PX):
+    """渲染为 size×size 的灰度 PIL 图：整数倍最近邻放大，余量居中留白"""
+    from PIL import Image
+    mat = qr_matrix(text, ec)
+    n = len(mat)
+    small = Image.new("L", (n, n))
+    small.putdata([0 if v else 255 for row in mat for v in row])
+    scale = max(1, size // n)
+    big = small.resize((n * scale, n * scale), Image.NEAREST)
+    if big.size[0] == size:
+        return big
+    if big.size[0] > size:      # 内容过长、模块数超过显示像素：只能缩小
+        return small.resize((size, size), Image.NEAREST)
+    out = Image.new("L", (size, size), 255)
+    off = (size - big.size[0]) // 2
+    out.paste(big, (off, off))
+    return out
+
+
+def save(text: str, path: str, ec: str = "M", size: int = DISPLAY_PX):
+    render(text, ec, size).save(path)
+    return path
@@ -0,0 +1,194 @@
+"""
+区域监视（连续 OCR）
+====================================
+按固定频率截取屏幕上的一块矩形区域，逐帧做分带差分：
+  - 每帧缩小为 1/4 灰度图并量化，按水平条带计算 crc32 校验和；
+  - 只有校验和变化的条带（合并相邻条带并外扩一条）才送去 OCR；
+  - 识别结果与仍在画面上的已输出行去重，只回调新增 / 变化的行；
+    重新识别的区间里消失的行会被忘掉，重复出现的字幕照常输出。
+画面静止时每轮只有一次小区域截图 + 几次 crc32，并逐步拉长采样间隔，CPU 近乎为零。
+
+本模块不依赖 Tk，可单独用于字幕 / 日志跟随等场景。
+"""
+
+import zlib
+import threading
+from collections import OrderedDict
+
+DOWNSCALE = 4       # 差分前缩小倍数（滤掉光标闪烁、抗锯齿等细微噪点）
+_QUANT    = bytes(v >> 4 << 4 for v in range(256))   # 灰度量化为 16 级
+
+
+class BandDiffer:
+    """按水平条带比较相邻两帧，返回需要重新识别的 (y1, y2) 区间（原图像素）"""
+
+    def __init__(self, band_h: int = 32):
+        self.band_h = max(DOWNSCALE, int(band_h))
+        self._sums  = None
+        self._size  = None
+
+    def reset(self):
+        self._sums = None
+        self._size = None
+
+    def _checksums(self, img):
+        from PIL import Image
+        w, h  = img.size
+        sw, sh = max(1, w // DOWNSCALE), max(1, h // DOWNSCALE)
+        small = img.convert("L").resize((sw, sh), Image.BILINEAR)
+        data  = small.tobytes().translate(_QUANT)
+        rows  = max(1, self.band_h // DOWNSCALE)
+        return [zlib.crc32(data[r * sw:(r + rows) * sw]) for r in range(0, sh, rows)]
+
+    def update(self, img):
+        """喂入新一帧，返回变化区间列表；首帧或尺寸变化时返回整幅"""
+        w, h = img.size
+        sums = self._checksums(img)
+        prev, self._sums = self._sums, sums
+        if prev is None or self._size != (w, h) or len(prev) != len(sums):
+            self._size = (w, h)
+            return [(0, h)]
+
+        changed = [i for i, (a, b) in enumerate(zip(prev, sums)) if a != b]
+        if not changed:
+            return []
+        # 合并相邻条带，并各向外扩一条，避免把一行文字切成两半
+        runs, start, end = [], changed[0], changed[0]
+        for i in changed[1:]:
+            if i <= end + 2:
+                end = i
+            else:
+                runs.append((start, end))
+                start = end = i
+        runs.append((start, end))
+        bh = (self.band_h // DOWNSCALE) * DOWNSCALE
+        return [(max(0, (s - 1) * bh), min(h, (e + 2) * bh)) for s, e in runs]
+
+
+class LineDeduper:
+    """
+    记住当前仍在画面上的已输出行，只放行新出现或内容变化的行。
+    重新识别过的区间里没再找到的行视为已消失并忘掉，之后同样的字幕再出现时会重新输出；
+    从未被重新识别的行（所在条带没变化）一直算作还在画面上。
+    """
+
+    def __init__(self, capacity: int = 300):
+        self._seen = OrderedDict()      # 规范化文本 → 最近一次出现时的中心 y
+        self._cap  = capacity
+
+    @staticmethod
+    def _norm(text: str) -> str:
+        return "".join(text.split()).lower()
+
+    def filter(self, items, scanned=None):
+        """scanned 为本帧重新识别过的 [(y1, y2)]；不传时不做消失判断（只按文本去重）"""
+        keys = [self._norm(it.get("text", "")) for it in items]
+        if scanned:
+            present = set(keys)
+            for key, cy in list(self._seen.items()):
+                if key not in present and any(y1 <= cy < y2 for y1, y2 in scanned):
+                    del self._seen[key]
+        fresh = []
+        for it, key in zip(items, keys):
+            if not key:
+                continue
+            cy = (it.get("top", 0) + it.get("bottom", 0)) / 2
+            if key in self._seen:
+                self._seen[key] = cy
+                self._seen.move_to_end(key)
+                continue
+            self._seen[key] = cy
+            if len(self._seen) > self._cap:
+                self._seen.popitem(last=False)
+            fresh.append(it)
+        return fresh
+
+
+def _default_grab(bbox):
+    from PIL import ImageGrab
+    return ImageGrab.grab(bbox=bbox, all_screens=True)
+
+
+class RegionWatcher:
+    """
+    后台线程：按 interval 秒采样 bbox（物理像素），对变化条带调用 ocr_fn(PIL Image)，
+    ocr_fn 返回与 do_ocr_raw 相同格式的 items（或错误字符串）。
+    新增的行通过 on_lines(items) 回调（坐标已换算回整个区域），回调在工作线程中执行。
+    """
+
+    def __init__(self, bbox, ocr_fn, on_lines, interval: float = 0.5,
+                 max_interval: float = 2.0, band_h: int = 32, grab_fn=None,
+                 on_error=None):
+        self.bbox         = tuple(int(v) for v in bbox)
+        self.interval     = max(0.05, float(interval))
+        self.max_interval = max(self.interval, float(max_interval))
+        self._ocr      = ocr_fn
+        self._on_lines = on_lines
+        self._on_error = on_error
+        self._grab     = grab_fn or _default_grab
+        self._differ   = BandDiffer(band_h)
+        self._dedupe   = LineDeduper()
+        self._stop     = threading.Event()
+        self._thread   = None
+        self._changed  = False
+        self.stats     = {"frames": 0, "ocr_calls": 0, "ocr_rows": 0, "lines": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._differ.reset()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, wait: bool = False):
+        self._stop.set()
+        if wait and self._thread:
+            self._thread.join(timeout=self.max_interval + 1)
+
+    def step(self, img):
+        """处理一帧，返回本帧新增的 items（也供测试 / 无线程场景直接调用）"""
+        self.stats["frames"] += 1
+        runs = self._differ.update(img)
+        self._changed = bool(runs)
+        if not runs:
+            return []
+        w = img.size[0]
+        found, scanned = [], []
+        for y1, y2 in runs:
+            res = self._ocr(img.crop((0, y1, w, y2)))
+            self.stats["ocr_calls"] += 1
+            self.stats["ocr_rows"]  += y2 - y1
+            if isinstance(res, str):
+                if self._on_error:
+                    self._on_error(res)
+                continue
+            scanned.append((y1, y2))
+            for it in res:
+                it = dict(it)
+                it["top"]    = it.get("top", 0) + y1
+                it["bottom"] = it.get("bottom", 0) + y1
+                found.append(it)
+        found.sort(key=lambda it: (it["top"], it.get("left", 0)))
+        fresh = self._dedupe.filter(found, scanned)
+        self.stats["lines"] += len(fresh)
+        return fresh
+
+    def _run(self):
+        wait = self.interval
+        while not self._stop.is_set():
+            try:
+                fresh = self.step(self._grab(self.bbox))
+                if fresh:
+                    self._on_lines(fresh)
+                # 画面有变化则恢复原采样率，静止时逐步放慢到 max_interval
+                wait = self.interval if self._changed else min(self.max_interval, wait * 1.5)
+            except Exception as e:
+                if self._on_error:
+                    self._on_error(f"[监视错误] {e}")
+                wait = self.max_interval
+            self._stop.wait(wait)
@@ -6,67 +6,69 @@
   Alt+2  →  截图复制（OCR）
 """
 
-import wcocr
+from capture_trace import Trace
+_BOOT = Trace("startup")    # 启动分阶段耗时（导入 / 建窗 / 首次显示），首次空闲时写入日志
+
 import os
 import threading
 import tkinter as tk
 from tkinter import Toplevel, Canvas, StringVar, OptionMenu
 from tkinter.scrolledtext import ScrolledText
-from PIL import Image, ImageGrab
-import pyperclip
+_BOOT.mark("import:tkinter")
+# PIL、pyperclip、pystray 以及依赖 PIL 的 overlay_render 都在用到的函数里再导入，启动时不加载
 import ctypes
 from ctypes import wintypes
 # 移除 keyboard 组件，改用 Win32 API 稳定方案（无系统静默挂起问题）
 
 import sys
 
+from text_layout import fit_items, tk_metrics
+from region_watch import RegionWatcher
+from scroll_capture import ScrollSession
+from wxocr_core.batch import ocr_batch
+from task_pool import TaskExecutor, CancelToken, PRIO_INTERACTIVE, PRIO_NORMAL, PRIO_BACKGROUND
+from ui_queue import UIQueue
+from async_log import AsyncLogger
+from capture_trace import TraceBook
+import qr_scan
+import qr_gen
+from history_store import HistoryStore
+from wxocr_core import paths as _paths
+from wxocr_core import WcocrEngine, load_config, save_config, ENGINES, do_translate, iter_translate
+from wxocr_core.translate import FAIL_MSG
+from wxocr_core import tm as _tm
+_BOOT.mark("import:modules")
+
 # ─────────────────────────────────────────────
 #  路径配置
 # ─────────────────────────────────────────────
-if getattr(sys, 'frozen', False):
-    # PyInstaller 单文件模式：资源解压到临时目录 sys._MEIPASS
-    _RES_DIR = sys._MEIPASS
-else:
-    _RES_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# 可写目录：%APPDATA%/wechatocr
-_appdata = os.getenv('APPDATA') or os.path.expanduser('~\\AppData\\Roaming')
-_WRITE_DIR = os.path.join(_appdata, 'wechatocr')
-os.makedirs(_WRITE_DIR, exist_ok=True)
+# 资源目录（PyInstaller 单文件模式下为 sys._MEIPASS）与可写目录 %APPDATA%/wechatocr
+_RES_DIR   = _paths.res_dir()
+_WRITE_DIR = _paths.write_dir()
 
 SCRIPT_DIR     = _WRITE_DIR          # 保持兼容（config.json 路径用）
-WECHATOCR_EXE  = os.path.join(_RES_DIR, "path", "WeChatOCR", "WeChatOCR.exe")
-WECHAT_LIB_DIR = os.path.join(_RES_DIR, "path")
+WECHATOCR_EXE  = _paths.wechatocr_exe()
+WECHAT_LIB_DIR = _paths.wechat_lib_dir()
 TEMP_IMG       = os.path.join(_WRITE_DIR, "_temp_screenshot.png")
+WATCH_IMG      = os.path.join(_WRITE_DIR, "_temp_watch.png")
+SCROLL_IMG     = os.path.join(_WRITE_DIR, "_temp_scroll.png")
+LONG_IMG       = os.path.join(_WRITE_DIR, "long_capture.png")
+BATCH_IMG      = os.path.join(_WRITE_DIR, "_temp_batch.png")
+HISTORY_DB     = os.path.join(_WRITE_DIR, "history.db")
 
 HOTKEY_LOG = os.path.join(_WRITE_DIR, "hotkey_debug.log")
 
 def _kbd_state_snapshot():
     return "[kbd状态] 使用 Win32 API 原生热键，已解决静默失效问题"
 
-def _hklog(msg: str, level: str = "info", with_kbd_state: bool = True):
-    """写入热键诊断日志，带时间戳、级别标签和可选的键盘系统状态快照"""
-    import datetime
-    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # 限制日志大小，超过 2MB 则截断前一半（避免积留过大文件）
-    try:
-        if os.path.exists(HOTKEY_LOG) and os.path.getsize(HOTKEY_LOG) > 2 * 1024 * 1024:
-            with open(HOTKEY_LOG, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            with open(HOTKEY_LOG, "w", encoding="utf-8") as f:
-                f.writelines(lines[len(lines)//2:])
-    except Exception:
-        pass
-
-    kbd_info = f"  {_kbd_state_snapshot()}" if with_kbd_state else ""
-    full_msg = f"{now} [{level.upper()}] {msg}{kbd_info}\n"
+# 后台线程批量写盘、按大小轮转为 hotkey_debug.log.1 / .2 / .3
+_LOG = AsyncLogger(HOTKEY_LOG, max_bytes=2 * 1024 * 1024, backups=3)
 
-    try:
-        with open(HOTKEY_LOG, "a", encoding="utf-8") as f:
-            f.write(full_msg)
-    except Exception:
-        pass
+def _hklog(msg: str, level: str = "info", with_kbd_state: bool = True, **fields):
+    """写入热键诊断日志（仅入队，不阻塞调用线程）；fields 作为 key=value 附在行尾"""
+    if with_kbd_state:
+        msg = f"{msg}  {_kbd_state_snapshot()}"
+    _LOG.log(msg, level, **fields)
 # ─────────────────────────────────────────────
 #  颜色主题
 # ─────────────────────────────────────────────
@@ -80,270 +82,102 @@ SUCCESS = "#a6e3a1"
 BORDER  = "#45475a"
 BTN_FG  = "#ffffff"
 
+TRANS_FONT = "微软雅黑"   # 原位译文字体
+
 # ─────────────────────────────────────────────
 #  OCR 核心
 # ─────────────────────────────────────────────
 
-# 修复：wcocr.init 只能调用一次，每次重新启动 WeChatOCR.exe
-# 子进程在 Win10 Defender 或杀毒软件扫描下可能阻塞数秒乃至更久，
-# 从而卡死 OCR worker 线程（表现：截图后程序假死/转圈）。
-# 改为全局只初始化一次，之后所有调用复用同一进程通道。
-_wcocr_initialized = False
-_wcocr_init_lock   = threading.Lock()
-
-def _ensure_wcocr_init():
-    global _wcocr_initialized
-    if _wcocr_initialized:
-        return
-    with _wcocr_init_lock:
-        if not _wcocr_initialized:  # double-check
-            wcocr.init(WECHATOCR_EXE, WECHAT_LIB_DIR)
-            _wcocr_initialized = True
+# wcocr.init 只能调用一次（见 wxocr_core.engine），全程复用同一个引擎实例
+_ENGINE = WcocrEngine(WECHATOCR_EXE, WECHAT_LIB_DIR)
 
 def do_ocr(image_path: str) -> str:
-    res = do_ocr_raw(image_path)
-    if isinstance(res, str):
-        return res
-    lines = [item["text"] for item in res if item["text"].strip()]
-    return "\n".join(lines) if lines else "（未识别到文字）"
+    return _ENGINE.ocr_text(image_path)
 
 def do_ocr_raw(image_path: str):
     """返回原始结果: [{'text': 'abc', 'left': x, 'top': y, 'right': x, 'bottom': y}, ...]"""
-    try:
-        _ensure_wcocr_init()
-        result = wcocr.ocr(image_path)
-        items = []
-        for item in result.get("ocr_response", []):
-            text = item.get("text", "")
-            if isinstance(text, bytes):
-                text = text.decode("utf-8", errors="ignore")
-            if text.strip():
-                items.append({
-                    "text": text,
-                    "left": item.get("left", 0),
-                    "top": item.get("top", 0),
-                    "right": item.get("right", 0),
-                    "bottom": item.get("bottom", 0)
-                })
-        return items
-    except Exception as e:
-        return f"[OCR 错误] {e}"
+    return _ENGINE.ocr_raw(image_path)
+
+def do_ocr_batch(images):
+    """多张 PIL 图拼成一张只调用一次引擎，返回与 images 对应的 items 列表（或错误字符串）"""
+    return ocr_batch(images, do_ocr_raw, BATCH_IMG)
 
 # ─────────────────────────────────────────────
-#  翻译核心（纯 urllib，零第三方依赖，国内直连）
+#  翻译（实现见 wxocr_core.translate）
 # ─────────────────────────────────────────────
-import urllib.request, urllib.parse, urllib.error, json as _json
-import hmac, hashlib, time as _time
-
-ENGINES = ["腾讯翻译", "百度翻译", "有道翻译", "MyMemory"]
-
-# 语言代码映射
-_TENCENT_LANG = {
-    "zh": "zh", "en": "en", "ja": "ja", "ko": "ko",
-    "fr": "fr", "de": "de", "es": "es", "ru": "ru",
-    "th": "th", "vi": "vi",
-}
-_BAIDU_LANG   = {"zh":"zh","en":"en","ja":"jp","ko":"kor","fr":"fra","de":"de","es":"spa","ru":"ru","th":"th","vi":"vie"}
-_YOUDAO_LANG  = {"zh":"zh-CHS","en":"en","ja":"ja","ko":"ko","fr":"fr","de":"de","es":"es","ru":"ru","th":"th","vi":"vi"}
+import hashlib, time as _time
 
 
 def _load_config() -> dict:
-    try:
-        with open(os.path.join(SCRIPT_DIR, "config.json"), "r", encoding="utf-8") as f:
-            return _json.load(f)
-    except Exception:
-        return {}
-
-
-def _translate_tencent(text: str, to_lang: str) -> str:
-    """腾讯云机器翻译 API，TC3-HMAC-SHA256 签名"""
-    cfg        = _load_config().get("tencent", {})
-    secret_id  = cfg.get("secret_id",  "")
-    secret_key = cfg.get("secret_key", "")
-    region     = cfg.get("region", "ap-beijing")
-    if not secret_id or not secret_key or "填入" in secret_id:
-        return ""   # 密鑰未配置
-
-    to      = _TENCENT_LANG.get(to_lang, to_lang)
-    payload = _json.dumps({"SourceText": text[:2000], "Source": "auto",
-                           "Target": to, "ProjectId": 0}, ensure_ascii=False)
-    host    = "tmt.tencentcloudapi.com"
-    service = "tmt"
-    ts      = int(_time.time())
-    date    = _time.strftime("%Y-%m-%d", _time.gmtime(ts))
-
-    hp  = hashlib.sha256(payload.encode()).hexdigest()
-    ch  = f"content-type:application/json; charset=utf-8\nhost:{host}\n"
-    sh  = "content-type;host"
-    cr  = "\n".join(["POST", "/", "", ch, sh, hp])
-    cs  = f"{date}/{service}/tc3_request"
-    hcr = hashlib.sha256(cr.encode()).hexdigest()
-    s2s = "\n".join(["TC3-HMAC-SHA256", str(ts), cs, hcr])
-
-    def _h(key: bytes, msg: str) -> bytes:
-        return hmac.new(key, msg.encode(), hashlib.sha256).digest()
-
-    sk  = _h(_h(_h(("TC3"+secret_key).encode(), date), service), "tc3_request")
-    sig = hmac.new(sk, s2s.encode(), hashlib.sha256).hexdigest()
-    auth = (f"TC3-HMAC-SHA256 Credential={secret_id}/{cs}, "
-            f"SignedHeaders={sh}, Signature={sig}")
-    try:
-        req = urllib.request.Request(
-            f"https://{host}", data=payload.encode(),
-            headers={"Authorization": auth,
-                     "Content-Type": "application/json; charset=utf-8",
-                     "Host": host, "X-TC-Action": "TextTranslate",
-                     "X-TC-Timestamp": str(ts), "X-TC-Version": "2018-03-21",
-                     "X-TC-Region": region})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            obj = _json.loads(resp.read().decode())
-        return obj.get("Response", {}).get("TargetText", "")
-    except Exception:
-        return ""
-
+    """共享的缓存副本，修改前请先 dict() 复制"""
+    return load_config(os.path.join(SCRIPT_DIR, "config.json"))
 
-def _translate_baidu(text: str, to_lang: str) -> str:
-    """百度翻译网页接口，国内直连，无需 API Key"""
-    to = _BAIDU_LANG.get(to_lang, to_lang)
-    try:
-        data = urllib.parse.urlencode({
-            "query": text[:2000],
-            "from":  "auto",
-            "to":    to,
-            "source": "txt",
-        }).encode("utf-8")
-        req = urllib.request.Request(
-            "https://fanyi.baidu.com/transapi",
-            data=data,
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                "User-Agent":   "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-                "Referer":      "https://fanyi.baidu.com/",
-                "Origin":       "https://fanyi.baidu.com",
-            },
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            obj = _json.loads(resp.read().decode("utf-8"))
-        parts = obj.get("data", [])
-        if parts:
-            return "".join(p.get("dst", "") for p in parts)
-    except Exception as e:
-        return ""
-    return ""
-
-
-def _translate_youdao(text: str, to_lang: str) -> str:
-    """有道翻译网页接口，国内直连，无需 API Key"""
-    to = _YOUDAO_LANG.get(to_lang, to_lang)
+# ─────────────────────────────────────────────
+#  截图选区（微信风格：截图背景 + 框选区域亮显）
+# ─────────────────────────────────────────────
+def _virtual_screen(app):
+    """虚拟屏幕范围 (vx, vy, vw, vh)，逻辑像素"""
     try:
-        data = urllib.parse.urlencode({
-            "q":    text[:500],
-            "from": "auto",
-            "to":   to,
-        }).encode("utf-8")
-        req = urllib.request.Request(
-            "https://aidemo.youdao.com/trans",
-            data=data,
-            headers={
-                "Content-Type": "application/x-www-form-urlencoded",
-                "User-Agent":   "Mozilla/5.0",
-                "Referer":      "https://ai.youdao.com/",
-            },
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            obj = _json.loads(resp.read().decode("utf-8"))
-        # 响应：{"translation": ["译文"]}
-        t = obj.get("translation", [])
-        if t and isinstance(t, list):
-            return t[0] if isinstance(t[0], str) else ""
+        u32 = ctypes.windll.user32
+        return (u32.GetSystemMetrics(76), u32.GetSystemMetrics(77),
+                u32.GetSystemMetrics(78), u32.GetSystemMetrics(79))
     except Exception:
-        return ""
-    return ""
-
+        return 0, 0, app.winfo_screenwidth(), app.winfo_screenheight()
 
-def _translate_mymemory(text: str, to_lang: str) -> str:
-    """MyMemory 公开 API，境外备用"""
-    try:
-        params = urllib.parse.urlencode({"q": text[:500], "langpair": f"auto|{to_lang}"})
-        req = urllib.request.Request(
-            f"https://api.mymemory.translated.net/get?{params}",
-            headers={"User-Agent": "Mozilla/5.0"},
-        )
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            obj = _json.loads(resp.read().decode("utf-8"))
-        return obj.get("responseData", {}).get("translatedText", "")
-    except Exception:
-        return ""
-
-
-def do_translate(text: str, target_lang: str, engine: str = "腾讯翻译") -> str:
-    if not text.strip() or text.startswith("[OCR 错误]"):
-        return "（无内容可翻译）"
-
-    funcs = {
-        "腾讯翻译": _translate_tencent,
-        "百度翻译": _translate_baidu,
-        "有道翻译": _translate_youdao,
-        "MyMemory": _translate_mymemory,
-    }
-    order = [engine] + [e for e in ENGINES if e != engine]
-    for eng in order:
-        fn = funcs.get(eng)
-        if fn:
-            result = fn(text, target_lang)
-            if result and result.strip():
-                tag = f"[降级至 {eng}]\n" if eng != engine else ""
-                return tag + result
-
-    return "（已收到识别结果直接展示）\n\n[翻译失败：所有免费接口（百度/有道/MyMemory）均不可达或被频率限制，请稍微检查网络后再试]"
 
-# ─────────────────────────────────────────────
-#  截图选区（微信风格：截图背景 + 框选区域亮显）
-# ─────────────────────────────────────────────
-def grab_region(app, callback, mode_name=""):
-    """在主线程中打开截图遮罩，完成后调用 callback(image_path, lx1,ly1,lx2,ly2, crop_img)
-    策略：立即弹出旧式 alpha 遮罩（不阻塞主线程），后台截全屏并升级为 PIL 合成图。
+class SelectionOverlay(Toplevel):
+    """
+    可复用的截图选区遮罩：程序启动时创建一次并隐藏，
+    每次截图只重新设置几何、清空画布并显示，省去 Toplevel/Canvas 的构建开销。
+    打开时先在后台线程开始截全屏，再显示旧式 alpha 遮罩，PIL 素材就绪后升级为合成图。
+    ❗ 必须在主线程中创建和调用！
     """
-    from PIL import ImageTk
-
-    def _open():
-        # ── 获取虚拟屏幕范围 ──────────────────────
-        try:
-            u32 = ctypes.windll.user32
-            vx  = u32.GetSystemMetrics(76)
-            vy  = u32.GetSystemMetrics(77)
-            vw  = u32.GetSystemMetrics(78)
-            vh  = u32.GetSystemMetrics(79)
-        except Exception:
-            vx, vy = 0, 0
-            vw = app.winfo_screenwidth()
-            vh = app.winfo_screenheight()
-
-        dpi_sx, dpi_sy = app._dpi_scale
-
-        # ── 1. 立即弹出旧式半透明遮罩（不阻塞主线程）──
-        overlay = Toplevel(app)
-        overlay.overrideredirect(True)
-        overlay.geometry(f"{vw}x{vh}+{vx}+{vy}")
-        overlay.attributes("-topmost", True)
-        overlay.attributes("-alpha", 0.25)   # 和旧版完全一样，立即可见
-        overlay.configure(bg="black")
-        overlay.lift()
-        overlay.focus_force()
-
-        canvas = Canvas(overlay, cursor="cross", bg="black",
-                        highlightthickness=0, width=vw, height=vh)
-        canvas.pack(fill=tk.BOTH, expand=True)
 
-        hint_str = "拖动鼠标框选区域"
-        if mode_name:
-            hint_str = f"[{mode_name}] " + hint_str
-        hint_str += "  ·  右键 或 ESC 取消"
-        canvas.create_text(vw // 2, vh // 2, text=hint_str,
-                           fill="#ffffff", font=("微软雅黑", 18), tags="hint")
+    def __init__(self, app):
+        super().__init__(app)
+        self.withdraw()
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.configure(bg="black")
+        self._app      = app
+        self._callback = None
+        self._gen      = 0          # 每次打开 +1，丢弃上一轮后台截屏的迟到结果
+        self._geom     = (0, 0, 1, 1)
+        self._dpi      = (1.0, 1.0)
+        self._state    = {"sx": 0, "sy": 0}
+        self._ref      = {}
+        self._latency  = []         # 最近若干次 热键→遮罩可见 耗时（ms）
+
+        self._canvas = Canvas(self, cursor="cross", bg="black", highlightthickness=0)
+        self._canvas.pack(fill=tk.BOTH, expand=True)
 
-        # _ref 在后台线程和主线程之间共享数据
-        _ref = {
+        c = self._canvas
+        c.bind("<ButtonPress-1>",   self._on_press)
+        c.bind("<B1-Motion>",       self._on_drag)
+        c.bind("<ButtonRelease-1>", self._on_release)
+        c.bind("<ButtonPress-3>",   self._rclick_press)
+        c.bind("<ButtonRelease-3>", self._rclick_release)
+        self.bind("<ButtonPress-3>",  self._rclick_press)
+        self.bind("<ButtonRelease-3>",self._rclick_release)
+        self.bind("<Escape>", self._cancel)
+        self.bind("<Return>", lambda e: self._finish_multi())
+
+    # ── 打开 / 隐藏 ──────────────────────────
+    def open(self, callback, mode_name="", t_hotkey=None, multi=False):
+        """开始一次框选；t_hotkey 为热键触发时的 perf_counter()，用于延迟统计。
+        multi=True 时可连续框选多个区域，回车 / 右键完成，
+        回调改为 callback(regions, crops)，所有区域都从同一张全屏截图中裁剪。
+        """
+        t_open = _time.perf_counter()
+        self._gen += 1
+        self._callback = callback
+        self._tr       = getattr(self._app, "_trace", None)
+        self._multi    = multi
+        self._regions  = []
+        self._dpi  = self._app._dpi_scale
+        self._geom = vx, vy, vw, vh = _virtual_screen(self._app)
+        # _ref 在后台线程和主线程之间共享数据（每轮新建，旧线程写不到新会话）
+        self._ref = {
             "photo":       None,    # 当前 canvas PhotoImage（防 GC）
             "pending":     False,   # 是否有待处理的重绘
             "full_img":    None,    # 原始物理像素截图
@@ -352,134 +186,296 @@ def grab_region(app, callback, mode_name=""):
             "ready":       False,   # PIL 素材是否就绪
         }
 
-        def _update_canvas(pil_img):
-            """主线程：把 PIL Image 渲染到 canvas 背景"""
-            photo = ImageTk.PhotoImage(pil_img)
-            canvas.delete("bg")
-            canvas.create_image(0, 0, anchor="nw", image=photo, tags="bg")
-            canvas.tag_lower("bg")
-            _ref["photo"] = photo
+        # ── 1. 立即在后台截全屏（不等遮罩显示）──
+        self._app._grab_tasks.submit(self._init_bg, self._gen, self._ref,
+                                     priority=PRIO_INTERACTIVE, group="grab_bg")
 
-        def _init_bg():
-            """后台线程：截全屏 → 准备合成底图（不阻塞 UI）"""
-            try:
-                sc_bbox = (
-                    int(vx * dpi_sx), int(vy * dpi_sy),
-                    int((vx + vw) * dpi_sx), int((vy + vh) * dpi_sy),
-                )
-                full_img    = ImageGrab.grab(bbox=sc_bbox, all_screens=True)
-                full_canvas = full_img.resize((vw, vh), Image.BILINEAR)
-                dark_overlay = Image.new("RGB", (vw, vh), (0, 0, 0))
-                dim_base    = Image.blend(full_canvas, dark_overlay, 0.25)
-                _ref["full_img"]    = full_img
-                _ref["full_canvas"] = full_canvas
-                _ref["dim_base"]    = dim_base
-                _ref["ready"]       = True
-                # 切换到 PIL 合成模式（去掉窗口 alpha，改用图像控制亮度）
-                overlay.after(0, _activate_composite)
-            except Exception:
-                pass   # 保持旧式 alpha 模式即可
+        # ── 2. 复用窗口：重设几何并清空上一轮画布 ──
+        c = self._canvas
+        c.delete("all")
+        c.configure(width=vw, height=vh)
+        hint_str = "拖动鼠标框选区域"
+        if mode_name:
+            hint_str = f"[{mode_name}] " + hint_str
+        if multi:
+            hint_str += "（可框选多个）  ·  回车 或 右键 完成  ·  ESC 取消"
+        else:
+            hint_str += "  ·  右键 或 ESC 取消"
+        c.create_text(vw // 2, vh // 2, text=hint_str,
+                      fill="#ffffff", font=("微软雅黑", 18), tags="hint")
 
-        def _activate_composite():
-            """主线程：PIL 就绪后，切换到合成图模式"""
-            try:
-                overlay.attributes("-alpha", 1.0)   # 不再用窗口 alpha
-                _update_canvas(_ref["dim_base"])
-            except Exception:
-                pass
+        self.geometry(f"{vw}x{vh}+{vx}+{vy}")
+        self.attributes("-alpha", 0.25)   # 旧式半透明遮罩，立即可见
+        self.deiconify()
+        self.attributes("-topmost", True)
+        self.lift()
+        self.focus_force()
+        self.update_idletasks()
+
+        t_shown = _time.perf_counter()
+        if self._tr:
+            self._tr.mark("overlay_shown", t_shown)
+        base = t_hotkey if t_hotkey is not None else t_open
+        ms = (t_shown - base) * 1000
+        self._latency = (self._latency + [ms])[-50:]
+        avg = sum(self._latency) / len(self._latency)
+        _hklog(f"[延迟] 热键→遮罩可见 {ms:.1f}ms（窗口复用 {(t_shown - t_open) * 1000:.1f}ms，"
+               f"近 {len(self._latency)} 次均值 {avg:.1f}ms）", with_kbd_state=False)
+
+    def _hide(self):
+        self.withdraw()
+        # 释放大图引用，隐藏期间不占内存
+        self._canvas.delete("all")
+        self._ref = {}
 
-        threading.Thread(target=_init_bg, daemon=True).start()
-
-        state = {"sx": 0, "sy": 0}
-
-        def on_press(e):
-            state["sx"], state["sy"] = e.x_root, e.y_root
-            canvas.delete("hint")
-
-        def _redraw(cx1, cy1, cx2, cy2):
-            """主线程：选区亮显（仅 PIL 就绪后才合成）"""
-            if _ref["ready"] and _ref["full_canvas"] and _ref["dim_base"]:
-                composite = _ref["dim_base"].copy()
-                bx1, by1 = max(0, int(cx1)), max(0, int(cy1))
-                bx2, by2 = min(vw, int(cx2)), min(vh, int(cy2))
-                if bx2 > bx1 and by2 > by1:
-                    patch = _ref["full_canvas"].crop((bx1, by1, bx2, by2))
-                    composite.paste(patch, (bx1, by1))
-                _update_canvas(composite)
-            # 绿色选框
-            canvas.delete("sel_rect")
-            canvas.create_rectangle(
-                int(cx1), int(cy1), int(cx2), int(cy2),
-                outline="#22cc44", width=2, tags="sel_rect"
+    def _is_current(self, gen):
+        return gen == self._gen and self.winfo_viewable()
+
+    # ── 背景合成 ─────────────────────────────
+    def _update_canvas(self, pil_img):
+        """主线程：把 PIL Image 渲染到 canvas 背景"""
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(pil_img)
+        c = self._canvas
+        c.delete("bg")
+        c.create_image(0, 0, anchor="nw", image=photo, tags="bg")
+        c.tag_lower("bg")
+        self._ref["photo"] = photo
+
+    def _init_bg(self, gen, ref):
+        """后台线程：截全屏 → 准备合成底图（不阻塞 UI）"""
+        from PIL import Image, ImageGrab
+        try:
+            vx, vy, vw, vh = self._geom
+            dpi_sx, dpi_sy = self._dpi
+            sc_bbox = (
+                int(vx * dpi_sx), int(vy * dpi_sy),
+                int((vx + vw) * dpi_sx), int((vy + vh) * dpi_sy),
             )
-            canvas.tag_raise("sel_rect")
-            _ref["pending"] = False
+            full_img    = ImageGrab.grab(bbox=sc_bbox, all_screens=True)
+            full_canvas = full_img.resize((vw, vh), Image.BILINEAR)
+            dark_overlay = Image.new("RGB", (vw, vh), (0, 0, 0))
+            dim_base    = Image.blend(full_canvas, dark_overlay, 0.25)
+            ref["full_img"]    = full_img
+            ref["full_canvas"] = full_canvas
+            ref["dim_base"]    = dim_base
+            ref["ready"]       = True
+            # 切换到 PIL 合成模式（去掉窗口 alpha，改用图像控制亮度）
+            self._app._ui.post(lambda: self._activate_composite(gen), key="sel_composite")
+        except Exception:
+            pass   # 保持旧式 alpha 模式即可
 
-        def on_drag(e):
-            if _ref["pending"]:
-                return
-            x1, y1 = state["sx"], state["sy"]
-            x2, y2 = e.x_root, e.y_root
-            cx1 = min(x1, x2) - vx
-            cy1 = min(y1, y2) - vy
-            cx2 = max(x1, x2) - vx
-            cy2 = max(y1, y2) - vy
-            if cx2 - cx1 < 3 or cy2 - cy1 < 3:
-                return
-            _ref["pending"] = True
-            overlay.after(20, lambda a=cx1,b=cy1,c=cx2,d=cy2: _redraw(a, b, c, d))
+    def _activate_composite(self, gen):
+        """主线程：PIL 就绪后，切换到合成图模式"""
+        if not self._is_current(gen):
+            return
+        try:
+            self.attributes("-alpha", 1.0)   # 不再用窗口 alpha
+            for r in self._regions:          # 多区域：补上 PIL 就绪前已选的区域
+                self._brighten(r)
+            self._update_canvas(self._ref["dim_base"])
+        except Exception:
+            pass
 
-        def on_release(e):
-            x1, y1 = state["sx"], state["sy"]
-            x2, y2 = e.x_root, e.y_root
-            overlay.destroy()
+    def _brighten(self, region):
+        """多区域：把已选区域永久亮显到暗色底图上"""
+        ref = self._ref
+        if not ref.get("ready"):
+            return
+        vx, vy, vw, vh = self._geom
+        lx1, ly1, lx2, ly2 = region
+        bx1, by1 = max(0, lx1 - vx), max(0, ly1 - vy)
+        bx2, by2 = min(vw, lx2 - vx), min(vh, ly2 - vy)
+        if bx2 > bx1 and by2 > by1:
+            ref["dim_base"] = ref["dim_base"].copy()
+            ref["dim_base"].paste(ref["full_canvas"].crop((bx1, by1, bx2, by2)), (bx1, by1))
+
+    # ── 鼠标交互 ─────────────────────────────
+    def _on_press(self, e):
+        self._state["sx"], self._state["sy"] = e.x_root, e.y_root
+        self._canvas.delete("hint")
+
+    def _redraw(self, gen, cx1, cy1, cx2, cy2):
+        """主线程：选区亮显（仅 PIL 就绪后才合成）"""
+        if not self._is_current(gen):
+            return
+        ref = self._ref
+        vw, vh = self._geom[2], self._geom[3]
+        if ref["ready"] and ref["full_canvas"] and ref["dim_base"]:
+            composite = ref["dim_base"].copy()
+            bx1, by1 = max(0, int(cx1)), max(0, int(cy1))
+            bx2, by2 = min(vw, int(cx2)), min(vh, int(cy2))
+            if bx2 > bx1 and by2 > by1:
+                patch = ref["full_canvas"].crop((bx1, by1, bx2, by2))
+                composite.paste(patch, (bx1, by1))
+            self._update_canvas(composite)
+        # 绿色选框
+        c = self._canvas
+        c.delete("sel_rect")
+        c.create_rectangle(
+            int(cx1), int(cy1), int(cx2), int(cy2),
+            outline="#22cc44", width=2, tags="sel_rect"
+        )
+        c.tag_raise("sel_rect")
+        ref["pending"] = False
 
-            lx1, ly1 = int(min(x1, x2)), int(min(y1, y2))
-            lx2, ly2 = int(max(x1, x2)), int(max(y1, y2))
+    def _on_drag(self, e):
+        if self._ref.get("pending"):
+            return
+        vx, vy = self._geom[0], self._geom[1]
+        x1, y1 = self._state["sx"], self._state["sy"]
+        x2, y2 = e.x_root, e.y_root
+        cx1 = min(x1, x2) - vx
+        cy1 = min(y1, y2) - vy
+        cx2 = max(x1, x2) - vx
+        cy2 = max(y1, y2) - vy
+        if cx2 - cx1 < 3 or cy2 - cy1 < 3:
+            return
+        self._ref["pending"] = True
+        self.after(20, lambda g=self._gen, a=cx1, b=cy1, c=cx2, d=cy2:
+                   self._redraw(g, a, b, c, d))
+
+    def _on_release(self, e):
+        app      = self._app
+        callback = self._callback
+        ref      = self._ref
+        tr       = self._tr
+        vx, vy   = self._geom[0], self._geom[1]
+        dpi_sx, dpi_sy = self._dpi
+        x1, y1 = self._state["sx"], self._state["sy"]
+        x2, y2 = e.x_root, e.y_root
+
+        lx1, ly1 = int(min(x1, x2)), int(min(y1, y2))
+        lx2, ly2 = int(max(x1, x2)), int(max(y1, y2))
+
+        if self._multi:
+            self._add_region(lx1, ly1, lx2, ly2)
+            return
+        self._hide()
+        if tr:
+            tr.mark("mouse_release")
 
-            if abs(lx2 - lx1) < 5 or abs(ly2 - ly1) < 5:
-                app.after(0, lambda: app.status("框选区域太小，已取消"))
-                return
+        if abs(lx2 - lx1) < 5 or abs(ly2 - ly1) < 5:
+            app._traces.finish(tr, "cancelled")
+            app._capturing = False   # 释放单例锁
+            app.after(0, lambda: app.status("框选区域太小，已取消"))
+            return
 
-            def _do_grab():
-                full_img = _ref.get("full_img")
+        def _do_grab():
+            from PIL import ImageGrab
+            full_img = ref.get("full_img")
+            if full_img:
+                fx1 = max(0, min(int((lx1 - vx) * dpi_sx), full_img.width))
+                fy1 = max(0, min(int((ly1 - vy) * dpi_sy), full_img.height))
+                fx2 = max(0, min(int((lx2 - vx) * dpi_sx), full_img.width))
+                fy2 = max(0, min(int((ly2 - vy) * dpi_sy), full_img.height))
+                crop_img = full_img.crop((fx1, fy1, fx2, fy2))
+                crop_img.save(TEMP_IMG)
+            else:
+                _time.sleep(0.15)    # 等遮罩真正从屏幕上消失
+                bbox = (int(lx1*dpi_sx), int(ly1*dpi_sy),
+                        int(lx2*dpi_sx), int(ly2*dpi_sy))
+                crop_img = ImageGrab.grab(bbox=bbox, all_screens=True)
+                crop_img.save(TEMP_IMG)
+            if tr:
+                tr.mark("crop_saved", w=crop_img.width, h=crop_img.height)
+            app._ui.post(lambda: callback(TEMP_IMG, lx1, ly1, lx2, ly2, crop_img))
+
+        app._grab_tasks.submit(_do_grab, priority=PRIO_INTERACTIVE)
+
+    # ── 多区域 ───────────────────────────────
+    def _add_region(self, lx1, ly1, lx2, ly2):
+        """多区域：记录一个选区，保留其绿框与序号，继续等待下一次拖动"""
+        c = self._canvas
+        c.delete("sel_rect")
+        if abs(lx2 - lx1) < 5 or abs(ly2 - ly1) < 5:
+            return
+        region = (lx1, ly1, lx2, ly2)
+        self._regions.append(region)
+        self._brighten(region)
+        if self._ref.get("ready"):
+            self._update_canvas(self._ref["dim_base"])
+        vx, vy = self._geom[0], self._geom[1]
+        c.create_rectangle(lx1 - vx, ly1 - vy, lx2 - vx, ly2 - vy,
+                           outline="#22cc44", width=2, tags="multi_rect")
+        c.create_text(lx1 - vx + 4, ly1 - vy + 2, text=str(len(self._regions)),
+                      anchor="nw", fill="#22cc44", font=("微软雅黑", 12, "bold"),
+                      tags="multi_rect")
+        c.tag_raise("multi_rect")
+
+    def _finish_multi(self):
+        if not getattr(self, "_multi", False) or not self.winfo_viewable():
+            return
+        if not self._regions:
+            self._cancel()
+            return
+        app, callback, ref, tr = self._app, self._callback, self._ref, self._tr
+        regions = list(self._regions)
+        vx, vy = self._geom[0], self._geom[1]
+        dpi_sx, dpi_sy = self._dpi
+        self._hide()
+
+        def _do_grab():
+            from PIL import ImageGrab
+            # 全屏截图通常早已就绪；极端情况下稍等，仍没有就逐个区域补截
+            for _ in range(20):
+                if ref.get("full_img"):
+                    break
+                _time.sleep(0.05)
+            full_img = ref.get("full_img")
+            crops = []
+            for lx1, ly1, lx2, ly2 in regions:
                 if full_img:
-                    fx1 = max(0, min(int((lx1 - vx) * dpi_sx), full_img.width))
-                    fy1 = max(0, min(int((ly1 - vy) * dpi_sy), full_img.height))
-                    fx2 = max(0, min(int((lx2 - vx) * dpi_sx), full_img.width))
-                    fy2 = max(0, min(int((ly2 - vy) * dpi_sy), full_img.height))
-                    crop_img = full_img.crop((fx1, fy1, fx2, fy2))
-                    crop_img.save(TEMP_IMG)
+                    crops.append(full_img.crop((
+                        max(0, min(int((lx1 - vx) * dpi_sx), full_img.width)),
+                        max(0, min(int((ly1 - vy) * dpi_sy), full_img.height)),
+                        max(0, min(int((lx2 - vx) * dpi_sx), full_img.width)),
+                        max(0, min(int((ly2 - vy) * dpi_sy), full_img.height)))))
                 else:
-                    import time
-                    time.sleep(0.15)
-                    bbox = (int(lx1*dpi_sx), int(ly1*dpi_sy),
-                            int(lx2*dpi_sx), int(ly2*dpi_sy))
-                    crop_img = ImageGrab.grab(bbox=bbox, all_screens=True)
-                    crop_img.save(TEMP_IMG)
-                app.after(0, lambda: callback(TEMP_IMG, lx1, ly1, lx2, ly2, crop_img))
-
-            threading.Thread(target=_do_grab, daemon=True).start()
-
-        def _cancel(e=None):
-            overlay.destroy()
-            app._capturing = False   # 释放单例锁
-            app.status("已取消截图")
+                    crops.append(ImageGrab.grab(bbox=(int(lx1*dpi_sx), int(ly1*dpi_sy),
+                                                      int(lx2*dpi_sx), int(ly2*dpi_sy)),
+                                                all_screens=True))
+            if tr:
+                tr.mark("crop_saved", regions=len(crops))
+            app._ui.post(lambda: callback(regions, crops))
+
+        app._grab_tasks.submit(_do_grab, priority=PRIO_INTERACTIVE)
+
+    def _cancel(self, e=None):
+        self._hide()
+        self._app._traces.finish(getattr(self, "_tr", None), "cancelled")
+        self._app._capturing = False   # 释放单例锁
+        self._app.status("已取消截图")
+        return "break"
+
+    def _rclick_press(self, e):   return "break"
+    def _rclick_release(self, e):
+        if getattr(self, "_multi", False) and self._regions:
+            self._finish_multi()
             return "break"
+        return self._cancel()
+
 
-        def _rclick_press(e):   return "break"
-        def _rclick_release(e): return _cancel()
+def _pixel_hash(pil_img) -> str:
+    """整图像素指纹（blake2b，内存带宽级速度），用于判断选区画面是否变化"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{pil_img.mode}{pil_img.size}".encode())
+    h.update(pil_img.tobytes())
+    return h.hexdigest()
 
-        canvas.bind("<ButtonPress-1>",   on_press)
-        canvas.bind("<B1-Motion>",       on_drag)
-        canvas.bind("<ButtonRelease-1>", on_release)
-        canvas.bind("<ButtonPress-3>",   _rclick_press)
-        canvas.bind("<ButtonRelease-3>", _rclick_release)
-        overlay.bind("<ButtonPress-3>",  _rclick_press)
-        overlay.bind("<ButtonRelease-3>",_rclick_release)
-        overlay.bind("<Escape>", _cancel)
 
-    app.after(0, _open)
+def grab_region(app, callback, mode_name="", t_hotkey=None, multi=False):
+    """在主线程中打开截图遮罩，完成后调用 callback(image_path, lx1,ly1,lx2,ly2, crop_img)
+    复用 app 上预先创建好的 SelectionOverlay（不存在或已被销毁时重新创建）。
+    """
+    sel = getattr(app, "_selector", None)
+    try:
+        alive = sel is not None and sel.winfo_exists()
+    except Exception:
+        alive = False
+    if not alive:
+        sel = app._selector = SelectionOverlay(app)
+    sel.open(callback, mode_name, t_hotkey, multi=multi)
 
 
 
@@ -493,30 +489,68 @@ class InPlaceOverlay(Toplevel):
     - 以截图原图作 Canvas 背景，背景/中文/图标等一概不变
     - 仅在 OCR 文字坐标处直接渲染译文（无任何底色块）
     - 字体颜色从截图对应区域自动采样
+    窗口与工具条只创建一次：show() 重置并重新定位，关闭时仅隐藏，供下一次截图复用。
     ❗ 必须在主线程中创建！
     """
 
-    def __init__(self, parent, lx1: int, ly1: int, lx2: int, ly2: int,
-                 mode: str, bg_img=None, dpi_scale=(1.0, 1.0)):
+    def __init__(self, parent):
+        t0 = _time.perf_counter()
         super().__init__(parent)
+        self.withdraw()
         self.overrideredirect(True)
         self.attributes("-topmost", True)
         self.configure(bg="black",
                        highlightthickness=2,
                        highlightbackground="#22cc44")
+        self._parent    = parent
+        self._session   = 0         # 每次 show/隐藏 +1，过期的后台结果据此丢弃
+        self.token      = CancelToken()
+        self._paint_ms  = []        # 最近若干次 show→首帧 耗时（ms）
+        self._reset_state("translate", None, (1.0, 1.0))
+        self._px = self._py = 0
+        self._win_w, self._win_h = 200, 40
+
+        self._canvas = Canvas(self, bg="black", highlightthickness=0)
+        self._canvas.pack(fill=tk.BOTH, expand=True)
+
+        self._fallback_var = tk.StringVar(value="")
+        self._fallback_lbl = tk.Label(
+            self, textvariable=self._fallback_var,
+            bg="white", fg="#111111",
+            font=("微软雅黑", 11), wraplength=184,
+            justify=tk.LEFT, anchor="nw", padx=8, pady=6
+        )
+
+        self._build_toolbar()
+        self.bind("<Escape>", lambda e: self._close_all())
+        # 构建开销只在此处付一次，与 show() 的首帧耗时对照即可看出复用收益
+        _hklog(f"[延迟] 结果层预建 {(_time.perf_counter() - t0) * 1000:.1f}ms（仅一次）",
+               with_kbd_state=False)
+
+    def _reset_state(self, mode, bg_img, dpi_scale):
         self._mode      = mode
         self._ocr_txt   = ""
         self._tr_txt    = ""
         self._last_items     = None     # 存储 OCR items，用于译文/原文切换
         self._showing_original = False  # 当前是否显示原文
-        self._toggle_btn     = None     # 原文/译文 切换按钮引用
-        self._parent    = parent
-        self._toolbar   = None
         self._text_ids  = []
         self._bg_img    = bg_img
         self._dpi_scale = dpi_scale
         self._photo_ref = None
-
+        self._stream_items = []         # 流式：已框出的原文行（与译文逐行对应）
+        self._stream_tr    = []         # 流式：已到达的译文，未到为 None
+        self._erased       = None       # 流式：已抹掉部分原文的背景图
+
+    def show(self, lx1: int, ly1: int, lx2: int, ly2: int,
+             mode: str, bg_img=None, dpi_scale=(1.0, 1.0)) -> int:
+        """为新的截图结果重置并显示，返回本次会话号（set_ocr/set_trans 用于校验）"""
+        t0 = _time.perf_counter()
+        self._session += 1
+        self.token.cancel()
+        self.token = CancelToken()      # 本次结果的后台任务随弹窗关闭一起取消
+        self._reset_state(mode, bg_img, dpi_scale)
+
+        parent = self._parent
         sw = parent.winfo_screenwidth()
         sh = parent.winfo_screenheight()
         w  = max(lx2 - lx1, 200)
@@ -526,38 +560,62 @@ class InPlaceOverlay(Toplevel):
         self._win_w, self._win_h = w, h
         self.geometry(f"{w}x{h}+{self._px}+{self._py}")
 
-        self._canvas = Canvas(self, bg="black", highlightthickness=0,
-                              width=w, height=h)
-        self._canvas.pack(fill=tk.BOTH, expand=True)
+        c = self._canvas
+        c.delete("all")
+        c.configure(width=w, height=h, bg="black")
+        self._fallback_lbl.place_forget()
+        self._fallback_var.set("")
+        self._fallback_lbl.configure(wraplength=w - 16)
 
         if bg_img:
             self._render_bg(bg_img, w, h)
             if mode == "translate":
-                self._canvas.create_text(
+                c.create_text(
                     w // 2, h // 2, text="翻译中\u2026",
                     fill="#ffffff", font=("微软雅黑", 13), tags="loading"
                 )
         else:
-            self._canvas.configure(bg="white")
-            self._canvas.create_text(
+            c.configure(bg="white")
+            c.create_text(
                 w // 2, h // 2,
                 text="翻译中\u2026" if mode == "translate" else "识别中\u2026",
                 fill="#111111", font=("微软雅黑", 11), tags="loading"
             )
 
-        self._fallback_var = tk.StringVar(value="")
-        self._fallback_lbl = tk.Label(
-            self, textvariable=self._fallback_var,
-            bg="white", fg="#111111",
-            font=("微软雅黑", 11), wraplength=w - 16,
-            justify=tk.LEFT, anchor="nw", padx=8, pady=6
-        )
-
-        self._build_toolbar(sh)
+        self._place_toolbar(sh)
+        self.deiconify()
+        self.attributes("-topmost", True)
+        self._toolbar.deiconify()
+        self._toolbar.attributes("-topmost", True)
         self.focus_force()
+        self.update_idletasks()
+
+        ms = (_time.perf_counter() - t0) * 1000
+        self._paint_ms = (self._paint_ms + [ms])[-50:]
+        _hklog(f"[延迟] 结果层首帧 {ms:.1f}ms（复用窗口，近 {len(self._paint_ms)} 次均值 "
+               f"{sum(self._paint_ms) / len(self._paint_ms):.1f}ms）", with_kbd_state=False)
+        return self._session
+
+    def is_current(self, session) -> bool:
+        return session is None or session == self._session
+
+    def dismiss(self):
+        """隐藏窗口与工具条（不销毁），并取消进行中的后台任务"""
+        self._session += 1
+        self.token.cancel()
+        for w in (self._toolbar, self):
+            try:
+                w.withdraw()
+            except Exception:
+                pass
+        try:
+            self._canvas.delete("all")
+        except Exception:
+            pass
+        self._reset_state(self._mode, None, self._dpi_scale)
 
     def _render_bg(self, pil_img, w, h):
-        from PIL import ImageTk
+        from PIL import Image, ImageTk
         try:
             display = pil_img.resize((w, h), Image.BILINEAR)
             photo = ImageTk.PhotoImage(display)
@@ -569,116 +627,49 @@ class InPlaceOverlay(Toplevel):
             pass
 
     def _erase_text_regions(self, pil_img, items):
-        """
-        把 OCR 识别到的每个文字区域用周边背景色填充，
-        彻底抹去原文像素，避免翻译文字与原文叠加错乱。
-        返回处理后的新 PIL Image（不修改原图）。
-        """
-        from PIL import ImageDraw
-        img  = pil_img.copy().convert("RGB")
-        draw = ImageDraw.Draw(img)
-        iw, ih = img.size
-        BORDER = 4          # 向外采样这么多像素作为背景色
-
-        for item in items:
-            x1 = max(0, int(item.get("left",  0)))
-            y1 = max(0, int(item.get("top",   0)))
-            x2 = min(iw, int(item.get("right", 0)))
-            y2 = min(ih, int(item.get("bottom",0)))
-            if x2 <= x1 or y2 <= y1:
-                continue
-
-            # 采样四条边外侧的像素作为背景色估计
-            border_pixels = []
-            # 上边
-            for bx in range(max(0, x1 - BORDER), min(iw, x2 + BORDER)):
-                for by in range(max(0, y1 - BORDER), y1):
-                    border_pixels.append(img.getpixel((bx, by))[:3])
-            # 下边
-            for bx in range(max(0, x1 - BORDER), min(iw, x2 + BORDER)):
-                for by in range(y2, min(ih, y2 + BORDER)):
-                    border_pixels.append(img.getpixel((bx, by))[:3])
-            # 左边
-            for bx in range(max(0, x1 - BORDER), x1):
-                for by in range(y1, y2):
-                    border_pixels.append(img.getpixel((bx, by))[:3])
-            # 右边
-            for bx in range(x2, min(iw, x2 + BORDER)):
-                for by in range(y1, y2):
-                    border_pixels.append(img.getpixel((bx, by))[:3])
-
-            if border_pixels:
-                r = sum(p[0] for p in border_pixels) // len(border_pixels)
-                g = sum(p[1] for p in border_pixels) // len(border_pixels)
-                b = sum(p[2] for p in border_pixels) // len(border_pixels)
-                fill = (r, g, b)
-            else:
-                fill = (240, 240, 240)
-
-            # 填充文字区域（稍微向外扩 1px 覆盖边缘）
-            draw.rectangle(
-                [max(0, x1 - 1), max(0, y1 - 1),
-                 min(iw, x2 + 1), min(ih, y2 + 1)],
-                fill=fill
-            )
-        return img
+        """抹去原文像素（与离屏译图共用 overlay_render 的实现）"""
+        from overlay_render import erase_text_regions
+        return erase_text_regions(pil_img, items)
 
     def _sample_text_color(self, x1, y1, x2, y2):
-        if not self._bg_img:
-            return "#ffffff"
-        try:
-            iw, ih = self._bg_img.size
-            rx1, ry1 = max(0, x1), max(0, y1)
-            rx2, ry2 = min(iw, x2), min(ih, y2)
-            if rx2 <= rx1 or ry2 <= ry1:
-                return "#ffffff"
-            region = self._bg_img.crop((rx1, ry1, rx2, ry2)).convert("RGB")
-            pixels = list(region.getdata())
-            if not pixels:
-                return "#ffffff"
-            brightnesses = [(r * 299 + g * 587 + b * 114) // 1000 for r, g, b in pixels]
-            avg_br = sum(brightnesses) // len(brightnesses)
-            if avg_br > 128:
-                cands = [pixels[i] for i, b in enumerate(brightnesses) if b < avg_br - 30]
-                if not cands:
-                    return "#111111"
-            else:
-                cands = [pixels[i] for i, b in enumerate(brightnesses) if b > avg_br + 30]
-                if not cands:
-                    return "#ffffff"
-            r = sum(p[0] for p in cands) // len(cands)
-            g = sum(p[1] for p in cands) // len(cands)
-            b = sum(p[2] for p in cands) // len(cands)
-            return f"#{r:02x}{g:02x}{b:02x}"
-        except Exception:
-            return "#ffffff"
+        from overlay_render import sample_text_color
+        return sample_text_color(self._bg_img, x1, y1, x2, y2)
 
-    def _build_toolbar(self, sh):
+    def _build_toolbar(self):
         tb = Toplevel(self._parent)
+        tb.withdraw()
         tb.overrideredirect(True)
         tb.attributes("-topmost", True)
         tb.configure(bg="#2b2b2b")
         self._toolbar = tb
-        TW, TH = 240, 34
-        tx = self._px + (self._win_w - TW) // 2
-        ty = self._py + self._win_h + 3
-        if ty + TH > sh - 10:
-            ty = self._py - TH - 3
-        tb.geometry(f"{TW}x{TH}+{tx}+{ty}")
         bar = tk.Frame(tb, bg="#2b2b2b")
         bar.pack(fill=tk.BOTH, expand=True, padx=4, pady=3)
-        self._tbtn(bar, "\U0001f4cb 复制", self._do_copy).pack(side=tk.LEFT, padx=4)
-        if self._mode == "translate":
-            btn = self._tbtn(bar, "原文", self._toggle_view)
-            btn.pack(side=tk.LEFT, padx=2)
-            self._toggle_btn = btn
+        self._copy_btn = self._tbtn(bar, "\U0001f4cb 复制", self._do_copy)
+        self._copy_btn.pack(side=tk.LEFT, padx=4)
+        # 仅翻译模式显示的按钮：show() 时按模式 pack / pack_forget
+        self._toggle_btn = self._tbtn(bar, "原文", self._toggle_view)
+        self._save_btn   = self._tbtn(bar, "\U0001f4be 保存", self._do_save)
         self._tbtn(bar, "\xd7", self._close_all,
                    fg="#ff5555", bg="#3d2222").pack(side=tk.RIGHT, padx=4)
         self._tbtn(bar, "\u2713", self._close_all,
                    fg="#44dd44", bg="#1e3323").pack(side=tk.RIGHT, padx=2)
-        self.bind("<Escape>", lambda e: self._close_all())
         tb.bind("<Escape>", lambda e: self._close_all())
 
+    def _place_toolbar(self, sh):
+        if self._mode == "translate":
+            self._toggle_btn.config(text="原文")
+            self._toggle_btn.pack(side=tk.LEFT, padx=2, after=self._copy_btn)
+            self._save_btn.pack(side=tk.LEFT, padx=2, after=self._toggle_btn)
+        else:
+            self._toggle_btn.pack_forget()
+            self._save_btn.pack_forget()
+        TW, TH = 300 if self._mode == "translate" else 240, 34
+        tx = self._px + (self._win_w - TW) // 2
+        ty = self._py + self._win_h + 3
+        if ty + TH > sh - 10:
+            ty = self._py - TH - 3
+        self._toolbar.geometry(f"{TW}x{TH}+{tx}+{ty}")
+
     def _tbtn(self, parent, text, cmd, fg="#cccccc", bg="#3a3a3a"):
         return tk.Button(parent, text=text, bg=bg, fg=fg,
                          font=("微软雅黑", 9), bd=0, relief=tk.FLAT,
@@ -686,7 +677,9 @@ class InPlaceOverlay(Toplevel):
                          activebackground=bg, activeforeground=fg,
                          command=cmd)
 
-    def set_ocr(self, text: str):
+    def set_ocr(self, text: str, session=None):
+        if not self.is_current(session):
+            return
         self._ocr_txt = text
         if self._mode == "ocr":
             self._canvas.delete("loading")
@@ -696,7 +689,9 @@ class InPlaceOverlay(Toplevel):
                 width=self._win_w - 16, tags="ocr_text"
             )
 
-    def set_trans(self, text: str, items=None):
+    def set_trans(self, text: str, items=None, session=None):
+        if not self.is_current(session):
+            return
         self._tr_txt       = text
         self._last_items   = items      # 存储 items 供切换用
         self._showing_original = False  # 重置到译文视图
@@ -706,12 +701,12 @@ class InPlaceOverlay(Toplevel):
             return
 
         self._canvas.delete("loading")
+        self._canvas.delete("pending")
         for tid in self._text_ids:
             self._canvas.delete(tid)
         self._text_ids.clear()
         self._fallback_lbl.place_forget()
 
-        dpi_sx, dpi_sy = self._dpi_scale
         w = self._win_w
         h = self._win_h
 
@@ -722,24 +717,14 @@ class InPlaceOverlay(Toplevel):
             # ── 先抹掉背景图中的原文像素，再渲染，避免叠字 ────
             if self._bg_img:
                 erased = self._erase_text_regions(self._bg_img, original_lines)
+                self._erased = erased
                 self._render_bg(erased, w, h)
 
-            for idx, item in enumerate(original_lines):
-                t_txt = translated_lines[idx]
-                px1, py1 = int(item["left"]),  int(item["top"])
-                px2, py2 = int(item["right"]), int(item["bottom"])
-                cx  = int(px1 / dpi_sx)
-                cy  = int(py1 / dpi_sy)
-                row_h_px = py2 - py1
-                font_pt  = max(8, min(18, int(row_h_px / dpi_sy * 0.85)))
-                fg_color = self._sample_text_color(px1, py1, px2, py2)
-                tid = self._canvas.create_text(
-                    cx, cy, text=t_txt,
-                    fill=fg_color,
-                    font=("微软雅黑", font_pt),
-                    anchor="nw", tags="trans_text"
-                )
-                self._text_ids.append(tid)
+            # 按框宽高选字号并折行（字形步进已缓存，几百个框也只需几毫秒）
+            fits = fit_items(original_lines, translated_lines,
+                             tk_metrics(TRANS_FONT, root=self), self._dpi_scale)
+            for i, (item, (cx, cy, fit)) in enumerate(zip(original_lines, fits)):
+                self._draw_trans(i, item, cx, cy, fit)
         else:
             if self._bg_img:
                 self._render_bg(self._bg_img, w, h)
@@ -747,6 +732,80 @@ class InPlaceOverlay(Toplevel):
             self._fallback_lbl.configure(wraplength=w - 16)
             self._fallback_lbl.place(x=0, y=0, width=w)
 
+    def _draw_trans(self, i, item, cx, cy, fit):
+        px1, py1 = int(item["left"]),  int(item["top"])
+        px2, py2 = int(item["right"]), int(item["bottom"])
+        fg_color = self._sample_text_color(px1, py1, px2, py2)
+        tid = self._canvas.create_text(
+            cx, cy, text="\n".join(fit.lines),
+            fill=fg_color,
+            font=(TRANS_FONT, -fit.px),      # 负数 = 像素字号
+            anchor="nw", tags=("trans_text", f"line{i}")
+        )
+        self._text_ids.append(tid)
+
+    # ── 流式渲染：先框出原文位置，译文分块到达后逐块填入 ──
+    def add_items(self, items, session=None):
+        """OCR 每给出一批文字框（只含非空行），先在原文位置画出高亮框"""
+        if not self.is_current(session) or self._mode != "translate":
+            return
+        self._canvas.delete("loading")
+        sx, sy = self._dpi_scale
+        for it in items:
+            i = len(self._stream_items)
+            self._stream_items.append(it)
+            self._stream_tr.append(None)
+            if not self._showing_original:
+                self._canvas.create_rectangle(
+                    it["left"] / sx - 1, it["top"] / sy - 1, it["right"] / sx + 1, it["bottom"] / sy + 1,
+                    outline="#22cc44", width=1, dash=(3, 2), tags=("pending", f"pend{i}"))
+
+    def fill_trans(self, start: int, texts, session=None):
+        """
+        一块译文到达：抹掉这几行的原文像素并画上译文，其余行保持高亮等待。
+        空串表示该行已并入上一行（块内行数对不上时整段译文在首行），合并成一个外接框排版。
+        """
+        if not self.is_current(session) or self._mode != "translate":
+            return
+        items = self._stream_items[start:start + len(texts)]
+        for i, t in enumerate(texts[:len(items)], start):
+            self._stream_tr[i] = t
+        # 复制 / 切换原文 / 保存随时可用：未到的行暂用原文占位
+        self._tr_txt = "\n".join(it["text"] if t is None else t
+                                 for t, it in zip(self._stream_tr, self._stream_items) if t != "")
+        self._last_items = self._stream_items
+        if self._showing_original or not items:
+            return
+        if self._bg_img:
+            self._erased = self._erase_text_regions(self._erased or self._bg_img, items)
+            self._render_bg(self._erased, self._win_w, self._win_h)
+        boxes, box_texts, first = [], [], []
+        for i, (item, t) in enumerate(zip(items, texts), start):
+            self._canvas.delete(f"pend{i}")
+            self._canvas.delete(f"line{i}")
+            if t == "" and boxes:
+                b = boxes[-1]
+                boxes[-1] = dict(b, left=min(b["left"], item["left"]), top=min(b["top"], item["top"]),
+                                 right=max(b["right"], item["right"]), bottom=max(b["bottom"], item["bottom"]))
+                continue
+            boxes.append(item)
+            box_texts.append(t)
+            first.append(i)
+        fits = fit_items(boxes, box_texts, tk_metrics(TRANS_FONT, root=self), self._dpi_scale)
+        for i, item, (cx, cy, fit) in zip(first, boxes, fits):
+            self._draw_trans(i, item, cx, cy, fit)
+
+    def finish_trans(self, text: str, items=None, session=None):
+        """流式结束：记下完整译文；一行也没译出来时按原逻辑整段显示（失败提示）"""
+        if not self.is_current(session):
+            return
+        if not any(self._stream_tr):
+            self.set_trans(text, items, session=session)
+            return
+        self._tr_txt     = text
+        self._last_items = items
+        self._canvas.delete("pending")
+
     def _toggle_view(self):
         """在译文 ↔ 原文之间切换，按钮文字同步更新"""
         if self._showing_original:
@@ -775,6 +834,7 @@ class InPlaceOverlay(Toplevel):
             self._canvas.delete(tid)
         self._text_ids.clear()
         self._canvas.delete("loading")
+        self._canvas.delete("pending")
         self._canvas.delete("ocr_text")
         self._fallback_lbl.place_forget()
         # 还原未抹字版的原始截图背景即可，英文文字已在图中
@@ -783,16 +843,44 @@ class InPlaceOverlay(Toplevel):
 
 
     def _do_copy(self):
+        import pyperclip
         t = self._tr_txt or self._ocr_txt
         if t:
             pyperclip.copy(t)
 
+    def _do_save(self):
+        """把当前译图（抹字背景 + 译文）离屏渲染后另存为图片"""
+        from overlay_render import save_translated
+        if not self._bg_img or not self._tr_txt:
+            return
+        translated_lines = [l.strip() for l in self._tr_txt.split("\n") if l.strip()]
+        original_lines   = [it for it in (self._last_items or []) if it.get("text", "").strip()]
+        items, texts, note = original_lines, translated_lines, ""
+        if len(translated_lines) != len(original_lines) and original_lines:
+            # 行数对不上无法逐行对位：抹掉全部原文，把整段译文排进所有文字框的外接矩形
+            items = [{"text": "\n".join(it["text"] for it in original_lines),
+                      "left":   min(it["left"]   for it in original_lines),
+                      "top":    min(it["top"]    for it in original_lines),
+                      "right":  max(it["right"]  for it in original_lines),
+                      "bottom": max(it["bottom"] for it in original_lines)}]
+            texts = [" ".join(translated_lines)]
+            note  = "（译文与原文行数不一致，已整段排版）"
+        from tkinter import filedialog
+        tgt = filedialog.asksaveasfilename(parent=self, defaultextension=".png",
+                                           initialfile="translated.png",
+                                           filetypes=[("PNG图片", "*.png")])
+        if not tgt:
+            return
+        try:
+            save_translated(self._bg_img, items, texts, tgt)
+            self._parent._toast("✅ 译图已保存" + note)
+        except Exception as e:
+            self._parent._toast(f"保存失败: {e}")
+
     def _close_all(self):
-        for w in (self._toolbar, self):
-            try:
-                if w: w.destroy()
-            except Exception:
-                pass
+        self.dismiss()
+        if getattr(self._parent, "_active_popup", None) is self:
+            self._parent._active_popup = None
 
     def destroy(self):
         try:
@@ -807,12 +895,60 @@ class InPlaceOverlay(Toplevel):
 
 
 
-try:
-    import pystray as _pystray
-    _PYSTRAY = True
-except ImportError:
-    _PYSTRAY = False
-    print("[提示] 运行 pip install pystray 以启用系统托盘")
+# ─────────────────────────────────────────────
+#  区域监视滚动面板（只显示新增行，轻量 Label 列表）
+# ─────────────────────────────────────────────
+class WatchOverlay(Toplevel):
+    MAX_LINES = 8
+
+    def __init__(self, parent, lx1, ly1, lx2, ly2, on_close=None):
+        super().__init__(parent)
+        self.overrideredirect(True)
+        self.attributes("-topmost", True)
+        self.attributes("-alpha", 0.88)
+        self.configure(bg="#1e1e2e")
+        self._on_close = on_close
+        self._lines = []
+
+        sh = parent.winfo_screenheight()
+        w  = max(lx2 - lx1, 260)
+        h  = 22 * self.MAX_LINES + 12
+        y  = ly2 + 4 if ly2 + 4 + h < sh else max(0, ly1 - h - 4)
+        self.geometry(f"{w}x{h}+{lx1}+{y}")
+
+        self._var = tk.StringVar(value="监视中\u2026")
+        tk.Label(self, textvariable=self._var, bg="#1e1e2e", fg=TEXT,
+                 font=("微软雅黑", 10), justify=tk.LEFT, anchor="sw",
+                 wraplength=w - 16, padx=8, pady=6).pack(fill=tk.BOTH, expand=True)
+        tk.Button(self, text="\xd7", bg="#3d2222", fg="#ff5555", bd=0,
+                  font=("微软雅黑", 9), cursor="hand2",
+                  command=self._close).place(relx=1.0, x=-2, y=2, anchor="ne")
+
+    def push(self, lines):
+        """追加新行，只保留最近 MAX_LINES 行"""
+        self._lines = (self._lines + [l.strip() for l in lines if l.strip()])[-self.MAX_LINES:]
+        self._var.set("\n".join(self._lines))
+
+    def _close(self):
+        if self._on_close:
+            self._on_close()
+        else:
+            self.destroy()
+
+
+_pystray = None
+
+def _import_pystray():
+    """托盘库推迟到主窗口显示之后再导入（导入本身要加载 win32 相关模块）"""
+    global _pystray
+    if _pystray is None:
+        try:
+            import pystray
+            _pystray = pystray
+        except ImportError:
+            _pystray = False
+            print("[提示] 运行 pip install pystray 以启用系统托盘")
+    return _pystray
 
 # ─────────────────────────────────────────────
 #  紧凑浮动工具条（主窗口）
@@ -869,7 +1005,9 @@ class Win32HotkeyManager:
                         action = actions.get(msg.wParam)
                         if action:
                             # 必须通过 tkinter.after 在主线程执行，避免跨线程调用异常
-                            self.app.after(0, lambda a=action: self.callback(a))
+                            # 同时带上热键到达时刻，用于统计 热键→遮罩可见 延迟
+                            ts = _time.perf_counter()
+                            self.app.after(0, lambda a=action, t=ts: self.callback(a, t))
                     elif msg.message == 0x0012: # WM_QUIT
                         break
                     user32.TranslateMessage(ctypes.byref(msg))
@@ -903,16 +1041,21 @@ class CompactBar(tk.Tk):
 
     def __init__(self):
         super().__init__()
+        _BOOT.mark("tk_root")
         self.overrideredirect(True)
         self.attributes("-topmost", True)
         self.configure(bg=self.BAR_BG)
         self.resizable(False, False)
+        cfg = _load_config()
+        # 快速启动：托盘、遮罩/结果层预建、扫码预热、历史库等到工具条显示后再做
+        self._lazy = cfg.get("startup", {}).get("lazy", True)
 
         self._tray   = None
         self._dx = self._dy = 0
         self.engine_var = StringVar(self, value="腾讯翻译")
         self.lang_var   = StringVar(self, value="zh")
         self._dpi_scale = self._calc_dpi()
+        _BOOT.mark("dpi")
         
         # 设置窗口图标
         ico_path = os.path.join(_RES_DIR, "icon.ico")
@@ -927,17 +1070,106 @@ class CompactBar(tk.Tk):
         self.geometry(f"+{(sw - 330) // 2}+0")
 
         self._build()
+        _BOOT.mark("build")
+        # 所有界面触发的后台工作共用一个有界线程池
+        self._ui = UIQueue(self, interval_ms=16,
+                           on_error=lambda e: _hklog(f"[界面更新异常] {e}", "error", with_kbd_state=False))
+        self._tasks = TaskExecutor(
+            workers=cfg.get("executor", {}).get("workers", 3), name="wxocr",
+            on_error=lambda name, e: _hklog(f"[任务异常] {name}: {e}", "error", with_kbd_state=False))
+        # 截屏 / 裁剪单独一个线程：不排在 OCR、网络翻译后面，遮罩出现前就能截到干净的全屏
+        self._grab_tasks = TaskExecutor(
+            workers=2, name="wxocr-grab",
+            on_error=lambda name, e: _hklog(f"[任务异常] {name}: {e}", "error", with_kbd_state=False))
+        self._traces = TraceBook()    # 每次截图的分阶段耗时，供诊断面板查看
+        self._trace  = None
+        self._selector = None         # 预建并隐藏的选区遮罩，截图时直接复用
+        self._overlay  = None         # 预建并隐藏的结果层与工具条
+        self._history  = None
+        self._service  = None         # 本机 OCR / 翻译服务（config: service.enabled）
         self._registered_hotkeys = {}   # 记录已注册热键 {action: combo}
         self._hotkey_mgr = Win32HotkeyManager(self, self._cap)
         self._register_hotkeys()
-        self._setup_tray()
+        _BOOT.mark("hotkeys")
         # watchdog 不再需要，Win32 API 安全稳定不再掉签
+        if self._lazy:
+            self.after_idle(self._after_first_show)
+        else:
+            self._deferred_init()
+            self.after_idle(self._log_startup)
+
+    # ── 启动 ─────────────────────────────────
+    def _after_first_show(self):
+        """工具条已画出：记录启动耗时，再逐步完成其余初始化（每步之间让出事件循环）"""
+        self._log_startup()
+        self.after(50, self._deferred_init)
+
+    def _deferred_init(self):
+        t0 = _time.perf_counter()
+        if self._selector is None:
+            self._selector = SelectionOverlay(self)
+        if self._overlay is None:
+            self._overlay = InPlaceOverlay(self)
+        self._setup_tray()
+        # 扫码检测器加载较慢，空闲时预热，首次扫码不再等待
+        self._tasks.submit(qr_scan.warmup, priority=PRIO_BACKGROUND, name="qr_warmup")
+        self._tasks.submit(self._open_history, priority=PRIO_BACKGROUND, name="history_open")
+        self._tasks.submit(self._start_service, priority=PRIO_BACKGROUND, name="service_start")
+        # 翻译记忆条目多时建索引要几秒，空闲时先载入，首次翻译不再等待
+        self._tasks.submit(_tm.get, self.lang_var.get(), priority=PRIO_BACKGROUND, name="tm_load")
+        _hklog(f"[启动] 延后初始化 {(_time.perf_counter() - t0) * 1000:.0f}ms"
+               f"（遮罩 / 结果层 / 托盘）", with_kbd_state=False)
+
+    def _open_history(self):
+        hcfg = _load_config().get("history", {})
+        if not hcfg.get("enabled", True):
+            return
+        try:
+            self._history = HistoryStore(HISTORY_DB, max_mb=hcfg.get("max_mb", 200))
+        except Exception as e:
+            _hklog(f"[历史记录] 打开失败: {e}", "error", with_kbd_state=False)
+
+    def _start_service(self):
+        """让脚本通过 localhost 共用本进程已初始化的 OCR 引擎（wcocr.init 只能由一个进程持有）"""
+        scfg = _load_config().get("service", {})
+        if not scfg.get("enabled", False):
+            return
+        try:
+            from wxocr_core.service import OcrService
+            self._service = OcrService(
+                port=scfg.get("port", 8765), engine=_ENGINE,
+                window_ms=scfg.get("batch_window_ms", 15), max_batch=scfg.get("max_batch", 8),
+                log=lambda m: _hklog(f"[服务] {m}", "debug", with_kbd_state=False)).start()
+            _hklog(f"[服务] 已监听 127.0.0.1:{self._service.port}", with_kbd_state=False)
+        except Exception as e:
+            _hklog(f"[服务] 启动失败: {e}", "error", with_kbd_state=False)
+
+    def _log_startup(self):
+        _BOOT.mark("first_show")
+        chain = "  ".join(f"{stage}={delta:.0f}" for stage, _, delta in _BOOT.stages()[1:])
+        _hklog(f"[启动] 首次显示 {_BOOT.total_ms():.0f}ms（lazy={self._lazy}）  {chain}",
+               with_kbd_state=False, dpi=f"{self._dpi_scale[0]:.2f}")
 
     # ── DPI ──────────────────────────────────
     def _calc_dpi(self):
+        """物理像素 / 逻辑像素。优先用 GetDeviceCaps 查询主屏真实分辨率，
+        不再为了一个比例截整屏；查询失败才退回截图测量。"""
+        lw = self.winfo_screenwidth()
+        lh = self.winfo_screenheight()
         try:
-            lw = self.winfo_screenwidth()
-            lh = self.winfo_screenheight()
+            user32, gdi32 = ctypes.windll.user32, ctypes.windll.gdi32
+            hdc = user32.GetDC(0)
+            try:
+                pw = gdi32.GetDeviceCaps(hdc, 118)     # DESKTOPHORZRES
+                ph = gdi32.GetDeviceCaps(hdc, 117)     # DESKTOPVERTRES
+            finally:
+                user32.ReleaseDC(0, hdc)
+            if pw > 0 and ph > 0:
+                return pw / lw, ph / lh
+        except Exception:
+            pass
+        try:
+            from PIL import ImageGrab     # 只有查询失败才需要 PIL，正常启动不加载
             im = ImageGrab.grab()
             return im.width / lw, im.height / lh
         except Exception:
@@ -969,6 +1201,10 @@ class CompactBar(tk.Tk):
             ("截  图", "screenshot", "alt+3"),
             ("扫  码", "qrcode",    "alt+4"),
             ("生成QR", "gen_qr",    "alt+5"),
+            ("重  译", "repeat",    "alt+6"),
+            ("监  视", "watch",     "alt+7"),
+            ("长截图", "scroll",    "alt+8"),
+            ("多区域", "multi",     "alt+9"),
         ]:
             self._div()
             hk_text = cfg_hk.get(mode, default_hk)
@@ -1026,9 +1262,13 @@ class CompactBar(tk.Tk):
             h3 = cfg.get("screenshot", "alt+3")
             h4 = cfg.get("qrcode",    "alt+4")
             h5 = cfg.get("gen_qr",    "alt+5")
-            _hklog(f"    准备注册 (Win32): translate={h1!r}  ocr={h2!r} screenshot={h3!r} qrcode={h4!r} gen_qr={h5!r}")
+            h6 = cfg.get("repeat",    "alt+6")
+            h7 = cfg.get("watch",     "alt+7")
+            h8 = cfg.get("scroll",    "alt+8")
+            h9 = cfg.get("multi",     "alt+9")
+            _hklog(f"    准备注册 (Win32): translate={h1!r}  ocr={h2!r} screenshot={h3!r} qrcode={h4!r} gen_qr={h5!r} repeat={h6!r} watch={h7!r} scroll={h8!r} multi={h9!r}")
 
-            self._registered_hotkeys = {"translate": h1, "ocr": h2, "screenshot": h3, "qrcode": h4, "gen_qr": h5}
+            self._registered_hotkeys = {"translate": h1, "ocr": h2, "screenshot": h3, "qrcode": h4, "gen_qr": h5, "repeat": h6, "watch": h7, "scroll": h8, "multi": h9}
             self._hotkey_mgr.start(self._registered_hotkeys)
 
             _hklog(f"    热键注册成功: {self._registered_hotkeys}")
@@ -1050,7 +1290,8 @@ class CompactBar(tk.Tk):
 
     # ── 系统托盘 ─────────────────────────────
     def _setup_tray(self):
-        if not _PYSTRAY:
+        from PIL import Image
+        if not _import_pystray():
             return
         
         ico_path = os.path.join(_RES_DIR, "icon.ico")
@@ -1073,6 +1314,7 @@ class CompactBar(tk.Tk):
             _pystray.MenuItem("隐藏窗口",  lambda *_: self.after(0, self.hide_bar)),
             _pystray.Menu.SEPARATOR,
             _pystray.MenuItem("快捷键...", lambda *_: self.after(0, self._hotkeys_dialog)),
+            _pystray.MenuItem("历史记录...", lambda *_: self.after(0, self._history_dialog)),
             _pystray.Menu.SEPARATOR,
             _pystray.MenuItem("退出",      lambda *_: self.after(0, self._quit_all)),
         )
@@ -1093,11 +1335,23 @@ class CompactBar(tk.Tk):
             self.hide_bar()
 
     def _quit_all(self):
+        self._stop_watch()
+        self._stop_scroll()
+        self._tasks.shutdown()
+        self._grab_tasks.shutdown()
+        self._ui.stop()
+        if self._history is not None:
+            try: self._history.close()
+            except Exception: pass
+        if self._service is not None:
+            try: self._service.stop()
+            except Exception: pass
         if self._tray:
             try: self._tray.stop()
             except Exception: pass
         try: getattr(self, '_hotkey_mgr', None) and self._hotkey_mgr.stop()
         except Exception: pass
+        _LOG.close()
         self.destroy()
 
     # ── 设置/快捷键对话框 ────────────────────
@@ -1114,7 +1368,7 @@ class CompactBar(tk.Tk):
         d.configure(bg=BG)
         d.resizable(False, False)
         d.attributes("-topmost", True)
-        d.geometry("380x560")
+        d.geometry("380x680")
         
         def _on_close():
             self._hd_open = False
@@ -1195,6 +1449,38 @@ class CompactBar(tk.Tk):
         hk5_entry.insert(0, cfg_hk.get("gen_qr", "alt+5"))
         _bind_hk_recorder(hk5_entry)
 
+        row6 = tk.Frame(d, bg=BG)
+        row6.pack(fill=tk.X, padx=30, pady=3)
+        tk.Label(row6, text="重译上次选区:", bg=BG, fg=TEXT, font=("微软雅黑", 9)).pack(side=tk.LEFT)
+        hk6_entry = tk.Entry(row6, bg=PANEL, fg=TEXT, insertbackground=TEXT, relief=tk.FLAT, font=("微软雅黑", 9), width=15)
+        hk6_entry.pack(side=tk.RIGHT)
+        hk6_entry.insert(0, cfg_hk.get("repeat", "alt+6"))
+        _bind_hk_recorder(hk6_entry)
+
+        row7 = tk.Frame(d, bg=BG)
+        row7.pack(fill=tk.X, padx=30, pady=3)
+        tk.Label(row7, text="区域监视 (开/关):", bg=BG, fg=TEXT, font=("微软雅黑", 9)).pack(side=tk.LEFT)
+        hk7_entry = tk.Entry(row7, bg=PANEL, fg=TEXT, insertbackground=TEXT, relief=tk.FLAT, font=("微软雅黑", 9), width=15)
+        hk7_entry.pack(side=tk.RIGHT)
+        hk7_entry.insert(0, cfg_hk.get("watch", "alt+7"))
+        _bind_hk_recorder(hk7_entry)
+
+        row8 = tk.Frame(d, bg=BG)
+        row8.pack(fill=tk.X, padx=30, pady=3)
+        tk.Label(row8, text="滚动长截图 (开/关):", bg=BG, fg=TEXT, font=("微软雅黑", 9)).pack(side=tk.LEFT)
+        hk8_entry = tk.Entry(row8, bg=PANEL, fg=TEXT, insertbackground=TEXT, relief=tk.FLAT, font=("微软雅黑", 9), width=15)
+        hk8_entry.pack(side=tk.RIGHT)
+        hk8_entry.insert(0, cfg_hk.get("scroll", "alt+8"))
+        _bind_hk_recorder(hk8_entry)
+
+        row9 = tk.Frame(d, bg=BG)
+        row9.pack(fill=tk.X, padx=30, pady=3)
+        tk.Label(row9, text="多区域翻译:", bg=BG, fg=TEXT, font=("微软雅黑", 9)).pack(side=tk.LEFT)
+        hk9_entry = tk.Entry(row9, bg=PANEL, fg=TEXT, insertbackground=TEXT, relief=tk.FLAT, font=("微软雅黑", 9), width=15)
+        hk9_entry.pack(side=tk.RIGHT)
+        hk9_entry.insert(0, cfg_hk.get("multi", "alt+9"))
+        _bind_hk_recorder(hk9_entry)
+
         tk.Frame(d, bg=BORDER, height=1).pack(fill=tk.X, padx=16, pady=6)
         tk.Label(d, text="🌐  翻译设置", bg=BG, fg=ACCENT,
                  font=("微软雅黑", 11, "bold")).pack()
@@ -1241,7 +1527,7 @@ class CompactBar(tk.Tk):
                   cursor="hand2", command=self._show_log_dialog).pack(side=tk.LEFT, padx=6)
 
         def save_and_close(window):
-            new_cfg = _load_config()
+            new_cfg = dict(_load_config())
             new_cfg["tencent"] = {
                 "secret_id": id_entry.get().strip(),
                 "secret_key": key_entry.get().strip(),
@@ -1252,11 +1538,14 @@ class CompactBar(tk.Tk):
                 "ocr": hk2_entry.get().strip() or "alt+2",
                 "screenshot": hk3_entry.get().strip() or "alt+3",
                 "qrcode": hk4_entry.get().strip() or "alt+4",
-                "gen_qr": hk5_entry.get().strip() or "alt+5"
+                "gen_qr": hk5_entry.get().strip() or "alt+5",
+                "repeat": hk6_entry.get().strip() or "alt+6",
+                "watch": hk7_entry.get().strip() or "alt+7",
+                "scroll": hk8_entry.get().strip() or "alt+8",
+                "multi": hk9_entry.get().strip() or "alt+9"
             }
             try:
-                with open(os.path.join(SCRIPT_DIR, "config.json"), "w", encoding="utf-8") as f:
-                    _json.dump(new_cfg, f, indent=4, ensure_ascii=False)
+                save_config(new_cfg, os.path.join(SCRIPT_DIR, "config.json"))
             except Exception:
                 pass
             
@@ -1270,6 +1559,34 @@ class CompactBar(tk.Tk):
             window.destroy()
 
     # ── 诊断日志查看器 ────────────────────────
+    def _diag_report(self) -> str:
+        """性能诊断页内容：各阶段耗时分位数、直方图与最近几次截图的明细"""
+        from capture_trace import BUCKETS_MS
+        summ = self._traces.summary()
+        out = ["── 各阶段耗时（距上一阶段，最近样本，ms）──",
+               f"{'阶段':<22}{'次数':>6}{'p50':>9}{'p90':>9}{'p99':>9}{'最大':>9}"]
+        for stage, st in sorted(summ["stages"].items(), key=lambda kv: -kv[1]["p90"]):
+            out.append(f"{stage:<24}{st['n']:>6}{st['p50']:>9.1f}{st['p90']:>9.1f}"
+                       f"{st['p99']:>9.1f}{st['max']:>9.1f}")
+        out += ["", "── 总耗时（热键→最后一个阶段）──"]
+        for mode, st in summ["total"].items():
+            out.append(f"{mode:<24}{st['n']:>6}{st['p50']:>9.1f}{st['p90']:>9.1f}"
+                       f"{st['p99']:>9.1f}{st['max']:>9.1f}")
+        labels = [f"≤{b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"]
+        out += ["", "── 直方图（ms 区间: 次数）──"]
+        for stage in summ["stages"]:
+            counts = self._traces.histogram(stage)
+            cells = "  ".join(f"{l}:{c}" for l, c in zip(labels, counts) if c)
+            out.append(f"{stage:<24}{cells}")
+        out += ["", "── 最近 10 次 ──"]
+        for tr in reversed(self._traces.recent(10)):
+            d = tr.to_dict()
+            chain = " → ".join(f"{st['stage']} +{st['delta_ms']:.0f}" for st in d["stages"][1:])
+            out.append(f"{d['start']}  {d['mode']:<10}{d['status']:<10}{d['total_ms']:>8.0f}ms  {chain}")
+        if not summ["stages"]:
+            out.append("（还没有完成的截图记录）")
+        return "\n".join(out) + "\n"
+
     def _show_log_dialog(self):
         """打开一个简单的日志查看窗口，显示 hotkey_debug.log 内容"""
         lw = Toplevel(self)
@@ -1285,16 +1602,50 @@ class CompactBar(tk.Tk):
                  bg=BG, fg=ACCENT, font=("微软雅黑", 11, "bold")).pack(side=tk.LEFT)
         tk.Label(info_frame, text=f"  {HOTKEY_LOG}",
                  bg=BG, fg=SUBTEXT, font=("微软雅黑", 8)).pack(side=tk.LEFT)
+        task_var = tk.StringVar(value="")
+        tk.Label(info_frame, textvariable=task_var,
+                 bg=BG, fg=SUCCESS, font=("Consolas", 8)).pack(side=tk.RIGHT)
+
+        # 标签页：日志 / 性能诊断（共用同一块区域，切换时互相隐藏）
+        tabs = tk.Frame(lw, bg=BG)
+        tabs.pack(fill=tk.X, padx=10, pady=(6, 0))
+        body = tk.Frame(lw, bg=BG)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
 
         # 日志文本框
-        txt = ScrolledText(lw, bg="#0d0d1a", fg="#ccddcc",
+        txt = ScrolledText(body, bg="#0d0d1a", fg="#ccddcc",
                            font=("Consolas", 9), wrap=tk.NONE,
                            relief=tk.FLAT, padx=6, pady=6)
-        txt.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        txt.pack(fill=tk.BOTH, expand=True)
+        diag = ScrolledText(body, bg="#0d0d1a", fg="#ccddcc",
+                            font=("Consolas", 9), wrap=tk.NONE,
+                            relief=tk.FLAT, padx=6, pady=6)
+
+        def _load_diag():
+            diag.config(state=tk.NORMAL)
+            diag.delete(1.0, tk.END)
+            diag.insert(tk.END, self._diag_report())
+            diag.config(state=tk.DISABLED)
+
+        tab_btns = {}
+        def _switch(name):
+            for w in (txt, diag):
+                w.pack_forget()
+            (txt if name == "log" else diag).pack(fill=tk.BOTH, expand=True)
+            if name == "diag":
+                _load_diag()
+            for k, b in tab_btns.items():
+                b.config(bg=ACCENT if k == name else PANEL)
+        for key, label in (("log", "日志"), ("diag", "性能诊断")):
+            tab_btns[key] = tk.Button(tabs, text=label, bg=PANEL, fg=TEXT,
+                                      font=("微软雅黑", 9), bd=0, padx=12, pady=2,
+                                      cursor="hand2", command=lambda k=key: _switch(k))
+            tab_btns[key].pack(side=tk.LEFT, padx=(0, 4))
 
         def _load():
             txt.config(state=tk.NORMAL)
             txt.delete(1.0, tk.END)
+            _LOG.flush()
             try:
                 if os.path.exists(HOTKEY_LOG):
                     with open(HOTKEY_LOG, "r", encoding="utf-8") as f:
@@ -1305,6 +1656,14 @@ class CompactBar(tk.Tk):
                 txt.insert(tk.END, f"读取日志失败: {e}\n")
             txt.see(tk.END)
             txt.config(state=tk.DISABLED)
+            st = self._tasks.stats()
+            ui = self._ui.stats()
+            lg = _LOG.stats()
+            task_var.set(f"任务 排队{st['queued']} 执行中{st['active']} 完成{st['done']} "
+                         f"取消{st['cancelled']} 失败{st['failed']} 线程{st['workers']}/{st['max_workers']}"
+                         f"  |  界面更新 {ui['run']} 合并{ui['coalesced']} 丢弃{ui['dropped']} "
+                         f"延迟均值{ui['avg_ms']:.1f}ms 最大{ui['max_ms']:.1f}ms"
+                         f"  |  日志 写入{lg['written']} 丢弃{lg['dropped']}")
 
         _load()
 
@@ -1314,8 +1673,7 @@ class CompactBar(tk.Tk):
 
         def _clear_log():
             try:
-                if os.path.exists(HOTKEY_LOG):
-                    os.remove(HOTKEY_LOG)
+                _LOG.clear()
                 _load()
             except Exception as e:
                 pass
@@ -1327,33 +1685,179 @@ class CompactBar(tk.Tk):
             except Exception:
                 pass
 
+        def _export_traces():
+            from tkinter import filedialog
+            tgt = filedialog.asksaveasfilename(parent=lw, defaultextension=".jsonl",
+                                               initialfile="capture_traces.jsonl",
+                                               filetypes=[("JSON Lines", "*.jsonl")])
+            if tgt:
+                try:
+                    self._toast(f"✅ 已导出 {self._traces.export(tgt)} 条追踪记录")
+                except Exception as e:
+                    self._toast(f"导出失败: {e}")
+
         tk.Button(bar, text="刷新", bg=PANEL, fg=TEXT,
                   font=("微软雅黑", 9), bd=0, padx=10, pady=4,
-                  cursor="hand2", command=_load).pack(side=tk.LEFT, padx=4)
+                  cursor="hand2", command=lambda: (_load(), _load_diag())).pack(side=tk.LEFT, padx=4)
         tk.Button(bar, text="清空", bg=PANEL, fg=TEXT,
                   font=("微软雅黑", 9), bd=0, padx=10, pady=4,
                   cursor="hand2", command=_clear_log).pack(side=tk.LEFT, padx=4)
         tk.Button(bar, text="打开所在文件夹", bg=PANEL, fg=TEXT,
                   font=("微软雅黑", 9), bd=0, padx=10, pady=4,
                   cursor="hand2", command=_open_folder).pack(side=tk.LEFT, padx=4)
+        tk.Button(bar, text="导出追踪", bg=PANEL, fg=TEXT,
+                  font=("微软雅黑", 9), bd=0, padx=10, pady=4,
+                  cursor="hand2", command=_export_traces).pack(side=tk.LEFT, padx=4)
+        _switch("log")
         tk.Button(bar, text="关闭", bg=PANEL, fg=SUBTEXT,
                   font=("微软雅黑", 9), bd=0, padx=10, pady=4,
                   cursor="hand2", command=lw.destroy).pack(side=tk.RIGHT, padx=4)
 
+    # ── 历史记录 ─────────────────────────────
+    def _record_history(self, text, translation, items, img=None, mode=""):
+        """后台写入一条历史（缩略图压缩也在后台做）"""
+        if self._history is None or not text:
+            return
+        self._tasks.submit(self._history.add, text, translation, items, img, mode,
+                           priority=PRIO_BACKGROUND, name="history_add")
+
+    def _history_dialog(self):
+        if self._history is None:
+            self._toast("历史记录未启用")
+            return
+        from PIL import Image, ImageTk
+        import io as _io
+
+        hw = Toplevel(self)
+        hw.title("截图历史")
+        hw.configure(bg=BG)
+        hw.geometry("860x520")
+        hw.attributes("-topmost", True)
+
+        top = tk.Frame(hw, bg=BG)
+        top.pack(fill=tk.X, padx=10, pady=(8, 0))
+        tk.Label(top, text="🔍", bg=BG, fg=ACCENT, font=("微软雅黑", 11)).pack(side=tk.LEFT)
+        q_var = tk.StringVar()
+        entry = tk.Entry(top, textvariable=q_var, bg="#11111b", fg=TEXT, insertbackground=TEXT,
+                         font=("微软雅黑", 10), relief=tk.FLAT)
+        entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=6, ipady=3)
+        stat_var = tk.StringVar()
+        tk.Label(top, textvariable=stat_var, bg=BG, fg=SUBTEXT,
+                 font=("Consolas", 8)).pack(side=tk.RIGHT)
+
+        body = tk.Frame(hw, bg=BG)
+        body.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        lst = tk.Listbox(body, bg="#0d0d1a", fg=TEXT, font=("微软雅黑", 9), width=40,
+                         relief=tk.FLAT, selectbackground=ACCENT, activestyle="none")
+        lst.pack(side=tk.LEFT, fill=tk.Y)
+        right = tk.Frame(body, bg=BG)
+        right.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(8, 0))
+        thumb_lbl = tk.Label(right, bg=BG)
+        thumb_lbl.pack(anchor="w")
+        detail = ScrolledText(right, bg="#0d0d1a", fg="#ccddcc", font=("微软雅黑", 9),
+                              wrap=tk.WORD, relief=tk.FLAT, padx=6, pady=6)
+        detail.pack(fill=tk.BOTH, expand=True, pady=(6, 0))
+
+        rows = []
+        cur = {"rec": None, "after": None}
+
+        def _search():
+            cur["after"] = None
+            t0 = _time.perf_counter()
+            rows[:] = self._history.search(q_var.get().strip(), limit=200)
+            ms = (_time.perf_counter() - t0) * 1000
+            lst.delete(0, tk.END)
+            for r in rows:
+                first = r["text"].split("\n", 1)[0][:40]
+                lst.insert(tk.END, f"{_time.strftime('%m-%d %H:%M', _time.localtime(r['ts']))}  {first}")
+            stat_var.set(f"{len(rows)} 条 / 共 {self._history.count()}  {ms:.1f}ms")
+
+        def _on_type(_=None):
+            if cur["after"] is not None:
+                hw.after_cancel(cur["after"])
+            cur["after"] = hw.after(200, _search)
+
+        def _on_select(_=None):
+            sel = lst.curselection()
+            if not sel:
+                return
+            rec = self._history.get(rows[sel[0]]["id"])
+            cur["rec"] = rec
+            detail.config(state=tk.NORMAL)
+            detail.delete(1.0, tk.END)
+            if rec:
+                detail.insert(tk.END, rec["text"])
+                if rec["translation"]:
+                    detail.insert(tk.END, "\n\n── 译文 ──\n" + rec["translation"])
+            detail.config(state=tk.DISABLED)
+            photo = None
+            if rec and rec["thumb"]:
+                try:
+                    photo = ImageTk.PhotoImage(Image.open(_io.BytesIO(rec["thumb"])))
+                except Exception:
+                    pass
+            thumb_lbl.config(image=photo or "")
+            thumb_lbl.image = photo
+
+        def _copy(field):
+            import pyperclip
+            rec = cur["rec"]
+            if rec and rec.get(field):
+                pyperclip.copy(rec[field])
+                self._toast("✅ 已复制")
+
+        def _delete():
+            rec = cur["rec"]
+            if rec:
+                self._history.delete(rec["id"])
+                cur["rec"] = None
+                _search()
+
+        entry.bind("<KeyRelease>", _on_type)
+        entry.bind("<Return>", lambda e: _search())
+        lst.bind("<<ListboxSelect>>", _on_select)
+        hw.bind("<Escape>", lambda e: hw.destroy())
+
+        bar = tk.Frame(hw, bg=BG)
+        bar.pack(fill=tk.X, padx=10, pady=6)
+        for label, cmd in (("复制原文", lambda: _copy("text")),
+                           ("复制译文", lambda: _copy("translation")),
+                           ("删除", _delete)):
+            tk.Button(bar, text=label, bg=PANEL, fg=TEXT,
+                      font=("微软雅黑", 9), bd=0, padx=10, pady=4,
+                      cursor="hand2", command=cmd).pack(side=tk.LEFT, padx=4)
+        tk.Button(bar, text="关闭", bg=PANEL, fg=SUBTEXT,
+                  font=("微软雅黑", 9), bd=0, padx=10, pady=4,
+                  cursor="hand2", command=hw.destroy).pack(side=tk.RIGHT, padx=4)
+
+        _search()
+        entry.focus_set()
+
     # ── 截图入口（全局单例：先关旧弹窗再开新的）────
-    def _cap(self, mode: str):
+    def _cap(self, mode: str, t_hotkey: float = None):
+        if t_hotkey is None:
+            t_hotkey = _time.perf_counter()
         _hklog(f"[触发] mode={mode!r}  来源=快捷键或按钮")
 
+        # 监视进行中再次触发 = 停止监视
+        if mode == "watch" and self._stop_watch():
+            return
+        if mode == "scroll" and self._stop_scroll():
+            return
+
         # ── 全局单例锁：选区遮罩打开期间忽略所有重复热键 ──
         if getattr(self, "_capturing", False) and mode != "gen_qr":
             _hklog(f"[忽略] 正在框选中，跳过 mode={mode!r}")
             return
 
-        # 关闭上一次未关的结果弹窗
+        # 关闭上一次未关的结果弹窗（复用的结果层只隐藏，其余窗口销毁）
         old = getattr(self, "_active_popup", None)
         if old:
             try:
-                old.destroy()
+                if isinstance(old, InPlaceOverlay):
+                    old.dismiss()
+                else:
+                    old.destroy()
             except Exception:
                 pass
             self._active_popup = None
@@ -1364,6 +1868,9 @@ class CompactBar(tk.Tk):
             "screenshot": self._run_screenshot,
             "qrcode":     self._run_qrcode,
             "gen_qr":     self._run_gen_qrcode,
+            "watch":      self._run_watch,
+            "scroll":     self._run_scroll,
+            "multi":      self._run_multi,
         }
         name_map = {
             "ocr":        "提取文字",
@@ -1371,12 +1878,20 @@ class CompactBar(tk.Tk):
             "screenshot": "系统截图",
             "qrcode":     "识别二维码",
             "gen_qr":     "生成二维码",
+            "watch":      "区域监视",
+            "scroll":     "滚动长截图",
+            "multi":      "多区域翻译",
         }
         action  = cb_map.get(mode, self._run_ocr_only)
         m_name  = name_map.get(mode, "")
+        self._trace = self._traces.start(mode, t_hotkey)
 
         if mode == "gen_qr":
             self.after(0, action)
+        elif mode == "repeat":
+            # 无遮罩：旧结果层已隐藏，直接截上次的选区
+            self.update_idletasks()
+            self._run_repeat()
         else:
             # 设置锁；用 wrapper 确保 callback 完成时释放锁（无论成功或 cancel）
             self._capturing = True
@@ -1384,108 +1899,455 @@ class CompactBar(tk.Tk):
             def _action_done(*args, **kwargs):
                 self._capturing = False
                 original_action(*args, **kwargs)
-            self.after(200, lambda: grab_region(self, _action_done, mode_name=m_name))
+            # 旧弹窗已同步销毁，刷新一次即可立刻截屏，无需再固定等待 200ms
+            self.update_idletasks()
+            grab_region(self, _action_done, mode_name=m_name, t_hotkey=t_hotkey,
+                        multi=(mode == "multi"))
+
+
+    # ── 重译上次选区（无遮罩 + 画面变化检测）────
+    def _run_repeat(self):
+        tr   = self._trace
+        last = getattr(self, "_last_capture", None)
+        if not last:
+            self._traces.finish(tr, "no_region")
+            self._toast("还没有可重复的选区，请先截图翻译一次")
+            return
+        lx1, ly1, lx2, ly2 = last["region"]
+        dpi_sx, dpi_sy = self._dpi_scale
+        engine = self.engine_var.get()
+        lang   = self.lang_var.get()
+
+        def worker():
+            from PIL import ImageGrab
+            _time.sleep(0.15)    # 等旧结果层真正从屏幕上消失
+            try:
+                bbox = (int(lx1*dpi_sx), int(ly1*dpi_sy),
+                        int(lx2*dpi_sx), int(ly2*dpi_sy))
+                crop_img = ImageGrab.grab(bbox=bbox, all_screens=True)
+            except Exception as ex:
+                self._traces.finish(tr, "error")
+                self._ui.post(lambda ex=ex: self._toast(f"截图失败: {ex}"))
+                return
+            if tr:
+                tr.mark("crop_saved", w=crop_img.width, h=crop_img.height)
+            unchanged = (_pixel_hash(crop_img) == last["hash"]
+                         and last.get("translated") is not None
+                         and (last.get("engine"), last.get("lang")) == (engine, lang))
+            _hklog(f"[重译] region={last['region']} unchanged={unchanged}", with_kbd_state=False)
+            if unchanged:
+                self._ui.post(lambda: self._show_cached(last, crop_img, tr),
+                              on_drop=lambda: self._traces.finish(tr, "cancelled"))
+            else:
+                crop_img.save(TEMP_IMG)
+                self._ui.post(lambda: self._run_ocr_translate(
+                    TEMP_IMG, lx1, ly1, lx2, ly2, crop_img))
+        self._grab_tasks.submit(worker, priority=PRIO_INTERACTIVE, group="capture")
+
+    def _show_cached(self, last, crop_img, tr=None):
+        """画面未变化：直接复用上次的识别与译文，跳过 OCR 和翻译"""
+        lx1, ly1, lx2, ly2 = last["region"]
+        popup = self._result_overlay()
+        sid   = popup.show(lx1, ly1, lx2, ly2, mode="translate",
+                           bg_img=crop_img, dpi_scale=self._dpi_scale)
+        self._active_popup = popup
+        popup.set_ocr(last["ocr"], session=sid)
+        popup.set_trans(last["translated"], items=last["items"], session=sid)
+        if tr:
+            tr.mark("result_shown")
+        self._traces.finish(tr, "cached")
+        self._toast("画面无变化，已复用上次结果", ms=1200)
+
+    # ── 区域监视（连续 OCR，只输出新增行）────
+    def _run_watch(self, img_path, lx1=0, ly1=0, lx2=400, ly2=300, crop_img=None):
+        tr       = self._trace
+        cfg      = _load_config().get("watch", {})
+        interval = max(50, int(cfg.get("interval_ms", 500))) / 1000
+        do_tr    = cfg.get("translate", True)
+        engine   = self.engine_var.get()
+        lang     = self.lang_var.get()
+        dpi_sx, dpi_sy = self._dpi_scale
+        bbox = (int(lx1*dpi_sx), int(ly1*dpi_sy), int(lx2*dpi_sx), int(ly2*dpi_sy))
+
+        panel = WatchOverlay(self, lx1, ly1, lx2, ly2, on_close=self._stop_watch)
 
+        def _ocr(img):
+            img.save(WATCH_IMG)
+            return do_ocr_raw(WATCH_IMG)
+
+        def _on_lines(items):
+            text = "\n".join(it["text"] for it in items)
+            if do_tr:
+                res = do_translate(text, target_lang=lang, engine=engine)
+                out = [l for l in res.split("\n") if l.strip()] or [res]
+            else:
+                out = text.split("\n")
+            self._ui.post(lambda: panel.push(out))
+
+        def _on_error(msg):
+            _hklog(f"[监视] {msg}", "error", with_kbd_state=False)
+
+        self._watcher = RegionWatcher(bbox, _ocr, _on_lines, interval=interval,
+                                      max_interval=max(interval, 2.0), on_error=_on_error)
+        self._watch_panel = panel
+        self._watcher.start()
+        # 追踪只覆盖“按键 → 开始监视”，之后的连续识别不计入单次截图耗时
+        if tr:
+            tr.mark("watch_started")
+        self._traces.finish(tr, "ok")
+        _hklog(f"[监视] 开始 bbox={bbox} interval={interval}s translate={do_tr}", with_kbd_state=False)
+        self._toast("已开始区域监视，再按一次快捷键停止", ms=1500)
+
+    def _stop_watch(self) -> bool:
+        """停止区域监视；返回是否确实停止了一个正在运行的监视"""
+        w = getattr(self, "_watcher", None)
+        if not w:
+            return False
+        w.stop()
+        _hklog(f"[监视] 停止 stats={w.stats}", with_kbd_state=False)
+        self._watcher = None
+        panel = getattr(self, "_watch_panel", None)
+        self._watch_panel = None
+        if panel:
+            try: panel.destroy()
+            except Exception: pass
+        return True
+
+    # ── 滚动长截图（行哈希拼接 + 增量 OCR）────
+    def _run_scroll(self, img_path, lx1=0, ly1=0, lx2=400, ly2=300, crop_img=None):
+        tr       = self._trace
+        interval = max(50, int(_load_config().get("scroll", {}).get("interval_ms", 300))) / 1000
+        dpi_sx, dpi_sy = self._dpi_scale
+        bbox = (int(lx1*dpi_sx), int(ly1*dpi_sy), int(lx2*dpi_sx), int(ly2*dpi_sy))
+        panel = WatchOverlay(self, lx1, ly1, lx2, ly2, on_close=self._stop_scroll)
+        panel.push(["长截图中：请滚动页面，完成后再按一次快捷键"])
+
+        def _ocr(img):
+            img.save(SCROLL_IMG)
+            return do_ocr_raw(SCROLL_IMG)
+
+        def _on_progress(height, n_items):
+            self._ui.post(lambda: panel.push([f"已拼接 {height}px，识别 {n_items} 行"]),
+                          key="scroll_progress")
+
+        def _on_error(msg):
+            _hklog(f"[长截图] {msg}", "error", with_kbd_state=False)
+
+        self._scroll = ScrollSession(bbox, _ocr, interval=interval,
+                                     on_progress=_on_progress, on_error=_on_error)
+        self._scroll_panel = panel
+        self._scroll.start()
+        if tr:
+            tr.mark("scroll_started")
+        self._traces.finish(tr, "ok")
+        _hklog(f"[长截图] 开始 bbox={bbox} interval={interval}s", with_kbd_state=False)
+
+    def _stop_scroll(self) -> bool:
+        """结束滚动长截图：保存长图、复制全文；返回是否确实结束了一个会话"""
+        sess = getattr(self, "_scroll", None)
+        if not sess:
+            return False
+        self._scroll = None
+        panel = getattr(self, "_scroll_panel", None)
+        self._scroll_panel = None
+        if panel:
+            try: panel.destroy()
+            except Exception: pass
+
+        def worker():
+            import pyperclip
+            img, items, text = sess.stop()
+            try:
+                img.save(LONG_IMG)
+            except Exception as ex:
+                _hklog(f"[长截图] 保存失败: {ex}", "error", with_kbd_state=False)
+            _hklog(f"[长截图] 结束 height={img.height} items={len(items)}", with_kbd_state=False)
+            if text.strip():
+                pyperclip.copy(text)
+                self._ui.post(lambda: self._toast(
+                    f"✅ 长截图 {img.height}px，已复制 {len(items)} 行文字\n图片：{LONG_IMG}", ms=3500))
+            else:
+                self._ui.post(lambda: self._toast(f"长截图已保存（未识别到文字）\n{LONG_IMG}", ms=3500))
+        self._tasks.submit(worker, priority=PRIO_NORMAL)
+        return True
+
+    # ── 多区域翻译（一次截屏、一次 OCR）────────
+    def _run_multi(self, regions, crops):
+        tr     = self._trace
+        engine = self.engine_var.get()
+        lang   = self.lang_var.get()
+
+        def worker():
+            results = do_ocr_batch(crops)
+            texts = ["\n".join(it["text"] for it in r if it["text"].strip())
+                     if isinstance(r, list) else "" for r in results]
+            if tr:
+                tr.mark("ocr_done", regions=len(crops), lines=sum(t.count("\n") + 1 for t in texts if t))
+            if not any(texts):
+                err = next((r for r in results if isinstance(r, str)), None)
+                self._traces.finish(tr, "error" if err else "empty")
+                self._ui.post(lambda: self._toast(err or "未识别到文字"))
+                return
+            # 所有区域合并成一次翻译请求，按行数拆回；行数对不上时逐区域翻译
+            src_lines = [t.split("\n") if t else [] for t in texts]
+            joined = "\n".join(l for ls in src_lines for l in ls)
+            res = do_translate(joined, target_lang=lang, engine=engine, trace=tr)
+            tr_lines = [l for l in res.split("\n") if l.strip()]
+            trans = []
+            if len(tr_lines) == sum(len(ls) for ls in src_lines):
+                i = 0
+                for ls in src_lines:
+                    trans.append("\n".join(tr_lines[i:i + len(ls)]))
+                    i += len(ls)
+            else:
+                trans = [do_translate(t, target_lang=lang, engine=engine, trace=tr) if t else ""
+                         for t in texts]
+            def _show():
+                self._show_multi_result(regions, texts, trans)
+                if tr:
+                    tr.mark("result_shown")
+                self._traces.finish(tr)
+            self._ui.post(_show, on_drop=lambda: self._traces.finish(tr, "cancelled"))
+        self._tasks.submit(worker, priority=PRIO_NORMAL, group="ocr")
+
+    def _show_multi_result(self, regions, texts, trans):
+        import pyperclip
+        w = Toplevel(self)
+        w.title(f"多区域翻译（{len(regions)} 个区域）")
+        w.configure(bg=BG)
+        w.geometry("560x480")
+        w.attributes("-topmost", True)
+        self._active_popup = w
+        w.bind("<Escape>", lambda e: w.destroy())
+
+        txt = ScrolledText(w, bg="#0d0d1a", fg=TEXT, font=("微软雅黑", 10),
+                           wrap=tk.WORD, relief=tk.FLAT, padx=8, pady=8)
+        txt.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 4))
+        txt.tag_configure("head", foreground=ACCENT, font=("微软雅黑", 10, "bold"))
+        txt.tag_configure("src", foreground=SUBTEXT)
+        out = []
+        for idx, (t, tr) in enumerate(zip(texts, trans), 1):
+            txt.insert(tk.END, f"区域 {idx}\n", "head")
+            txt.insert(tk.END, (t or "（未识别到文字）") + "\n", "src")
+            if tr:
+                txt.insert(tk.END, tr + "\n")
+            txt.insert(tk.END, "\n")
+            out.append(tr or t)
+        txt.config(state=tk.DISABLED)
+
+        bar = tk.Frame(w, bg=BG)
+        bar.pack(fill=tk.X, padx=10, pady=6)
+        tk.Button(bar, text="\U0001f4cb 复制译文", bg=PANEL, fg=TEXT,
+                  font=("微软雅黑", 9), bd=0, padx=10, pady=4, cursor="hand2",
+                  command=lambda: pyperclip.copy("\n\n".join(out))).pack(side=tk.LEFT, padx=4)
+        tk.Button(bar, text="关闭", bg=PANEL, fg=SUBTEXT,
+                  font=("微软雅黑", 9), bd=0, padx=10, pady=4, cursor="hand2",
+                  command=w.destroy).pack(side=tk.RIGHT, padx=4)
 
     # ── 提取文字（OCR 复制）────────────────
     def _run_ocr_only(self, img_path, lx1=0, ly1=0, lx2=400, ly2=300, crop_img=None):
+        tr = self._trace
         def _main():
             def worker():
-                text = do_ocr(img_path)
-                if text and not text.startswith("["):
+                import pyperclip
+                res = do_ocr_raw(img_path)
+                lines = [it["text"] for it in res if it["text"].strip()] if isinstance(res, list) else []
+                text = "\n".join(lines)
+                if tr:
+                    tr.mark("ocr_done", lines=len(lines))
+                self._traces.finish(tr, "ok" if text else "empty")
+                if text:
                     pyperclip.copy(text)
-                    self.after(0, lambda: self._toast(f"✅ 已复制 {len(text)} 字符"))
+                    self._ui.post(lambda: self._toast(f"✅ 已复制 {len(text)} 字符"))
+                    self._record_history(text, "", res, crop_img, "ocr")
                 else:
-                    self.after(0, lambda: self._toast(f"识别失败"))
-            threading.Thread(target=worker, daemon=True).start()
+                    self._ui.post(lambda: self._toast(f"识别失败"))
+            self._tasks.submit(worker, priority=PRIO_NORMAL, group="ocr")
         self.after(0, _main)
 
     # ── 截图到剪贴板 ─────────────────────────
     def _run_screenshot(self, img_path, lx1=0, ly1=0, lx2=400, ly2=300, crop_img=None):
         import subprocess
-        def _main():
+        tr = self._trace
+        def worker():
             try:
                 ps = (f'Add-Type -AssemblyName System.Windows.Forms,System.Drawing;'
                       f'[System.Windows.Forms.Clipboard]::SetImage('
                       f'[System.Drawing.Image]::FromFile("{img_path}"))')
                 subprocess.run(["powershell", "-Command", ps],
                                capture_output=True, timeout=6)
-                self.after(0, lambda: self._toast("✅ 截图已复制到剪贴板"))
+                if tr:
+                    tr.mark("clipboard")
+                self._traces.finish(tr, "ok")
+                self._ui.post(lambda: self._toast("✅ 截图已复制到剪贴板"))
             except Exception as ex:
-                self.after(0, lambda: self._toast(f"截图失败: {ex}"))
-        self.after(0, _main)
+                self._traces.finish(tr, "error")
+                self._ui.post(lambda ex=ex: self._toast(f"截图失败: {ex}"))
+        self._tasks.submit(worker, priority=PRIO_NORMAL)
 
     # ── OCR + 翻译 ───────────────────────
+    def _result_overlay(self):
+        """取复用的结果层（首次或被销毁后才新建）"""
+        ov = getattr(self, "_overlay", None)
+        try:
+            if ov is not None and ov.winfo_exists():
+                return ov
+        except Exception:
+            pass
+        self._overlay = InPlaceOverlay(self)
+        return self._overlay
+
     def _run_ocr_translate(self, img_path, lx1=0, ly1=0, lx2=400, ly2=300, crop_img=None):
+        tr = self._trace
         def _main():
             engine = self.engine_var.get()
             lang   = self.lang_var.get()
-            popup  = InPlaceOverlay(self, lx1, ly1, lx2, ly2, mode="translate",
-                                    bg_img=crop_img, dpi_scale=self._dpi_scale)
+            popup  = self._result_overlay()
+            sid    = popup.show(lx1, ly1, lx2, ly2, mode="translate",
+                                bg_img=crop_img, dpi_scale=self._dpi_scale)
+            if tr:
+                tr.mark("result_shown")
             self._active_popup = popup   # 登记当前弹窗
+            token = popup.token
+            # 同一弹窗的更新合并执行；弹窗关闭或被复用后直接丢弃
+            alive   = lambda: popup.is_current(sid)
+            ocr_key = {"key": ("ocr", id(popup)), "alive": alive}
+            tr_key  = {"key": ("trans", id(popup)), "alive": alive}
+
+            # 记住选区与画面指纹，供“重译上次选区”做变化检测
+            last = {"region": (lx1, ly1, lx2, ly2), "hash": None,
+                    "engine": engine, "lang": lang, "translated": None}
+            self._last_capture = last
+
+            scfg = _load_config().get("stream", {})
 
             def worker():
-                # 使用 raw 返回来保留左、右、上、下的真实坐标点阵
-                res = do_ocr_raw(img_path)
+                if crop_img is not None:
+                    last["hash"] = _pixel_hash(crop_img)
+                # 使用 raw 返回来保留左、右、上、下的真实坐标点阵；
+                # 长图分条识别，每识别完一段就先把原文位置框出来
+                res = []
+                for part in _ENGINE.ocr_iter(img_path, band_px=scfg.get("band_px", 2400)):
+                    if isinstance(part, str):
+                        res = part
+                        break
+                    res += part
+                    shown = [it for it in part if it["text"].strip()]
+                    if shown:
+                        self._ui.post(lambda shown=shown: popup.add_items(shown, session=sid),
+                                      key=("items", id(popup), len(res)), alive=alive)
+                if tr:
+                    tr.mark("ocr_done", lines=len(res) if isinstance(res, list) else 0)
                 
                 # 网络出错或者未能正常提取结果的分支
                 if isinstance(res, str):
-                    self.after(0, lambda: popup.set_ocr(res))
-                    self.after(0, lambda: popup.set_trans(f"识别或翻译中断。原因：{res}"))
+                    self._traces.finish(tr, "error")
+                    self._ui.post(lambda: popup.set_ocr(res, session=sid), **ocr_key)
+                    self._ui.post(lambda: popup.set_trans(f"识别或翻译中断。原因：{res}", session=sid), **tr_key)
                     return
                 
                 # 处理所有的提取原文并使用换行符重组
                 lines = [item["text"] for item in res if item["text"].strip()]
                 if not lines:
-                    self.after(0, lambda: popup.set_ocr("未识别到文字（空）"))
-                    self.after(0, lambda: popup.set_trans("（无需翻译）"))
+                    self._traces.finish(tr, "empty")
+                    self._ui.post(lambda: popup.set_ocr("未识别到文字（空）", session=sid), **ocr_key)
+                    self._ui.post(lambda: popup.set_trans("（无需翻译）", session=sid), **tr_key)
                     return
                     
                 full_text = "\n".join(lines)
-                self.after(0, lambda: popup.set_ocr(full_text))
-                
-                # 调用你已有的翻译接口，翻译这个带 \n 换行的长文本
-                translated = do_translate(full_text, target_lang=lang, engine=engine)
-                # 交给支持智能按坐标摆放的新 set_trans
-                self.after(0, lambda: popup.set_trans(translated, items=res))
-                
-            threading.Thread(target=worker, daemon=True).start()
+                self._ui.post(lambda: popup.set_ocr(full_text, session=sid), **ocr_key)
+                if token.cancelled:
+                    self._traces.finish(tr, "cancelled")
+                token.raise_if_cancelled()      # 弹窗已关：不再发起网络翻译
+
+                # 分块翻译（行数少时仍是一次整段请求），每块到达就填进对应文字框
+                trans = [None] * len(lines)
+                painted = []
+                def _fill(start, part):
+                    popup.fill_trans(start, part, session=sid)
+                    if not painted:
+                        painted.append(True)
+                        popup.update_idletasks()
+                        if tr:
+                            tr.mark("first_paint")
+                for start, part in iter_translate(lines, lang, engine,
+                                                  chunk_lines=scfg.get("chunk_lines", 12), trace=tr):
+                    if token.cancelled:
+                        self._traces.finish(tr, "cancelled")
+                    token.raise_if_cancelled()      # 弹窗已关：剩余的块不再请求
+                    if part is None:
+                        continue
+                    trans[start:start + len(part)] = part
+                    self._ui.post(lambda start=start, part=part: _fill(start, part),
+                                  key=("fill", id(popup), start), alive=alive)
+
+                if any(t is not None for t in trans):
+                    # 空串是并入上一行的整段译文留下的空位，不单独成行
+                    translated = "\n".join(src if t is None else t
+                                           for t, src in zip(trans, lines) if t != "")
+                else:
+                    translated = FAIL_MSG
+                last.update(ocr=full_text, items=res)
+                if all(t is not None for t in trans):
+                    # 只记住完整成功的译文；失败 / 有块没译出来时下次“重译上次选区”重新请求
+                    last["translated"] = translated
+                self._record_history(full_text, translated, res, crop_img, "translate")
+                def _done():
+                    popup.finish_trans(translated, items=res, session=sid)
+                    if tr and not painted:
+                        tr.mark("first_paint")
+                    self._traces.finish(tr)
+                # 弹窗已关 / 被新截图复用导致 _done 被丢弃时，追踪也要收尾
+                self._ui.post(_done, on_drop=lambda: self._traces.finish(tr, "cancelled"), **tr_key)
+
+            # 弹窗关闭 / 被新截图顶替时 token 即被取消
+            self._tasks.submit(worker, priority=PRIO_NORMAL, token=token, group="ocr")
         self.after(0, _main)
 
     # ── 扫码（微信 OpenCV QR） ────────────────
     def _run_qrcode(self, img_path, lx1=0, ly1=0, lx2=400, ly2=300, crop_img=None):
+        tr = self._trace
         def _main():
             def worker():
-                try:
-                    import cv2
-                    import numpy as np
-                except ImportError:
-                    self.after(0, lambda: self._toast("缺少扫码引擎库。尝试在后台安装 opencv..."))
+                import pyperclip
+                if not qr_scan.available():
+                    self._ui.post(lambda: self._toast("缺少扫码引擎库。尝试在后台安装 opencv..."))
                     return
                 try:
-                    detector = cv2.wechat_qrcode_WeChatQRCode()
-                    img = cv2.imdecode(np.fromfile(img_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+                    t0 = _time.perf_counter()
+                    if crop_img is not None:
+                        img = crop_img          # 内存中的裁剪图，免去写盘再读回
+                    else:
+                        import cv2
+                        import numpy as np
+                        img = cv2.imdecode(np.fromfile(img_path, dtype=np.uint8), cv2.IMREAD_COLOR)
                     if img is None:
-                        self.after(0, lambda: self._toast("读取截图失败"))
+                        self._ui.post(lambda: self._toast("读取截图失败"))
                         return
-                    res, points = detector.detectAndDecode(img)
-                    if res:
+                    found = qr_scan.decode(img)
+                    if tr:
+                        tr.mark("qr_decoded", codes=len(found))
+                    self._traces.finish(tr, "ok" if found else "empty")
+                    _hklog(f"[扫码] {len(found)} 个结果，耗时 {(_time.perf_counter() - t0) * 1000:.0f}ms",
+                           with_kbd_state=False)
+                    if found:
                         # 获取所有结果拼接
-                        text = "\n".join(res)
+                        text = "\n".join(t for t, _ in found)
                         pyperclip.copy(text)
                         
                         # 兼容多行通知的显示情况
                         display_text = text if len(text) < 40 else text[:40] + "..."
-                        self.after(0, lambda: self._toast(f"✅ 已复制二维码内容:\n{display_text}", ms=3500))
+                        self._ui.post(lambda: self._toast(f"✅ 已复制二维码内容:\n{display_text}", ms=3500))
                     else:
-                        self.after(0, lambda: self._toast("未能从选区识别到二维码"))
+                        self._ui.post(lambda: self._toast("未能从选区识别到二维码"))
                 except Exception as ex:
-                    self.after(0, lambda: self._toast(f"扫码异常: {ex}"))
-            threading.Thread(target=worker, daemon=True).start()
+                    self._ui.post(lambda ex=ex: self._toast(f"扫码异常: {ex}"))
+            self._tasks.submit(worker, priority=PRIO_NORMAL, group="qrcode")
         self.after(0, _main)
         
     # ── 生成二维码 ───────────────────────────
     def _run_gen_qrcode(self):
+        import pyperclip
         try:
             content = pyperclip.paste().strip()
             if not content:
@@ -1527,40 +2389,36 @@ class CompactBar(tk.Tk):
         btn_frame.pack(fill=tk.X, padx=20, pady=10)
         
         from PIL import ImageTk
-        
-        def _update_qr(*_):
-            text = entry.get().strip() or "empty"
-            try:
-                qr = qrcode.QRCode(version=None, error_correction=qrcode.constants.ERROR_CORRECT_M,
-                                   box_size=4, border=2)
-                qr.add_data(text)
-                qr.make(fit=True)
-                img = qr.make_image(fill_color="black", back_color="white")
-                # 固定显示尺寸 260x260，避免满屏
-                pil_img = img.get_image() if hasattr(img, 'get_image') else img
-                pil_img = pil_img.resize((260, 260), Image.LANCZOS)
-            except Exception:
-                import qrcode as _qr
-                qr2 = _qr.QRCode(box_size=4, border=2)
-                qr2.add_data(text)
-                qr2.make(fit=True)
-                pil_img = qr2.make_image(fill_color="black", back_color="white")
-                from PIL import Image as _PImage
-                pil_img = pil_img.resize((260, 260), _PImage.LANCZOS)
-
-            # 保存到临时文件
-            img_path = os.path.join(_WRITE_DIR, "_temp_qr.png")
-            pil_img.save(img_path)
+        ec = _load_config().get("qrcode", {}).get("error_correction", "M")
+        pending = {"id": None}
 
+        def _cur_text():
+            return entry.get().strip() or "empty"
+
+        def _update_qr():
+            pending["id"] = None
+            if not w.winfo_exists():
+                return
+            try:
+                pil_img = qr_gen.render(_cur_text(), ec)   # 按 (文本, 纠错级别) 缓存
+            except Exception as e:
+                _hklog(f"[生成二维码] {e}", "error", with_kbd_state=False)
+                return
             photo = ImageTk.PhotoImage(pil_img)
             img_lbl.config(image=photo)
             img_lbl.image = photo
-            img_lbl.qr_path = img_path
+
+        def _schedule_update(_=None):
+            # 连续输入时只在停顿后刷新一次
+            if pending["id"] is not None:
+                w.after_cancel(pending["id"])
+            pending["id"] = w.after(120, _update_qr)
+
         def _copy_img():
             import subprocess
-            path = getattr(img_lbl, 'qr_path', '')
-            if not path or not os.path.exists(path): return
             try:
+                # 仅在复制时落盘，供 PowerShell 读取
+                path = qr_gen.save(_cur_text(), os.path.join(_WRITE_DIR, "_temp_qr.png"), ec)
                 ps = (f'Add-Type -AssemblyName System.Windows.Forms,System.Drawing;'
                       f'[System.Windows.Forms.Clipboard]::SetImage('
                       f'[System.Drawing.Image]::FromFile("{path}"))')
@@ -1571,18 +2429,18 @@ class CompactBar(tk.Tk):
                 
         def _save_img():
             from tkinter import filedialog
-            path = getattr(img_lbl, 'qr_path', '')
-            if not path or not os.path.exists(path): return
             tgt = filedialog.asksaveasfilename(defaultextension=".png", 
                                              initialfile="qrcode.png",
                                              filetypes=[("PNG图片", "*.png")])
             if tgt:
-                import shutil
-                shutil.copy2(path, tgt)
-                self._toast("✅ 二维码已保存")
+                try:
+                    qr_gen.save(_cur_text(), tgt, ec)
+                    self._toast("✅ 二维码已保存")
+                except Exception as e:
+                    self._toast(f"保存失败: {e}")
 
         _update_qr()
-        entry.bind("<KeyRelease>", _update_qr)
+        entry.bind("<KeyRelease>", _schedule_update)
         
         tk.Button(btn_frame, text="复制图片", bg="#f5a623", fg="#1a1a1a", 
                   font=("微软雅黑", 9, "bold"), bd=0, cursor="hand2", padx=10, pady=5, 
@@ -1639,5 +2497,6 @@ if __name__ == "__main__":
 
     app = CompactBar()
     app.mainloop()
+    _LOG.close()
 
 # EOF
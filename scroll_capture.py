@@ -0,0 +1,243 @@
+"""
+滚动长截图
+====================================
+用户滚动页面时连续截取同一块区域，用行哈希找出相邻两帧的纵向重叠，
+只把新露出的条带拼接到长图末尾，并且只对新条带做 OCR：
+  - 每行像素（灰度、轻度量化）算 crc32，得到行哈希序列；
+  - 新帧每行按哈希到上一帧里查位置并为位移投票（重复过多的空白行不投票），
+    票数最多的位移即滚动距离；底部固定不动的行（页脚、输入框）先剔除；
+  - 新条带向上多带一段已识别内容一起 OCR，只保留中心落在新条带内的文字框，
+    避免被切断的行丢字或重复。
+
+本模块不依赖 Tk。
+"""
+
+import zlib
+import threading
+from collections import Counter, defaultdict
+
+_QUANT = bytes(v >> 3 << 3 for v in range(256))   # 灰度量化为 32 级
+
+
+def row_hashes(img):
+    """逐行哈希（灰度 + 量化后的 crc32）"""
+    g = img.convert("L")
+    w, h = g.size
+    data = g.tobytes().translate(_QUANT)
+    return [zlib.crc32(data[y * w:(y + 1) * w]) for y in range(h)]
+
+
+def static_footer(prev, new) -> int:
+    """
+    底部逐行完全相同的行数（固定页脚、输入框等）。
+    内容底部恰好是相同的空白行时也会计入；拼接时先从长图末尾截掉同样多的行、
+    再从新帧接回，结果不受影响。
+    """
+    n = 0
+    for a, b in zip(reversed(prev), reversed(new)):
+        if a != b:
+            break
+        n += 1
+    return n
+
+
+def find_scroll(prev, new, min_votes: int = 8, max_repeat: int = 4):
+    """
+    估计内容向上滚动的行数 s：new[i] == prev[i + s]。
+    返回 (s, footer)；无法可靠匹配返回 (None, footer)，完全未滚动返回 (0, footer)。
+    """
+    h = min(len(prev), len(new))
+    footer = static_footer(prev, new)
+    if footer >= h:
+        return 0, footer
+    body_prev, body_new = prev[:h - footer], new[:h - footer]
+
+    pos = defaultdict(list)
+    for y, v in enumerate(body_prev):
+        pos[v].append(y)
+    votes = Counter()
+    for i, v in enumerate(body_new):
+        ys = pos.get(v)
+        if not ys or len(ys) > max_repeat:
+            continue        # 空白、分隔线等重复行没有定位价值
+        for y in ys:
+            if y > i:
+                votes[y - i] += 1
+    if not votes:
+        return None, footer
+    s, n = votes.most_common(1)[0]
+    if n < min(min_votes, max(1, (len(body_new) - s) // 4)):
+        return None, footer
+    return s, footer
+
+
+class ScrollStitcher:
+    """逐帧喂入，维护拼接后的长图（按条带保存，需要时再合成）"""
+
+    def __init__(self, context: int = 48):
+        self.context = context      # OCR 新条带时向上附带的已有内容高度
+        self._strips = []           # [(y_offset, PIL Image)]
+        self._height = 0
+        self._width  = 0
+        self._prev   = None         # 上一帧行哈希
+        self._prev_img = None
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    def add(self, frame):
+        """
+        喂入一帧，返回 (ocr_img, ocr_y, keep_from)：
+          ocr_img   需要 OCR 的图（新条带 + 上方 context 行），无新内容时为 None；
+          ocr_y     ocr_img 顶部在长图中的 y；
+          keep_from 仅保留中心 y >= keep_from（ocr_img 坐标）的文字框。
+        """
+        hashes = row_hashes(frame)
+        if self._prev is None:
+            self._width = frame.size[0]
+            self._append(frame)
+            self._prev, self._prev_img = hashes, frame
+            return frame, 0, 0
+        if frame.size[0] != self._width:
+            return None, 0, 0
+
+        s, footer = find_scroll(self._prev, hashes)
+        if not s:
+            return None, 0, 0       # 未滚动 / 无法匹配：丢弃这一帧
+        h = frame.size[1]
+        body_h = h - footer
+        new_top = body_h - s        # 新露出内容在当前帧中的起始行
+        if new_top < 0:
+            return None, 0, 0
+
+        # 长图末尾目前是上一帧的页脚，先截掉再接新内容
+        if footer and self._strips:
+            self._trim_tail(footer)
+        strip = frame.crop((0, new_top, self._width, h))
+        y0 = self._height
+        self._append(strip)
+
+        ctx = min(self.context, new_top)
+        ocr_img = frame.crop((0, new_top - ctx, self._width, body_h))
+        self._prev, self._prev_img = hashes, frame
+        return ocr_img, y0 - ctx, ctx
+
+    def _append(self, img):
+        self._strips.append((self._height, img))
+        self._height += img.size[1]
+
+    def _trim_tail(self, n):
+        """从长图末尾去掉 n 行；末尾条带比 n 矮时继续往前截，整条用完的条带直接丢弃"""
+        n = min(n, self._height)
+        self._height -= n
+        while n and self._strips:
+            y, img = self._strips[-1]
+            if img.size[1] <= n:
+                n -= img.size[1]
+                self._strips.pop()
+            else:
+                self._strips[-1] = (y, img.crop((0, 0, self._width, img.size[1] - n)))
+                n = 0
+
+    def image(self):
+        """合成完整长图"""
+        from PIL import Image
+        out = Image.new("RGB", (self._width, max(1, self._height)), (255, 255, 255))
+        for y, img in self._strips:
+            out.paste(img, (0, y))
+        return out
+
+
+class ItemMerger:
+    """合并各条带的 OCR 结果为长图坐标下的文字框，去掉重复识别的行"""
+
+    def __init__(self, tol: int = 6):
+        self.items = []
+        self._tol  = tol
+
+    def add(self, res, y_offset: int, keep_from: int = 0):
+        added = []
+        for it in res:
+            cy = (it.get("top", 0) + it.get("bottom", 0)) / 2
+            if cy < keep_from:
+                continue
+            it = dict(it)
+            it["top"]    = it.get("top", 0) + y_offset
+            it["bottom"] = it.get("bottom", 0) + y_offset
+            if self._is_dup(it):
+                continue
+            self.items.append(it)
+            added.append(it)
+        return added
+
+    def _is_dup(self, it) -> bool:
+        t = it["text"].strip()
+        for old in reversed(self.items[-50:]):
+            if (old["text"].strip() == t
+                    and abs(old["top"] - it["top"]) <= self._tol
+                    and abs(old.get("left", 0) - it.get("left", 0)) <= self._tol):
+                return True
+        return False
+
+    def text(self) -> str:
+        items = sorted(self.items, key=lambda it: (it["top"], it.get("left", 0)))
+        return "\n".join(it["text"] for it in items)
+
+
+def _default_grab(bbox):
+    from PIL import ImageGrab
+    return ImageGrab.grab(bbox=bbox, all_screens=True)
+
+
+class ScrollSession:
+    """
+    后台线程：按 interval 秒截取 bbox，拼接并对新条带做 OCR。
+    ocr_fn(PIL Image) 返回 do_ocr_raw 格式的 items；on_progress(height, n_items) 在工作线程回调。
+    """
+
+    def __init__(self, bbox, ocr_fn, interval: float = 0.3, on_progress=None,
+                 grab_fn=None, on_error=None):
+        self.bbox        = tuple(int(v) for v in bbox)
+        self.interval    = max(0.05, float(interval))
+        self.stitcher    = ScrollStitcher()
+        self.merger      = ItemMerger()
+        self._ocr        = ocr_fn
+        self._grab       = grab_fn or _default_grab
+        self._on_progress = on_progress
+        self._on_error   = on_error
+        self._stop       = threading.Event()
+        self._thread     = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止采样并等待当前帧处理完，返回 (长图, 文字框, 全文)"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=30)
+        return self.stitcher.image(), self.merger.items, self.merger.text()
+
+    def step(self, frame):
+        ocr_img, y, keep_from = self.stitcher.add(frame)
+        if ocr_img is None:
+            return []
+        res = self._ocr(ocr_img)
+        if isinstance(res, str):
+            if self._on_error:
+                self._on_error(res)
+            return []
+        return self.merger.add(res, y, keep_from)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                added = self.step(self._grab(self.bbox))
+                if added and self._on_progress:
+                    self._on_progress(self.stitcher.height, len(self.merger.items))
+            except Exception as e:
+                if self._on_error:
+                    self._on_error(f"[长截图错误] {e}")
+            self._stop.wait(self.interval)
@@ -0,0 +1,129 @@
+"""
+共享任务执行器
+====================================
+所有由界面触发的后台工作（截屏、OCR、翻译、扫码……）统一提交到这里，而不是各自新建线程：
+  - 固定数量的工作线程，连按热键也不会堆出一堆线程去抢同一个 OCR 引擎；
+  - 优先级队列：数字越小越先执行，同优先级时后提交的先执行（最新的交互截图优先）；
+  - 每个任务带 CancelToken，关闭弹窗即取消；同一 group 的新任务会取消旧任务；
+  - stats() 提供排队 / 执行中 / 完成 / 取消 / 失败计数，用于诊断。
+"""
+
+import heapq
+import itertools
+import threading
+
+PRIO_INTERACTIVE = 0    # 截屏、裁剪等用户正在等待的步骤
+PRIO_NORMAL      = 1    # OCR、翻译、扫码
+PRIO_BACKGROUND  = 2    # 预热、写历史等可延后的工作
+
+
+class Cancelled(Exception):
+    """任务已被取消（由 CancelToken.raise_if_cancelled 抛出）"""
+
+
+class CancelToken:
+    def __init__(self):
+        self._ev = threading.Event()
+
+    def cancel(self):
+        self._ev.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._ev.is_set()
+
+    def raise_if_cancelled(self):
+        if self._ev.is_set():
+            raise Cancelled()
+
+
+class TaskExecutor:
+    """有界优先级线程池（工作线程按需创建，均为 daemon）"""
+
+    def __init__(self, workers: int = 3, name: str = "task", on_error=None):
+        self._max      = max(1, int(workers))
+        self._name     = name
+        self._on_error = on_error
+        self._heap     = []
+        self._seq      = itertools.count()
+        self._cv       = threading.Condition()
+        self._threads  = []
+        self._idle     = 0
+        self._groups   = {}         # group -> 最近一次提交的 CancelToken
+        self._closed   = False
+        self._counts   = {"active": 0, "done": 0, "cancelled": 0, "failed": 0}
+
+    def submit(self, fn, *args, priority: int = PRIO_NORMAL, token: CancelToken = None,
+               group: str = None, name: str = None, **kwargs) -> CancelToken:
+        """提交任务，返回其 CancelToken；group 相同的旧任务会被取消"""
+        token = token or CancelToken()
+        with self._cv:
+            if self._closed:
+                token.cancel()
+                return token
+            if group is not None:
+                old = self._groups.get(group)
+                if old is not None and old is not token:
+                    old.cancel()
+                self._groups[group] = token
+            job = (fn, args, kwargs, token, name or getattr(fn, "__name__", "job"))
+            # 同优先级后提交的先执行：序号取负
+            heapq.heappush(self._heap, (priority, -next(self._seq), job))
+            if self._idle == 0 and len(self._threads) < self._max:
+                t = threading.Thread(target=self._worker, daemon=True,
+                                     name=f"{self._name}-{len(self._threads) + 1}")
+                self._threads.append(t)
+                t.start()
+            self._cv.notify()
+        return token
+
+    def cancel_group(self, group: str):
+        with self._cv:
+            tok = self._groups.pop(group, None)
+        if tok:
+            tok.cancel()
+
+    def stats(self) -> dict:
+        with self._cv:
+            queued = sum(1 for _, _, j in self._heap if not j[3].cancelled)
+            return dict(self._counts, queued=queued, workers=len(self._threads),
+                        max_workers=self._max)
+
+    def shutdown(self):
+        with self._cv:
+            self._closed = True
+            for _, _, job in self._heap:
+                job[3].cancel()
+            self._heap.clear()
+            self._cv.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                self._idle += 1
+                while not self._heap and not self._closed:
+                    self._cv.wait()
+                self._idle -= 1
+                if self._closed and not self._heap:
+                    return
+                _, _, job = heapq.heappop(self._heap)
+                fn, args, kwargs, token, name = job
+                if token.cancelled:
+                    self._counts["cancelled"] += 1
+                    continue
+                self._counts["active"] += 1
+            result = "done"
+            try:
+                fn(*args, **kwargs)
+            except Cancelled:
+                result = "cancelled"
+            except Exception as e:
+                result = "failed"
+                if self._on_error:
+                    try:
+                        self._on_error(name, e)
+                    except Exception:
+                        pass
+            with self._cv:
+                self._counts["active"] -= 1
+                self._counts[result] += 1
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.fakes import StubTranslateServer, redirect_aio
+from wxocr_core import aio
+from wxocr_core.config import save_config
+from wxocr_core.engine import WcocrEngine
+
+ENGINE = "百度翻译"     # 不需要密钥；替身服务把原文倒序作为译文
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    monkeypatch.setenv("WXOCR_HOME", str(tmp_path))
+    save_config({"tm": {"enabled": False}, "translate": {"detect": False}})   # 每行都真的发请求
+    with StubTranslateServer(latency_ms=200) as srv:
+        undo = redirect_aio(srv.port)
+        try:
+            yield srv
+        finally:
+            undo()
+
+
+def _sent(srv) -> int:
+    return sum(srv.hits.values())
+
+
+def test_translate_text_roundtrip(stub):
+    out = asyncio.run(aio.translate_text("hello world", "zh", ENGINE, cache=False, detect=False))
+    assert out == "dlrow olleh"
+    assert asyncio.run(aio.translate_text("  ", "zh", ENGINE)) == aio.EMPTY_MSG
+
+
+def test_translate_lines_keep_input_order(stub):
+    out = asyncio.run(aio.translate(["abc", "", "xyz"], "zh", ENGINE, cache=False))
+    assert out == ["cba", "", "zyx"]
+
+
+def test_translate_iter_yields_every_line(stub):
+    async def run():
+        return [r async for r in aio.translate_iter(["ab", "cd", "ef"], "zh", ENGINE, cache=False)]
+    assert sorted(asyncio.run(run())) == [(0, "ab", "ba"), (1, "cd", "dc"), (2, "ef", "fe")]
+
+
+def test_translate_iter_close_cancels_remaining_requests(stub):
+    lines = [f"line {i}" for i in range(8)]
+
+    async def run():
+        it = aio.translate_iter(lines, "zh", ENGINE, cache=False)
+        first = await it.__anext__()
+        await it.aclose()                       # 调用方提前结束
+        await asyncio.sleep(0.5)                # 若未取消，信号量放行的后续请求会在此期间发出
+        return first, [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    first, left = asyncio.run(run())
+    assert first[2] == first[1][::-1]
+    assert left == []
+    assert _sent(stub) <= 4                     # 每引擎并发 2：只发出了前两批
+
+
+def test_cancelling_caller_cancels_translate(stub):
+    lines = [f"line {i}" for i in range(8)]
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(aio.translate(lines, "zh", ENGINE, cache=False), 0.05)
+        await asyncio.sleep(0.5)
+        return [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert _sent(stub) <= 2
+
+
+class _SingleChannel:
+    """wcocr 替身：同时有两次 ocr 调用进入即记为违规"""
+
+    def __init__(self):
+        self.busy = 0
+        self.overlap = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def ocr(self, path):
+        with self._lock:
+            self.busy += 1
+            self.calls += 1
+            self.overlap += self.busy > 1
+        time.sleep(0.01)
+        with self._lock:
+            self.busy -= 1
+        return {"ocr_response": [{"text": b"ok", "left": 0, "top": 0, "right": 1, "bottom": 1}]}
+
+
+def test_engine_serializes_concurrent_callers(tmp_path):
+    eng = WcocrEngine(str(tmp_path / "x.exe"), str(tmp_path))
+    eng._mod = fake = _SingleChannel()
+    img = str(tmp_path / "a.png")
+
+    async def via_aio():
+        return await asyncio.gather(*(aio.ocr(img, eng) for _ in range(4)))
+
+    threads = [threading.Thread(target=eng.ocr_raw, args=(img,)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    res = asyncio.run(via_aio())
+    for t in threads:
+        t.join()
+    assert all(r == [{"text": "ok", "left": 0, "top": 0, "right": 1, "bottom": 1}] for r in res)
+    assert fake.calls == 8 and fake.overlap == 0
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from async_log import AsyncLogger
+
+
+def test_flush_waits_for_batch_being_written(tmp_path):
+    path = tmp_path / "a.log"
+    lg = AsyncLogger(str(path), batch=4, flush_interval=0.05)
+    write = lg._write
+
+    def slow_write(lines):
+        time.sleep(0.3)
+        write(lines)
+
+    lg._write = slow_write
+    for i in range(3):
+        lg.log(f"m{i}")
+    time.sleep(0.1)                 # 写线程已取走这批记录，正在写
+    assert lg.flush()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 3
+    lg.close()
+
+
+def test_close_writes_everything(tmp_path):
+    path = tmp_path / "a.log"
+    lg = AsyncLogger(str(path), fmt="json")
+    for i in range(10):
+        lg.log("hello", n=i)
+    lg.close()
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 10
+    assert lg.stats() == {"queued": 0, "written": 10, "dropped": 0}
+
+
+def test_flush_marker_not_evicted_by_full_queue(tmp_path):
+    path = tmp_path / "a.log"
+    lg = AsyncLogger(str(path), batch=1000, flush_interval=0.05, max_queue=5)
+    write = lg._write
+
+    def slow_write(lines):
+        time.sleep(0.2)
+        write(lines)
+
+    lg._write = slow_write
+    lg.log("first")
+    time.sleep(0.1)                 # 写线程正在写第一条
+    result = []
+    t = threading.Thread(target=lambda: result.append(lg.flush(timeout=3)))
+    t.start()
+    time.sleep(0.02)
+    for i in range(20):             # flush 之后继续写满队列，挤掉更早的记录
+        lg.log(f"m{i}")
+    t.join()
+    assert result == [True]
+    lg.close()
@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from PIL import Image
+
+from wxocr_core.engine import WcocrEngine, items_to_text, parse_ocr_result
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_without_tkinter_or_windows_modules():
+    # sys.modules 中置 None 的模块一旦被导入就会抛 ImportError
+    code = textwrap.dedent("""
+        import sys
+        for m in ("tkinter", "_tkinter", "winreg", "msvcrt", "win32api", "win32con",
+                  "win32gui", "pywintypes", "wcocr", "pystray", "keyboard"):
+            sys.modules[m] = None
+        import wxocr_core
+        from wxocr_core import aio, batch, service, glossary, langdetect, tm
+        assert "ctypes.wintypes" not in sys.modules
+        print("ok")
+    """)
+    out = subprocess.run([sys.executable, "-c", code], cwd=_ROOT, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "ok"
+
+
+def test_parse_ocr_result_decodes_and_drops_blank_lines():
+    raw = {"ocr_response": [
+        {"text": "你好".encode("utf-8"), "left": 1, "top": 2, "right": 3, "bottom": 4},
+        {"text": "  ", "left": 0, "top": 0, "right": 0, "bottom": 0},
+        {"text": "world", "left": 5, "top": 6},
+    ]}
+    assert parse_ocr_result(raw) == [
+        {"text": "你好", "left": 1, "top": 2, "right": 3, "bottom": 4},
+        {"text": "world", "left": 5, "top": 6, "right": 0, "bottom": 0},
+    ]
+    assert parse_ocr_result({}) == []
+
+
+def test_items_to_text_skips_blank_items():
+    items = [{"text": "a"}, {"text": " "}, {"text": "b"}]
+    assert items_to_text(items) == "a\nb"
+    assert items_to_text([]) == ""
+
+
+class _BandEngine(WcocrEngine):
+    """ocr_raw 替身：每个条带返回一行，位于条带正中"""
+
+    def __init__(self):
+        super().__init__("x.exe", ".")
+        self.bands = []
+
+    def ocr_raw(self, image_path):
+        with Image.open(image_path) as im:
+            w, h = im.size
+        self.bands.append(h)
+        return [{"text": f"b{len(self.bands)}", "left": 0, "top": h // 2 - 5,
+                 "right": w, "bottom": h // 2 + 5}]
+
+
+def _tall(tmp_path, monkeypatch, h=250):
+    monkeypatch.setenv("WXOCR_HOME", str(tmp_path))
+    path = str(tmp_path / "tall.png")
+    Image.new("RGB", (40, h), "white").save(path)
+    opened = []
+    real_open = Image.open
+    monkeypatch.setattr(Image, "open", lambda p, *a, **k: (opened.append(p), real_open(p, *a, **k))[1])
+    return path, opened
+
+
+def test_ocr_iter_bands_open_source_once_and_remove_temp(tmp_path, monkeypatch):
+    path, opened = _tall(tmp_path, monkeypatch)
+    eng = _BandEngine()
+    parts = list(eng.ocr_iter(path, band_px=100, overlap=10))
+    assert eng.bands == [100, 100, 70]
+    assert [[(it["text"], it["top"]) for it in p] for p in parts] == [[("b1", 45)], [("b2", 135)],
+                                                                      [("b3", 210)]]
+    assert opened.count(path) == 1
+    assert not list(tmp_path.glob("_temp_band_*"))
+
+
+def test_ocr_iter_early_close_removes_temp(tmp_path, monkeypatch):
+    path, _ = _tall(tmp_path, monkeypatch)
+    it = _BandEngine().ocr_iter(path, band_px=100, overlap=10)
+    next(it)
+    assert list(tmp_path.glob("_temp_band_*"))
+    it.close()
+    assert not list(tmp_path.glob("_temp_band_*"))
+
+
+def test_ocr_iter_small_image_single_call(tmp_path, monkeypatch):
+    path, opened = _tall(tmp_path, monkeypatch, h=80)
+    eng = _BandEngine()
+    assert [p[0]["text"] for p in eng.ocr_iter(path, band_px=100)] == ["b1"]
+    assert eng.bands == [80] and opened.count(path) == 2     # 取尺寸一次 + 替身识别一次
@@ -0,0 +1,45 @@
+from wxocr_core.glossary import Glossary
+from wxocr_core.langdetect import Plan
+
+
+def _g():
+    return Glossary({"save": "保存", "cancel": "取消", "save as": "另存为", "cat": "猫"})
+
+
+def test_matches_prefer_longest_and_respect_word_boundaries():
+    g = _g()
+    assert [t for _, _, t in g.matches("Save As...")] == ["另存为"]
+    assert g.matches("category") == []
+
+
+def test_translate_line_offline_only_when_nothing_else_left():
+    g = _g()
+    assert g.translate_line("Cancel") == "取消"
+    assert g.translate_line("Save / Cancel") == "保存 / 取消"
+    assert g.translate_line("Save the file") is None
+
+
+def test_protect_and_restore_roundtrip():
+    g = _g()
+    line, holes = g.protect("Click Save to continue")
+    assert line == "Click {1} to continue"
+    assert Glossary.restore("点击 {1} 继续", holes) == "点击保存继续"      # 汉字之间多出的空格一并去掉
+
+
+def test_restore_rejects_lost_or_duplicated_placeholders():
+    holes = {1: "保存", 2: "取消"}
+    assert Glossary.restore("{1} 或 {2}", holes) == "保存或取消"
+    assert Glossary.restore("{1} 或 {1}", holes) is None
+    assert Glossary.restore("{1}", holes) is None
+    assert Glossary.fill("{1} 或 {3}", holes) == "保存或 {3}"
+
+
+def test_merge_retries_lines_with_lost_placeholders():
+    p = Plan(["Open Settings now", "Close Settings"], [True, True], "en")
+    p.holes = {0: ("Open {1} now", {1: "设置"}), 1: ("Close {1}", {1: "设置"})}
+    merged = p.merge("立即打开 {1}\n关闭")
+    assert merged == "立即打开设置\n关闭"
+    assert p.retry == [1]
+    assert p.retry_text == "Close Settings"
+    assert p.repair("关闭设置") == "立即打开设置\n关闭设置"
+    assert p.repair("a\nb") is None
@@ -0,0 +1,92 @@
+import sqlite3
+
+import pytest
+
+from history_store import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = HistoryStore(str(tmp_path / "history.db"))
+    yield s
+    s.close()
+
+
+def _texts(rows):
+    return sorted(r["text"] for r in rows)
+
+
+def test_fts_substring_search(store):
+    if not store.fts:
+        pytest.skip("SQLite 不支持 FTS5 trigram")
+    store.add("The quick brown fox", "敏捷的棕色狐狸")
+    store.add("Lazy dog sleeps", "懒狗在睡觉")
+    assert _texts(store.search("uick")) == ["The quick brown fox"]
+    assert _texts(store.search("棕色狐")) == ["The quick brown fox"]
+    assert _texts(store.search("dog 睡觉")) == ["Lazy dog sleeps"]
+    assert store.search("fox dog") == []
+    # 引号、AND 等按字面匹配，不当成 FTS 语法
+    assert store.search('"AND"') == []
+
+
+def test_short_terms_use_like(store):
+    store.add("ab cd", "甲乙")
+    store.add("100% done", "完成")
+    assert _texts(store.search("ab")) == ["ab cd"]
+    assert _texts(store.search("乙")) == ["ab cd"]
+    assert _texts(store.search("%")) == ["100% done"]      # 通配符按字面匹配
+    assert store.search("_") == []
+
+
+def test_update_and_delete_keep_index_in_sync(store):
+    rid = store.add("original text here")
+    store.set_translation(rid, "新的译文内容")
+    assert [r["id"] for r in store.search("新的译文")] == [rid]
+    store.delete(rid)
+    assert store.search("original") == []
+    assert store.count() == 0
+
+
+def test_prune_by_max_mb(tmp_path):
+    s = HistoryStore(str(tmp_path / "h.db"), max_mb=0.1)
+    for i in range(60):
+        s.add(f"row {i} " + "x" * 4000, ts=i)
+    s.prune()
+    assert s.size_bytes() <= s.max_bytes
+    assert 0 < s.count() < 60
+    # 删掉的是最旧的记录
+    assert min(r["ts"] for r in s.search("", limit=100)) > 0
+    s.close()
+
+
+def _set_tokenizer(path, old, new):
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA writable_schema = ON")
+    db.execute("UPDATE sqlite_master SET sql = replace(sql, ?, ?) WHERE name = 'captures_fts'",
+               (f"'{old}'", f"'{new}'"))
+    db.commit()
+    db.close()
+
+
+def test_reopen_without_tokenizer_falls_back_to_like(tmp_path):
+    path = str(tmp_path / "h.db")
+    s = HistoryStore(path)
+    if not s.fts:
+        pytest.skip("SQLite 不支持 FTS5 trigram")
+    s.add("written with trigram")
+    s.close()
+
+    # 模拟换到不支持 trigram 的 SQLite：索引表的分词器不存在
+    _set_tokenizer(path, "trigram", "missing_tokenizer")
+    s = HistoryStore(path)
+    assert not s.fts
+    s.add("written without index")             # 不再被触发器拖垮
+    assert _texts(s.search("written")) == ["written with trigram", "written without index"]
+    s.close()
+
+    # 回到支持的环境：触发器重建，停用期间的记录补进索引
+    _set_tokenizer(path, "missing_tokenizer", "trigram")
+    s = HistoryStore(path)
+    assert s.fts
+    assert _texts(s.search("without")) == ["written without index"]
+    s.close()
@@ -0,0 +1,29 @@
+from wxocr_core import langdetect
+
+
+def test_english_sentence_is_skipped_for_english_target():
+    p = langdetect.plan("Press the button to continue", "en")
+    assert p.keep == [False]
+    assert p.skip_all
+
+
+def test_short_non_english_words_are_still_sent():
+    # 证据不足时只猜 ("en", 0.3)，不能把西班牙语按钮当英文跳过
+    lang, conf = langdetect.detect("Aceptar")
+    assert conf < 0.6
+    p = langdetect.plan("Aceptar\nHola amigo", "en")
+    assert p.keep == [True, True]
+    assert p.source == "auto"
+
+
+def test_mixed_lines_only_send_foreign_ones():
+    p = langdetect.plan("你好世界\nGood morning to you\nhttps://example.com", "zh")
+    assert p.keep == [False, True, False]
+    assert p.partial
+    assert p.send == "Good morning to you"
+
+
+def test_merge_line_count_mismatch_returns_none():
+    p = langdetect.plan("你好\nGood morning to you\n世界", "zh")
+    assert p.merge("早上好\n多出来的一行") is None
+    assert p.merge("早上好") == "你好\n早上好\n世界"
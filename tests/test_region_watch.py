@@ -0,0 +1,33 @@
+from PIL import Image, ImageDraw
+
+from region_watch import LineDeduper, RegionWatcher
+
+
+def _frame(text):
+    img = Image.new("RGB", (200, 96), "white")
+    if text:
+        ImageDraw.Draw(img).rectangle((10, 40, 10 + 10 * len(text), 60), fill="black")
+    return img
+
+
+def test_repeated_subtitle_is_emitted_again_after_it_disappears():
+    cur = {}
+
+    def ocr(img):
+        t = cur["text"]
+        return [{"text": t, "left": 10, "top": 40, "right": 100, "bottom": 60}] if t else []
+
+    w = RegionWatcher((0, 0, 200, 96), ocr, lambda items: None)
+    out = []
+    for t in ["Yes.", "", "Yes.", "Yes.", "No.", "Yes."]:
+        cur["text"] = t
+        out.append([it["text"] for it in w.step(_frame(t))])
+    assert out == [["Yes."], [], ["Yes."], [], ["No."], ["Yes."]]
+
+
+def test_lines_outside_rescanned_bands_stay_seen():
+    d = LineDeduper()
+    line = {"text": "Hello", "top": 10, "bottom": 20}
+    assert d.filter([line]) == [line]
+    assert d.filter([], scanned=[(50, 100)]) == []
+    assert d.filter([line], scanned=[(0, 30)]) == []
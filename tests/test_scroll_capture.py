@@ -0,0 +1,49 @@
+import random
+
+from PIL import Image, ImageDraw
+
+from scroll_capture import ItemMerger, ScrollStitcher, find_scroll, row_hashes
+
+
+def _page(height=1000, width=120):
+    """随机噪点长页面（每行各不相同，第 890 与 999 行留白），便于逐像素比对"""
+    rnd = random.Random(7)
+    img = Image.frombytes("RGB", (width, height), bytes(rnd.randrange(256) for _ in range(width * height * 3)))
+    d = ImageDraw.Draw(img)
+    for y in (890, 999):
+        d.line((0, y, width - 1, y), fill=(255, 255, 255))
+    return img
+
+
+def test_find_scroll_detects_offset():
+    page = _page()
+    a, b = page.crop((0, 0, 120, 300)), page.crop((0, 45, 120, 345))
+    assert find_scroll(row_hashes(a), row_hashes(b)) == (45, 0)
+
+
+def test_stitch_reproduces_page():
+    page, view = _page(), 300
+    st = ScrollStitcher()
+    for top in (0, 70, 150, 151, 260, 500, 700):
+        st.add(page.crop((0, top, 120, top + view)))
+    assert st.height == 1000
+    assert st.image().tobytes() == page.tobytes()
+
+
+def test_trim_tail_crosses_strips():
+    # 后几帧只滚动一两行、底部又恰好是相同空白行时，要截掉的页脚比最后一个条带还高
+    page, view = _page(), 740
+    st = ScrollStitcher()
+    for top in (0, 70, 150, 151, 260):
+        st.add(page.crop((0, top, 120, top + view)))
+    assert st.height == 1000
+    assert st.image().tobytes() == page.tobytes()
+
+
+def test_item_merger_dedupes_overlap():
+    m = ItemMerger()
+    m.add([{"text": "Hello", "left": 0, "top": 10, "bottom": 30}], 0)
+    added = m.add([{"text": "Hello", "left": 0, "top": 0, "bottom": 20},
+                   {"text": "World", "left": 0, "top": 40, "bottom": 60}], 12)
+    assert [it["text"] for it in added] == ["World"]
+    assert m.text() == "Hello\nWorld"
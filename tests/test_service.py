@@ -0,0 +1,148 @@
+import http.client
+import io
+import json
+import socket
+import threading
+from concurrent.futures import wait
+
+import pytest
+from PIL import Image, ImageDraw
+
+from wxocr_core import service
+from wxocr_core.batch import pack_images, split_items
+from wxocr_core.service import OcrBatcher, OcrService
+
+
+class FakeEngine:
+    """把图中每段连续的非白色横条识别成一个文字框，文字为该条的灰度值"""
+
+    ready = True
+
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self._lock = threading.Lock()
+
+    def ocr_raw(self, path):
+        with self._lock:
+            self.calls.append(path)
+        if self.error:
+            return self.error
+        im = Image.open(path).convert("L")
+        w, h = im.size
+        px = im.load()
+        items, cur = [], None
+        for y in range(h):
+            xs = [x for x in range(w) if px[x, y] < 250]
+            v = px[xs[0], y] if xs else None
+            if cur and v != cur["v"]:
+                items.append(cur)
+                cur = None
+            if v is not None and cur is None:
+                cur = {"v": v, "text": f"g{v}", "left": xs[0], "top": y, "right": xs[-1] + 1}
+            if cur is not None:
+                cur["bottom"] = y + 1
+        if cur:
+            items.append(cur)
+        return [{k: it[k] for k in ("text", "left", "top", "right", "bottom")} for it in items]
+
+
+def _png(gray, w=120, h=60, bar=(10, 20, 90, 40)):
+    im = Image.new("RGB", (w, h), "white")
+    ImageDraw.Draw(im).rectangle((bar[0], bar[1], bar[2] - 1, bar[3] - 1), fill=(gray,) * 3)
+    buf = io.BytesIO()
+    im.save(buf, "PNG")
+    return buf.getvalue()
+
+
+def test_split_items_assigns_by_center_and_rebases():
+    slots = [(32, 100, 50), (114, 80, 40)]
+    items = [{"text": "b", "left": 0, "top": 120, "right": 200, "bottom": 130},
+             {"text": "a", "left": 5, "top": 40, "right": 50, "bottom": 60},
+             {"text": "gap", "left": 0, "top": 90, "right": 10, "bottom": 100}]
+    a, b = split_items(items, slots)
+    assert a == [{"text": "a", "left": 5, "top": 8, "right": 50, "bottom": 28}]
+    assert b == [{"text": "b", "left": 0, "top": 6, "right": 80, "bottom": 16}]
+
+
+def test_pack_then_split_roundtrip(tmp_path):
+    imgs = [Image.open(io.BytesIO(_png(g))) for g in (0, 60, 120)]
+    canvas, slots = pack_images(imgs)
+    canvas.save(tmp_path / "canvas.png")
+    parts = split_items(FakeEngine().ocr_raw(str(tmp_path / "canvas.png")), slots)
+    assert [[it["text"] for it in p] for p in parts] == [["g0"], ["g60"], ["g120"]]
+    assert all(p[0]["top"] == 20 and p[0]["bottom"] == 40 for p in parts)
+
+
+def test_batcher_merges_concurrent_small_images(tmp_path):
+    eng = FakeEngine()
+    b = OcrBatcher(eng, window_ms=300, max_batch=8, tmp_dir=str(tmp_path))
+    futs = [b.submit(data=_png(g)) for g in (0, 60, 120)]
+    wait(futs, timeout=10)
+    res = [f.result() for f in futs]
+    assert [[it["text"] for it in r] for r in res] == [["g0"], ["g60"], ["g120"]]
+    assert all(r[0]["top"] == 20 and r[0]["bottom"] == 40 for r in res)    # 各自图内坐标
+    assert len(eng.calls) == 1
+    assert b.stats["batched"] == 3 and b.stats["max_batch"] == 3
+
+
+def test_batcher_large_image_is_recognised_alone(tmp_path):
+    eng = FakeEngine()
+    b = OcrBatcher(eng, window_ms=300, tmp_dir=str(tmp_path))
+    big = _png(30, h=service.BATCH_MAX_H + 100, bar=(0, 300, 50, 320))
+    futs = [b.submit(data=_png(0)), b.submit(data=_png(60)), b.submit(data=big)]
+    wait(futs, timeout=10)
+    assert [it["text"] for it in futs[2].result()] == ["g30"]
+    assert futs[2].result()[0]["top"] == 300
+    assert len(eng.calls) == 2 and b.stats["batched"] == 2
+
+
+def test_batcher_engine_error_reaches_every_request(tmp_path):
+    eng = FakeEngine(error="[OCR 错误] boom")
+    b = OcrBatcher(eng, window_ms=300, tmp_dir=str(tmp_path))
+    futs = [b.submit(data=_png(g)) for g in (0, 60)]
+    wait(futs, timeout=10)
+    assert [f.result() for f in futs] == ["[OCR 错误] boom"] * 2
+
+
+@pytest.fixture
+def svc(tmp_path, monkeypatch):
+    monkeypatch.setenv("WXOCR_HOME", str(tmp_path))
+    s = OcrService(port=0, engine=FakeEngine()).start()
+    yield s
+    s.stop()
+
+
+def test_http_ocr_roundtrip(svc):
+    conn = http.client.HTTPConnection("127.0.0.1", svc.port, timeout=10)
+    conn.request("POST", "/ocr", body=_png(0), headers={"Content-Type": "image/png"})
+    resp = conn.getresponse()
+    obj = json.loads(resp.read())
+    assert resp.status == 200 and obj["text"] == "g0"
+    conn.request("GET", "/health")                  # 同一条长连接继续可用
+    assert conn.getresponse().status == 200
+    conn.close()
+
+
+def test_http_non_object_json_is_400(svc):
+    conn = http.client.HTTPConnection("127.0.0.1", svc.port, timeout=10)
+    conn.request("POST", "/translate", body=b"[1, 2]", headers={"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    assert resp.status == 400
+    assert resp.getheader("Connection") == "close"
+    conn.close()
+
+
+def test_http_oversized_body_closes_connection(svc):
+    with socket.create_connection(("127.0.0.1", svc.port), timeout=10) as s:
+        # 声明超大请求体，后面紧跟的字节若被当成下一个请求解析会得到第二个响应
+        s.sendall(b"POST /ocr HTTP/1.1\r\nHost: x\r\nContent-Length: %d\r\n\r\n"
+                  b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n" % (service.MAX_BODY + 1))
+        data = b""
+        while True:
+            chunk = s.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    assert data.startswith(b"HTTP/1.1 400")
+    assert data.count(b"HTTP/1.1 ") == 1
@@ -0,0 +1,81 @@
+import threading
+
+from task_pool import PRIO_INTERACTIVE, PRIO_NORMAL, Cancelled, CancelToken, TaskExecutor
+
+
+def _blocked_pool():
+    """单线程池，先占住工作线程，便于排队后再放行"""
+    pool, gate, started = TaskExecutor(workers=1), threading.Event(), threading.Event()
+    pool.submit(lambda: (started.set(), gate.wait(5)))
+    started.wait(5)
+    return pool, gate
+
+
+def _drain(pool):
+    done = threading.Event()
+    pool.submit(done.set, priority=99)
+    assert done.wait(5)
+
+
+def test_priority_then_newest_first():
+    pool, gate = _blocked_pool()
+    order = []
+    pool.submit(order.append, "normal-1", priority=PRIO_NORMAL)
+    pool.submit(order.append, "normal-2", priority=PRIO_NORMAL)
+    pool.submit(order.append, "grab", priority=PRIO_INTERACTIVE)
+    gate.set()
+    _drain(pool)
+    assert order == ["grab", "normal-2", "normal-1"]
+    pool.shutdown()
+
+
+def test_same_group_cancels_older_task():
+    pool, gate = _blocked_pool()
+    ran = []
+    old = pool.submit(ran.append, "old", group="ocr")
+    pool.submit(ran.append, "new", group="ocr")
+    assert old.cancelled
+    gate.set()
+    _drain(pool)
+    assert ran == ["new"]
+    assert pool.stats()["cancelled"] == 1
+    pool.shutdown()
+
+
+def test_cancelled_and_failed_are_counted():
+    errors = []
+    pool = TaskExecutor(workers=1, on_error=lambda name, e: errors.append(name))
+    tok = CancelToken()
+
+    def job():
+        tok.cancel()
+        tok.raise_if_cancelled()
+
+    def boom():
+        raise ValueError("x")
+
+    pool.submit(job, token=tok)
+    pool.submit(boom)
+    _drain(pool)
+    st = pool.stats()
+    assert st["cancelled"] == 1 and st["failed"] == 1
+    assert errors == ["boom"]
+    pool.shutdown()
+
+
+def test_submit_after_shutdown_returns_cancelled_token():
+    pool = TaskExecutor(workers=1)
+    pool.shutdown()
+    assert pool.submit(lambda: None).cancelled
+
+
+def test_raise_if_cancelled():
+    tok = CancelToken()
+    tok.raise_if_cancelled()
+    tok.cancel()
+    try:
+        tok.raise_if_cancelled()
+    except Cancelled:
+        pass
+    else:
+        raise AssertionError("expected Cancelled")
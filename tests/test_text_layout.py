@@ -0,0 +1,80 @@
+import text_layout
+from text_layout import GlyphMetrics, fit_items, fit_text, get_metrics
+
+
+def _metrics(calls=None, line_h=96.0):
+    """参考字号 64 下：汉字 64px 宽，其余 32px；行高默认为字号的 1.5 倍"""
+    def measure(ch):
+        if calls is not None:
+            calls.append(ch)
+        return 64 if ord(ch) > 0x2e80 else 32
+    return GlyphMetrics(measure, line_h, ref_px=64)
+
+
+def test_fit_stays_inside_box():
+    m = _metrics()
+    for text, w, h in [("hello world foo bar", 120, 60), ("你好世界，今天天气很好", 100, 80),
+                       ("a", 300, 30), ("mixed 中文 text", 90, 90)]:
+        fit = fit_text(text, w, h, m, min_px=8, max_px=48)
+        assert not fit.overflow
+        assert fit.width <= w + 0.5 and fit.height <= h + 0.5
+        # 所有行的实际宽度都不超过框宽
+        assert all(m.text_width(l, fit.px) <= w + 0.5 for l in fit.lines)
+        # 再大一号就放不下（或已到上限）
+        bigger = fit_text(text, w, h, m, min_px=fit.px + 1, max_px=fit.px + 1)
+        assert fit.px == 48 or bigger.overflow
+
+
+def test_wraps_cjk_per_character():
+    fit = fit_text("你好世界", 64, 200, _metrics(), min_px=16, max_px=16)
+    assert fit.lines == ["你好世界"]
+    fit = fit_text("你好世界", 40, 200, _metrics(), min_px=16, max_px=16)
+    assert fit.lines == ["你好", "世界"]
+
+
+def test_overflow_at_min_size():
+    fit = fit_text("a very long sentence that cannot fit", 20, 10, _metrics(), min_px=8, max_px=24)
+    assert fit.overflow and fit.px == 8
+
+
+def test_cap_uses_line_height_ratio(monkeypatch):
+    seen = []
+    real = text_layout.fit_text
+
+    def spy(text, bw, bh, metrics, min_px, max_px, wrap):
+        seen.append(max_px)
+        return real(text, bw, bh, metrics, min_px, max_px, wrap)
+
+    monkeypatch.setattr(text_layout, "fit_text", spy)
+    item = {"left": 0, "top": 0, "right": 500, "bottom": 20}
+    (x, y, fit), = fit_items([item], ["a"], _metrics(), min_px=8, max_px=48)
+    # 行高 = 1.5 × 字号：框高 20 最多放 13px（行高 19.5），而不是 20px
+    assert seen == [13]
+    assert fit.px == 13
+    # 按物理像素 / 逻辑坐标换算后再取上限
+    seen.clear()
+    fit_items([item], ["a"], _metrics(), scale=(2.0, 2.0), min_px=4, max_px=48)
+    assert seen == [int(10.5 / 1.5)]
+
+
+def test_glyph_cache_measures_each_char_once():
+    calls = []
+    m = _metrics(calls)
+    assert m.ref_width("abca") == 128
+    assert sorted(calls) == ["a", "b", "c"]
+    m.text_width("cab", 32)
+    fit_text("abc abc", 100, 50, m)
+    assert sorted(calls) == [" ", "a", "b", "c"]     # 只多量了空格
+    assert len(m) == 4
+
+
+def test_get_metrics_shares_instance():
+    made = []
+
+    def factory():
+        made.append(1)
+        return _metrics()
+
+    a = get_metrics(("test", "shared"), factory)
+    b = get_metrics(("test", "shared"), factory)
+    assert a is b and made == [1]
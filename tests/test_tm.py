@@ -0,0 +1,35 @@
+from wxocr_core.tm import Memory, template
+
+
+def test_template_slots_numbers_but_not_words_with_digits():
+    assert template("Level 12 reached") == ("Level \x01 reached", ["12"])
+    assert template("MP3 player")[1] == []
+
+
+def test_exact_template_hit_refills_numbers():
+    m = Memory()
+    assert m.add("Level 12 reached", "达到第 12 级")
+    assert m.lookup("Level 13 reached") == ("达到第 13 级", 1.0)
+
+
+def test_add_rejects_when_numbers_missing_from_translation():
+    m = Memory()
+    assert not m.add("Level 12 reached", "升级了")
+
+
+def test_fuzzy_rejects_opposite_meaning():
+    m = Memory()
+    m.add("Lock the door", "锁上门")
+    m.add("今天天气很好", "The weather is nice today")
+    assert m.lookup("Unlock the door") is None
+    assert m.lookup("今天天气很差") is None
+
+
+def test_fuzzy_accepts_ocr_variants_and_names():
+    m = Memory()
+    m.add("Level 12 reached", "达到第 12 级")
+    m.add("Alice joined the team", "Alice 加入了队伍")
+    hit = m.lookup("Leve1 13 reached")
+    assert hit is not None and hit[0] == "达到第 13 级"
+    hit = m.lookup("Bob joined the team")
+    assert hit is not None and hit[0] == "Bob 加入了队伍"
@@ -0,0 +1,62 @@
+from ui_queue import UIQueue
+
+
+class FakeRoot:
+    """记录 after() 调用，由测试手动驱动 tick"""
+
+    def __init__(self):
+        self.calls = []
+
+    def after(self, ms, fn):
+        self.calls.append(fn)
+
+    def run(self):
+        calls, self.calls = self.calls, []
+        for fn in calls:
+            fn()
+
+
+def test_tick_only_scheduled_while_pending():
+    root = FakeRoot()
+    q = UIQueue(root)
+    ran = []
+    q.post(lambda: ran.append(1))
+    q.post(lambda: ran.append(2))
+    assert len(root.calls) == 1         # 只安排一次
+    root.run()
+    assert ran == [1, 2]
+    assert root.calls == []             # 取空后不再唤醒
+    q.post(lambda: ran.append(3))
+    assert len(root.calls) == 1
+
+
+def test_same_key_coalesces_and_calls_on_drop():
+    root = FakeRoot()
+    q = UIQueue(root)
+    ran, dropped = [], []
+    q.post(lambda: ran.append("old"), key="k", on_drop=lambda: dropped.append("old"))
+    q.post(lambda: ran.append("new"), key="k", on_drop=lambda: dropped.append("new"))
+    root.run()
+    assert ran == ["new"]
+    assert dropped == ["old"]
+    assert q.stats()["coalesced"] == 1
+
+
+def test_dead_update_is_dropped_with_on_drop():
+    root = FakeRoot()
+    q = UIQueue(root)
+    ran, dropped = [], []
+    q.post(lambda: ran.append(1), alive=lambda: False, on_drop=lambda: dropped.append(1))
+    root.run()
+    assert ran == [] and dropped == [1]
+    assert q.stats()["dropped"] == 1
+
+
+def test_on_drop_may_post_again():
+    root = FakeRoot()
+    q = UIQueue(root)
+    ran = []
+    q.post(lambda: None, key="k", on_drop=lambda: q.post(lambda: ran.append("from drop")))
+    q.post(lambda: ran.append("k"), key="k")
+    root.run()
+    assert sorted(ran) == ["from drop", "k"]
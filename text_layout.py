@@ -0,0 +1,230 @@
+"""
+译文排版引擎
+====================================
+把译文按 OCR 文字框的宽高自动选字号、必要时折行，保证不溢出到相邻文字框。
+
+  - 字形步进（advance）按字体缓存在参考字号下，任意字号按比例缩放，
+    所以同一字体只需真正测量每个字符一次，几百个框的排版只是查表 + 加法；
+  - 量字后端可以是 Tk 字体（屏幕覆盖层）或 PIL ImageFont（离屏渲染），
+    本模块本身不依赖 tkinter / PIL，可在无界面环境直接复用。
+"""
+
+import re
+import threading
+from collections import namedtuple
+
+# 参考字号（像素）：在此字号下测量并缓存字形步进，其他字号线性缩放
+REF_PX = 64
+
+# 单个字符即可断行的文字（中日韩、全角符号）
+_CJK_RANGES = (
+    r"\u2e80-\u2fff"     # CJK 部首
+    r"\u3000-\u303f"     # CJK 标点
+    r"\u3040-\u30ff"     # 平假名 / 片假名
+    r"\u3100-\u31ff"
+    r"\u3400-\u4dbf"     # 扩展 A
+    r"\u4e00-\u9fff"     # 基本汉字
+    r"\uac00-\ud7af"     # 韩文音节
+    r"\uf900-\ufaff"
+    r"\uff00-\uffef"     # 全角 ASCII / 半角片假名
+)
+_TOKEN_RE = re.compile(rf"[{_CJK_RANGES}]|\s+|[^\s{_CJK_RANGES}]+")
+
+
+# ─────────────────────────────────────────────
+#  字形度量缓存
+# ─────────────────────────────────────────────
+class GlyphMetrics:
+    """
+    单个字体的字形步进缓存。
+    measure_char(ch) 返回参考字号 REF_PX 下该字符的像素宽度，只在首次遇到时调用；
+    line_height 为参考字号下的行高（像素）。
+    """
+
+    def __init__(self, measure_char, line_height: float, ref_px: int = REF_PX):
+        self._measure = measure_char
+        self._ref_px  = float(ref_px)
+        self._line_h  = float(line_height)
+        self._adv     = {}      # ch -> 参考字号下的步进
+        self._lock    = threading.Lock()
+
+    def _warm(self, text: str) -> dict:
+        """确保 text 中每个字符都已测量，返回步进表"""
+        adv = self._adv
+        missing = [ch for ch in set(text) if ch not in adv]
+        if missing:
+            with self._lock:
+                for ch in missing:
+                    if ch not in adv:
+                        try:
+                            adv[ch] = float(self._measure(ch))
+                        except Exception:
+                            adv[ch] = self._ref_px * 0.6
+        return adv
+
+    def ref_width(self, text: str) -> float:
+        """参考字号下整段文字宽度"""
+        adv = self._warm(text)
+        return sum(adv[ch] for ch in text)
+
+    @property
+    def ref_px(self) -> float:
+        return self._ref_px
+
+    def text_width(self, text: str, px: float) -> float:
+        return self.ref_width(text) * px / self._ref_px
+
+    def line_height(self, px: float) -> float:
+        return self._line_h * px / self._ref_px
+
+    def __len__(self):
+        return len(self._adv)
+
+
+_metrics_cache = {}
+_metrics_lock  = threading.Lock()
+
+
+def get_metrics(key, factory) -> GlyphMetrics:
+    """按 key 取全局共享的 GlyphMetrics，不存在时用 factory() 创建"""
+    m = _metrics_cache.get(key)
+    if m is None:
+        with _metrics_lock:
+            m = _metrics_cache.get(key)
+            if m is None:
+                m = factory()
+                _metrics_cache[key] = m
+    return m
+
+
+def tk_metrics(family: str = "微软雅黑", weight: str = "normal", root=None) -> GlyphMetrics:
+    """Tk 字体度量（❗ 首次创建及首次量到新字符时必须在主线程）"""
+    def _factory():
+        from tkinter import font as tkfont
+        f = tkfont.Font(root=root, family=family, size=-REF_PX, weight=weight)
+        return GlyphMetrics(f.measure, f.metrics("linespace"))
+    return get_metrics(("tk", family, weight), _factory)
+
+
+def pil_metrics(font_path: str, index: int = 0) -> GlyphMetrics:
+    """PIL ImageFont 度量，可在任意线程 / 无界面环境使用"""
+    def _factory():
+        from PIL import ImageFont
+        f = ImageFont.truetype(font_path, REF_PX, index=index)
+        if hasattr(f, "getlength"):
+            measure = f.getlength
+        else:                                   # Pillow < 8
+            measure = lambda ch: f.getsize(ch)[0]
+        ascent, descent = f.getmetrics()
+        return GlyphMetrics(measure, ascent + descent)
+    return get_metrics(("pil", font_path, index), _factory)
+
+
+# ─────────────────────────────────────────────
+#  排版
+# ─────────────────────────────────────────────
+TextFit = namedtuple("TextFit", "px lines width height overflow")
+
+
+def _measure_tokens(text: str, metrics: GlyphMetrics):
+    """切分为可断行单元：[(token, 参考宽度, 逐字符宽度或 None), ...]"""
+    adv = metrics._warm(text)
+    out = []
+    for tok in _TOKEN_RE.findall(text):
+        if len(tok) > 1 and not tok.isspace():
+            # 拉丁单词：保留逐字符宽度，超长时按字符强制拆开
+            chars = [(ch, adv[ch]) for ch in tok]
+            out.append((tok, sum(w for _, w in chars), chars))
+        else:
+            out.append((tok, sum(adv[ch] for ch in tok), None))
+    return out
+
+
+def _wrap(tokens, max_w: float):
+    """贪心折行（参考字号下计算），返回 (行列表, 最宽行宽度)"""
+    lines, cur, cur_w, widest = [], "", 0.0, 0.0
+
+    def _flush():
+        nonlocal cur, cur_w, widest
+        lines.append(cur.rstrip())
+        widest = max(widest, cur_w)
+        cur, cur_w = "", 0.0
+
+    for tok, tw, chars in tokens:
+        if tok.isspace():
+            if cur:
+                cur, cur_w = cur + tok, cur_w + tw
+            continue
+        if cur and cur_w + tw > max_w:
+            _flush()
+        if chars and tw > max_w:
+            for ch, cw in chars:
+                if cur and cur_w + cw > max_w:
+                    _flush()
+                cur, cur_w = cur + ch, cur_w + cw
+            continue
+        cur, cur_w = cur + tok, cur_w + tw
+    if cur.strip():
+        _flush()
+    return lines, widest
+
+
+def fit_text(text: str, box_w: float, box_h: float, metrics: GlyphMetrics,
+             min_px: int = 8, max_px: int = 24, wrap: bool = True) -> TextFit:
+    """
+    在 box_w x box_h 内为 text 选出最大的字号（像素），宽度优先、可选折行。
+    字号在 [min_px, max_px] 上二分查找；最小字号仍放不下时 overflow=True。
+    """
+    text   = " ".join(text.split())
+    max_px = max(min_px, int(max_px))
+    if not text or box_w <= 0:
+        return TextFit(min_px, [text] if text else [], 0.0, 0.0, bool(text))
+
+    ref_px  = metrics.ref_px
+    tokens  = _measure_tokens(text, metrics)
+    total_w = sum(tw for _, tw, _ in tokens)
+    line_h  = metrics.line_height(ref_px)
+
+    def _layout(px):
+        scale = px / ref_px
+        if not wrap or total_w * scale <= box_w:
+            lines, widest = [text], total_w
+        else:
+            lines, widest = _wrap(tokens, box_w / scale)
+        w, h = widest * scale, len(lines) * line_h * scale
+        return lines, w, h, (w <= box_w + 0.5 and h <= box_h + 0.5)
+
+    lo, hi, best = min_px, max_px, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        lines, w, h, ok = _layout(mid)
+        if ok:
+            best = TextFit(mid, lines, w, h, False)
+            lo = mid + 1
+        else:
+            hi = mid - 1
+    if best is None:
+        lines, w, h, _ = _layout(min_px)
+        best = TextFit(min_px, lines, w, h, True)
+    return best
+
+
+def fit_items(items, texts, metrics: GlyphMetrics, scale=(1.0, 1.0),
+              min_px: int = 8, max_px: int = 24, wrap: bool = True):
+    """
+    批量排版：items 为 OCR 结果（物理像素坐标），texts 为对应译文。
+    scale 为 (sx, sy)：物理像素 / 目标坐标（屏幕覆盖层传 dpi_scale，离屏渲染传 (1,1)）。
+    返回 [(x, y, TextFit), ...]，坐标已换算为目标坐标系。
+    """
+    sx, sy = scale
+    # 行高约为字号的 1.3 倍（按字体实测）：字号上限取"单行恰好放进框高"的字号，
+    # 既避免单行短译文字号过大，也让二分查找不必试明显放不下的字号
+    px_per_h = metrics.ref_px / max(1e-6, metrics.line_height(metrics.ref_px))
+    out = []
+    for item, t in zip(items, texts):
+        x1, y1 = item["left"] / sx,  item["top"] / sy
+        x2, y2 = item["right"] / sx, item["bottom"] / sy
+        bw, bh = max(1.0, x2 - x1), max(1.0, y2 - y1)
+        hi = max(min_px, min(max_px, int((bh + 0.5) * px_per_h)))
+        out.append((int(x1), int(y1), fit_text(t, bw, bh, metrics, min_px, hi, wrap)))
+    return out
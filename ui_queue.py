@@ -0,0 +1,116 @@
+"""
+主线程界面更新队列
+====================================
+工作线程不再各自 self.after(0, lambda: ...)，而是 post() 到这里，
+由主线程的 tick 统一取出执行（队列由空变为非空时才安排 tick，取空后不再唤醒）：
+  - 同一 key 的多次更新只执行最后一次（例如同一弹窗连续的 set_ocr）；
+  - alive() 返回 False 的更新直接丢弃（弹窗已关闭 / 已被新截图复用）；
+    被覆盖或丢弃的更新若带 on_drop，会调用它做收尾（例如把追踪记为取消）；
+  - 记录投递→执行的主线程延迟，供诊断面板查看。
+post() 可在任意线程调用；tick 只在主线程运行。
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+
+class UIQueue:
+    def __init__(self, root, interval_ms: int = 16, on_error=None):
+        self._root     = root
+        self._interval = max(1, int(interval_ms))
+        self._on_error = on_error
+        self._lock     = threading.Lock()
+        self._pending  = OrderedDict()      # key -> (fn, alive, t_post, on_drop)
+        self._seq      = 0                  # 无 key 的更新用自增序号占位
+        self._lat      = []                 # 最近若干次延迟（ms）
+        self._stats    = {"posted": 0, "coalesced": 0, "dropped": 0, "run": 0,
+                          "max_ms": 0.0, "slow_ticks": 0}
+        self._stopped  = False
+        self._scheduled = False             # 是否已安排下一次 tick
+
+    def post(self, fn, key=None, alive=None, on_drop=None):
+        """投递一个主线程回调；key 相同的未执行更新会被新的覆盖"""
+        now, dropped = time.perf_counter(), None
+        with self._lock:
+            self._stats["posted"] += 1
+            if key is None:
+                self._seq += 1
+                key = ("_seq", self._seq)
+            if key in self._pending:
+                # 覆盖旧更新，但保留首次投递时间（延迟从最早那次算起）
+                _, _, t_post, dropped = self._pending[key]
+                self._pending[key] = (fn, alive, t_post, on_drop)
+                self._stats["coalesced"] += 1
+            else:
+                self._pending[key] = (fn, alive, now, on_drop)
+            schedule = not (self._scheduled or self._stopped)
+            self._scheduled = self._scheduled or schedule
+        self._drop_cb(dropped)          # 锁外调用：回调里可能再 post()
+        if not schedule:
+            return
+        try:
+            self._root.after(self._interval, self._tick)
+        except Exception:
+            with self._lock:
+                self._scheduled = False     # 根窗口已销毁
+
+    def _drop_cb(self, on_drop):
+        if on_drop is None:
+            return
+        try:
+            on_drop()
+        except Exception as e:
+            if self._on_error:
+                self._on_error(e)
+
+    def stop(self):
+        self._stopped = True
+
+    def stats(self) -> dict:
+        with self._lock:
+            lat = list(self._lat)
+            st  = dict(self._stats, queued=len(self._pending))
+        st["avg_ms"] = sum(lat) / len(lat) if lat else 0.0
+        return st
+
+    def _tick(self):
+        if self._stopped:
+            with self._lock:
+                self._scheduled = False
+            return
+        with self._lock:
+            batch, self._pending = self._pending, OrderedDict()
+        if batch:
+            t0 = time.perf_counter()
+            for fn, alive, t_post, on_drop in batch.values():
+                try:
+                    live = alive is None or alive()
+                except Exception:
+                    live = False
+                if not live:
+                    self._stats["dropped"] += 1
+                    self._drop_cb(on_drop)
+                    continue
+                ms = (time.perf_counter() - t_post) * 1000
+                try:
+                    fn()
+                except Exception as e:
+                    if self._on_error:
+                        self._on_error(e)
+                with self._lock:
+                    self._stats["run"] += 1
+                    self._stats["max_ms"] = max(self._stats["max_ms"], ms)
+                    self._lat = (self._lat + [ms])[-200:]
+            if (time.perf_counter() - t0) * 1000 > 50:
+                self._stats["slow_ticks"] += 1
+        with self._lock:
+            # 执行期间又有新投递就接着安排，否则停下等下一次 post()
+            self._scheduled = bool(self._pending) and not self._stopped
+            if not self._scheduled:
+                return
+        try:
+            self._root.after(self._interval, self._tick)
+        except Exception:
+            with self._lock:
+                self._scheduled = False     # 根窗口已销毁
@@ -0,0 +1,20 @@
+"""
+wxocr_core：OCR / 翻译核心
+====================================
+不依赖 tkinter、不调用任何 Windows API、导入时不创建目录也不加载 OCR 引擎，
+可在工作进程、命令行脚本或服务中直接使用；托盘程序 screenshot_tool 只是它的一个界面。
+
+    from wxocr_core import ocr_raw, do_translate
+    items = ocr_raw("shot.png")
+    print(do_translate("\\n".join(it["text"] for it in items), "zh"))
+"""
+
+from .config import load_config, save_config
+from .engine import WcocrEngine, default_engine, parse_ocr_result, items_to_text, ocr_raw, ocr_text
+from .translate import ENGINES, do_translate, iter_translate, cache_clear
+
+__all__ = [
+    "load_config", "save_config",
+    "WcocrEngine", "default_engine", "parse_ocr_result", "items_to_text", "ocr_raw", "ocr_text",
+    "ENGINES", "do_translate", "iter_translate", "cache_clear",
+]
@@ -0,0 +1,261 @@
+"""
+异步 API
+====================================
+供 asyncio 程序直接 await，不必再用 run_in_executor 包同步函数：
+
+    from wxocr_core import aio
+    items = await aio.ocr("shot.png")                 # 路径 / 图片字节 / PIL.Image
+    zh    = await aio.translate("hello", "zh")        # 整段，语义同 do_translate
+    lst   = await aio.translate(["a", "b"], "zh")     # 逐行并发，结果与输入一一对应
+    async for i, src, dst in aio.translate_iter(lines, "zh"):    # 谁先译完先给谁
+        ...
+
+  - 翻译用 asyncio 流实现的 HTTP/1.1，不占线程；请求构造、响应解析、降级顺序与 LRU 缓存
+    与同步版 translate.py 共用；
+  - 每个引擎一个信号量限制同时在途的请求数（ENGINE_LIMITS，可用 config translate.concurrency 覆盖）；
+  - 取消调用方任务会立即中断网络读写并关闭连接；排队中的 OCR 直接丢弃，
+    已进入引擎的那一次 OCR 无法中断，结果被丢弃；
+  - OCR 在一个专用线程中执行：引擎只有一条通道（WcocrEngine.ocr_raw 自带锁，与界面、服务的调用逐个进入），
+    多开线程并不会更快。
+
+同步 API（wxocr_core.ocr_raw / do_translate）不变；translate_many 给同步代码提供逐行并发翻译。
+"""
+
+import os
+import json
+import asyncio
+import threading
+import urllib.parse
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from . import paths
+from .config import load_config
+from .engine import default_engine
+from .translate import (TIMEOUT, EMPTY_MSG, FAIL_MSG, _API, _cache, _cache_key, plan_request,
+                        merge_result, engine_order, remember)
+
+ENGINE_LIMITS = {"腾讯翻译": 5, "百度翻译": 2, "有道翻译": 2, "MyMemory": 2}
+
+
+# ─────────────────────────────────────────────
+#  HTTP（asyncio 流）
+# ─────────────────────────────────────────────
+_ssl_ctx = None
+
+
+def _ssl():
+    global _ssl_ctx
+    if _ssl_ctx is None:
+        import ssl
+        _ssl_ctx = ssl.create_default_context()
+    return _ssl_ctx
+
+
+def _route(url: str):
+    """url → (主机, 端口, 是否 TLS, 请求目标)；基准测试的替身把它换成指向本机的版本"""
+    parts = urllib.parse.urlsplit(url)
+    tls = parts.scheme == "https"
+    target = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+    return parts.hostname, parts.port or (443 if tls else 80), tls, target
+
+
+async def _read_body(reader, headers: dict) -> bytes:
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+            if size == 0:
+                break
+            body += await reader.readexactly(size)
+            await reader.readline()
+        return bytes(body)
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return await reader.read()
+
+
+async def _http(url: str, data, headers: dict):
+    host, port, tls, target = _route(url)
+    reader, writer = await asyncio.open_connection(host, port, ssl=_ssl() if tls else None)
+    try:
+        h = {"Host": urllib.parse.urlsplit(url).netloc, "Connection": "close",
+             "Accept-Encoding": "identity"}
+        h.update(headers)
+        if data is not None:
+            h["Content-Length"] = str(len(data))
+        head = f"{'POST' if data is not None else 'GET'} {target} HTTP/1.1\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in h.items()) + "\r\n"
+        writer.write(head.encode("utf-8") + (data or b""))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        resp_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            resp_headers[k.strip().lower()] = v.strip()
+        return status, await _read_body(reader, resp_headers)
+    finally:
+        writer.close()      # 取消时同样关闭连接
+
+
+async def http_request(url: str, data: bytes = None, headers: dict = None, timeout: float = TIMEOUT):
+    """最小 HTTP/1.1 客户端（data 为 None 时 GET，否则 POST），返回 (状态码, 响应体)"""
+    return await asyncio.wait_for(_http(url, data, headers or {}), timeout)
+
+
+# ─────────────────────────────────────────────
+#  翻译
+# ─────────────────────────────────────────────
+_sems = weakref.WeakKeyDictionary()     # 事件循环 → {引擎: Semaphore}
+
+
+def _sem(engine: str) -> asyncio.Semaphore:
+    per_loop = _sems.setdefault(asyncio.get_running_loop(), {})
+    sem = per_loop.get(engine)
+    if sem is None:
+        limits = load_config().get("translate", {}).get("concurrency", {})
+        sem = per_loop[engine] = asyncio.Semaphore(limits.get(engine, ENGINE_LIMITS.get(engine, 2)))
+    return sem
+
+
+async def _call_engine(engine: str, text: str, to_lang: str, from_lang: str = "auto") -> str:
+    build, parse = _API[engine]
+    async with _sem(engine):
+        try:
+            req = build(text, to_lang, from_lang)
+            if req is None:
+                return ""
+            url, data, headers = req
+            status, body = await http_request(url, data, headers)
+            return parse(json.loads(body.decode("utf-8"))) if status == 200 else ""
+        except Exception:       # CancelledError 不是 Exception，照常向上传播
+            return ""
+
+
+async def translate_text(text: str, target_lang: str, engine: str = "腾讯翻译", trace=None,
+                         cache: bool = True, detect=None) -> str:
+    """do_translate 的异步版本：同样的缓存、降级顺序与返回文案"""
+    if not text.strip() or text.startswith("[OCR 错误]"):
+        return EMPTY_MSG
+    key = _cache_key(engine, target_lang, text)
+    if cache:
+        hit = _cache.get(key)
+        if hit is not None:
+            if trace is not None:
+                trace.mark("translate:cache")
+            return hit
+    plan = plan_request(text, target_lang, detect, trace)
+    if plan is not None and plan.skip_all:
+        result = plan.offline()
+        if cache:
+            _cache.put(key, result)
+        return result
+    send   = plan.send if plan is not None and plan.partial else text
+    source = plan.source if plan is not None else "auto"
+    order, primary = engine_order(engine)
+    for eng in order:
+        result = await _call_engine(eng, send, target_lang, source)
+        if trace is not None:
+            trace.mark(f"translate:{eng}", ok=bool(result and result.strip()))
+        if result and result.strip():
+            tag = f"[降级至 {eng}]\n" if eng != primary else ""
+            merged = merge_result(plan, tag + result)
+            if merged is None:
+                full = await _call_engine(eng, text, target_lang)
+                if trace is not None:
+                    trace.mark(f"translate:{eng}", ok=bool(full and full.strip()), resend=True)
+                if full and full.strip():
+                    return tag + full
+                continue
+            result = merged
+            if plan is not None and plan.retry:
+                # 占位符没换回的行按原文再译一次（一次请求），仍失败则保留只换回部分占位符的结果
+                again = await _call_engine(eng, plan.retry_text, target_lang, source)
+                fixed = plan.repair(again) if again and again.strip() else None
+                if fixed is not None:
+                    result = tag + fixed
+            if not tag:
+                remember(plan, result, target_lang)
+                if cache:
+                    _cache.put(key, result)
+            return result
+    return FAIL_MSG
+
+
+async def _line(text: str, target_lang: str, engine: str, cache: bool) -> str:
+    return await translate_text(text, target_lang, engine, cache=cache) if text.strip() else ""
+
+
+async def translate(text_or_lines, target_lang: str = "zh", engine: str = "腾讯翻译",
+                    trace=None, cache: bool = True):
+    """字符串 → 译文字符串；行列表 → 逐行并发翻译，返回等长列表（空行对应空串）"""
+    if isinstance(text_or_lines, str):
+        return await translate_text(text_or_lines, target_lang, engine, trace, cache)
+    return list(await asyncio.gather(*(_line(t, target_lang, engine, cache) for t in text_or_lines)))
+
+
+async def translate_iter(lines, target_lang: str = "zh", engine: str = "腾讯翻译", cache: bool = True):
+    """逐行并发翻译，按完成先后产出 (行号, 原文, 译文)；提前跳出循环会取消其余请求"""
+    async def one(i, text):
+        return i, text, await _line(text, target_lang, engine, cache)
+
+    tasks = [asyncio.ensure_future(one(i, t)) for i, t in enumerate(lines)]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        for t in tasks:
+            t.cancel()
+
+
+def translate_many(lines, target_lang: str = "zh", engine: str = "腾讯翻译", cache: bool = True) -> list:
+    """同步调用的逐行并发翻译（内部新建事件循环，不能在已运行事件循环的线程里调用）"""
+    return asyncio.run(translate(list(lines), target_lang, engine, cache=cache))
+
+
+# ─────────────────────────────────────────────
+#  OCR
+# ─────────────────────────────────────────────
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _ocr_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wxocr-aio-ocr")
+    return _pool
+
+
+def _ocr_job(engine, image):
+    if isinstance(image, (str, os.PathLike)):
+        return engine.ocr_raw(os.fspath(image))
+    tmp = os.path.join(paths.write_dir(), "_temp_aio.png")     # 单线程执行，固定文件名即可
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        with open(tmp, "wb") as f:
+            f.write(image)
+    else:
+        image.save(tmp, "PNG")
+    return engine.ocr_raw(tmp)
+
+
+async def ocr(image, engine=None):
+    """image 为路径、图片字节或 PIL.Image；返回 items，出错时返回 "[OCR 错误] ..." 字符串"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _ocr_pool(), _ocr_job, engine or default_engine(), image)
+
+
+async def ocr_translate_iter(image, target_lang: str = "zh", engine: str = "腾讯翻译", ocr_engine=None):
+    """先产出 ("items", items)，再按完成先后逐行产出 ("line", 行号, 译文)；OCR 出错时产出 ("error", 信息)"""
+    items = await ocr(image, ocr_engine)
+    if isinstance(items, str):
+        yield ("error", items)
+        return
+    yield ("items", items)
+    async for i, _, dst in translate_iter([it["text"] for it in items], target_lang, engine):
+        yield ("line", i, dst)
@@ -0,0 +1,56 @@
+"""
+多区域批量 OCR
+====================================
+把多张裁剪图纵向拼成一张画布（区域之间留白分隔），OCR 引擎只调用一次，
+再按每个文字框的中心点把结果拆回各自区域、换算回区域内坐标。
+"""
+
+GAP = 32            # 区域之间的留白（像素），防止相邻区域的文字被识别成同一行
+PAD_COLOR = (255, 255, 255)
+
+
+def pack_images(images, gap: int = GAP):
+    """纵向拼接，返回 (画布, [(y_offset, w, h), ...])"""
+    from PIL import Image
+    width  = max(im.size[0] for im in images)
+    height = sum(im.size[1] for im in images) + gap * (len(images) + 1)
+    canvas = Image.new("RGB", (width, height), PAD_COLOR)
+    slots, y = [], gap
+    for im in images:
+        canvas.paste(im.convert("RGB"), (0, y))
+        slots.append((y, im.size[0], im.size[1]))
+        y += im.size[1] + gap
+    return canvas, slots
+
+
+def split_items(items, slots):
+    """按中心点把画布坐标的文字框分配回各区域，返回每个区域的 items 列表"""
+    out = [[] for _ in slots]
+    for it in items:
+        cy = (it.get("top", 0) + it.get("bottom", 0)) / 2
+        for idx, (y, w, h) in enumerate(slots):
+            if y <= cy < y + h:
+                it = dict(it)
+                it["top"]    = max(0, it.get("top", 0) - y)
+                it["bottom"] = min(h, it.get("bottom", 0) - y)
+                it["right"]  = min(w, it.get("right", 0))
+                out[idx].append(it)
+                break
+    for lst in out:
+        lst.sort(key=lambda it: (it["top"], it.get("left", 0)))
+    return out
+
+
+def ocr_batch(images, ocr_path_fn, tmp_path: str, gap: int = GAP):
+    """
+    images 为 PIL Image 列表；ocr_path_fn(path) 与 do_ocr_raw 相同（返回 items 或错误字符串）。
+    返回与 images 一一对应的结果列表；引擎出错时每个区域都得到同一错误字符串。
+    """
+    if not images:
+        return []
+    canvas, slots = pack_images(images, gap)
+    canvas.save(tmp_path)
+    res = ocr_path_fn(tmp_path)
+    if isinstance(res, str):
+        return [res] * len(images)
+    return split_items(res, slots)
@@ -0,0 +1,43 @@
+"""
+配置读取
+====================================
+config.json 按 (修改时间, 大小) 缓存：翻译、热键等处频繁调用 load_config()
+只在文件变化后才重新解析。返回的是共享字典，调用方不要原地修改（需要修改请 copy）。
+"""
+
+import json
+import os
+import threading
+
+from . import paths
+
+_cache = {}             # path -> ((mtime_ns, size), dict)
+_lock  = threading.Lock()
+
+
+def load_config(path: str = None) -> dict:
+    path = path or paths.config_path()
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _cache.get(path)
+    if hit and hit[0] == key:
+        return hit[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    except Exception:
+        return {}
+    with _lock:
+        _cache[path] = (key, cfg)
+    return cfg
+
+
+def save_config(cfg: dict, path: str = None):
+    path = path or paths.config_path()
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f, indent=4, ensure_ascii=False)
+    with _lock:
+        _cache.pop(path, None)
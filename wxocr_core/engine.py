@@ -0,0 +1,142 @@
+"""
+OCR 引擎适配
+====================================
+wcocr（微信 OCR）在首次调用时才导入并初始化：wcocr.init 每次都会重新拉起 WeChatOCR.exe，
+在杀毒软件扫描下可能阻塞数秒，所以每个进程只初始化一次，之后复用同一通道。
+这条通道同一时间只能处理一张图：ocr_raw 用锁串行化，界面任务、aio 与服务的批处理线程可以放心共用一个实例。
+识别结果统一为 [{'text', 'left', 'top', 'right', 'bottom'}]，出错时返回以 "[OCR 错误]" 开头的字符串。
+"""
+
+import os
+import threading
+
+from . import paths
+
+BAND_PX      = 2400     # 高于此值的长图按水平条带逐段识别（ocr_iter）
+BAND_OVERLAP = 64       # 相邻条带重叠，保证不超过此高度的文字行总能完整落在某一条带内
+
+
+def parse_ocr_result(result) -> list:
+    """wcocr.ocr 的原始返回 → items（bytes 解码、去掉空白行）"""
+    items = []
+    for item in result.get("ocr_response", []):
+        text = item.get("text", "")
+        if isinstance(text, bytes):
+            text = text.decode("utf-8", errors="ignore")
+        if text.strip():
+            items.append({
+                "text": text,
+                "left": item.get("left", 0),
+                "top": item.get("top", 0),
+                "right": item.get("right", 0),
+                "bottom": item.get("bottom", 0)
+            })
+    return items
+
+
+def items_to_text(items) -> str:
+    return "\n".join(it["text"] for it in items if it["text"].strip())
+
+
+class WcocrEngine:
+    def __init__(self, exe_path: str = None, lib_dir: str = None):
+        self.exe_path = exe_path or paths.wechatocr_exe()
+        self.lib_dir  = lib_dir or paths.wechat_lib_dir()
+        self._mod     = None
+        self._lock    = threading.Lock()        # 初始化
+        self._ocr_lock = threading.Lock()       # 引擎只有一条通道，识别请求逐个进入
+
+    def _ensure_init(self):
+        if self._mod is not None:
+            return self._mod
+        with self._lock:
+            if self._mod is None:   # double-check
+                import wcocr
+                wcocr.init(self.exe_path, self.lib_dir)
+                self._mod = wcocr
+        return self._mod
+
+    @property
+    def ready(self) -> bool:
+        return self._mod is not None
+
+    def ocr_raw(self, image_path: str):
+        """返回 items，或 "[OCR 错误] ..." 字符串"""
+        try:
+            mod = self._ensure_init()
+            with self._ocr_lock:
+                raw = mod.ocr(image_path)
+            return parse_ocr_result(raw)
+        except Exception as e:
+            return f"[OCR 错误] {e}"
+
+    def ocr_iter(self, image_path: str, band_px: int = BAND_PX, overlap: int = BAND_OVERLAP):
+        """
+        逐段产出识别结果（items 列表，坐标为整图坐标）；出错时产出错误字符串后结束。
+        普通截图只调用一次引擎、一次给出全部结果；高度超过 band_px 的长图（滚动长截图、整页）
+        按带重叠的水平条带依次识别，每识别完一条就产出，不必等整张图识别完才看到第一行。
+        重叠区内的文字框按中心点只归属一个条带，不会重复。
+        """
+        try:
+            from PIL import Image
+            im = Image.open(image_path)
+        except Exception:
+            im = None
+        if im is None or not band_px or im.height <= band_px:
+            if im is not None:
+                im.close()
+            yield self.ocr_raw(image_path)
+            return
+        w, h = im.size
+        tmp = os.path.join(paths.write_dir(), f"_temp_band_{threading.get_ident()}.png")
+        step = band_px - overlap
+        starts = list(range(0, h - overlap, step))
+        try:
+            with im:
+                for k, top in enumerate(starts):
+                    bottom = min(h, top + band_px)
+                    keep_lo = top + overlap / 2 if k else 0
+                    keep_hi = bottom - overlap / 2 if k < len(starts) - 1 else h
+                    im.crop((0, top, w, bottom)).save(tmp)
+                    res = self.ocr_raw(tmp)
+                    if isinstance(res, str):
+                        yield res
+                        return
+                    part = []
+                    for it in res:
+                        if keep_lo <= (it["top"] + it["bottom"]) / 2 + top < keep_hi:
+                            part.append(dict(it, top=it["top"] + top, bottom=it["bottom"] + top))
+                    yield part
+        finally:
+            try:
+                os.remove(tmp)      # 提前结束迭代（生成器被关闭）时同样删除
+            except OSError:
+                pass
+
+    def ocr_text(self, image_path: str) -> str:
+        res = self.ocr_raw(image_path)
+        if isinstance(res, str):
+            return res
+        return items_to_text(res) or "（未识别到文字）"
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_engine() -> WcocrEngine:
+    """进程内共享的引擎实例（使用随程序分发的 WeChatOCR 路径）"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = WcocrEngine()
+    return _default
+
+
+def ocr_raw(image_path: str):
+    return default_engine().ocr_raw(image_path)
+
+
+def ocr_text(image_path: str) -> str:
+    return default_engine().ocr_text(image_path)
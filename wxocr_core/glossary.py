@@ -0,0 +1,263 @@
+"""
+本地词库（术语表）
+====================================
+固定的界面词汇（菜单项、状态词、游戏术语）不必每次都请求网络：
+
+  - 词库为 TSV：每行 “原文<TAB>译文[<TAB>目标语言]”，# 开头为注释；
+    放在 <可写目录>/glossary/ 下，或在 config.json 的 "glossary": {"files": [...]} 中列出；
+    文件名形如 ui.zh.tsv 时第二段即目标语言，否则取第三列，缺省为 zh；
+  - 每种目标语言的词条建成一个 Aho–Corasick 自动机，一遍扫描找出行内所有词条，
+    按“最靠左、最长”取不重叠的匹配；拉丁词条要求词边界（cat 不会匹配 category）；
+  - 整行与某词条相同，或整行除词条外只剩数字 / 符号 / 空白：离线直接给出译文；
+  - 其余含词条的行交给网络引擎前把词条换成 {1} {2} 这样的占位符，译文回来后再换成词库译文，
+    保证术语一致（config glossary.enforce，默认开启）；引擎弄丢或改坏占位符的行
+    再按原文（不带占位符）单独重译一次，重译失败时只换回还在的占位符。
+
+词库文件按 (修改时间, 大小) 缓存，修改后下一次翻译自动生效。
+"""
+
+import os
+import re
+import threading
+from collections import deque
+
+from . import paths
+from .config import load_config
+
+_WORD_CH  = re.compile(r"[0-9A-Za-zÀ-ɏ]")     # 拉丁词边界（汉字等不需要）
+_LETTER   = re.compile(r"[^\W\d_]")
+_CJK_GAP  = re.compile(r"(?<=[぀-ヿ㐀-鿿가-힯])\s+"
+                       r"(?=[぀-ヿ㐀-鿿가-힯])")
+_SPACE_RE = re.compile(r"\s+")
+_HOLE_RE  = re.compile(r"\{\s*(\d+)\s*\}")
+
+
+def _norm(text: str) -> str:
+    return _SPACE_RE.sub(" ", text.strip()).lower()
+
+
+# ─────────────────────────────────────────────
+#  Aho–Corasick
+# ─────────────────────────────────────────────
+class Matcher:
+    """多模式串匹配：构建 O(总长度)，查找 O(文本长度 + 匹配数)"""
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out  = [()]
+        for idx, term in enumerate(self.terms):
+            node = 0
+            for ch in term:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                node = nxt
+            self._out[node] += (idx,)
+        q = deque(self._goto[0].values())
+        while q:
+            node = q.popleft()
+            for ch, nxt in self._goto[node].items():
+                q.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0) if node else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def find_all(self, text: str):
+        """[(起点, 终点, 词条序号)]，含重叠"""
+        goto, fail, out, terms = self._goto, self._fail, self._out, self.terms
+        node, hits = 0, []
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for idx in out[node]:
+                hits.append((i + 1 - len(terms[idx]), i + 1, idx))
+        return hits
+
+
+# ─────────────────────────────────────────────
+#  词库
+# ─────────────────────────────────────────────
+class Glossary:
+    """单一目标语言的词库"""
+
+    def __init__(self, pairs: dict):
+        # pairs: 归一化原文 → 译文
+        self.exact   = pairs
+        self.matcher = Matcher(pairs.keys())
+        self._tgts   = list(pairs.values())
+
+    def __len__(self):
+        return len(self.exact)
+
+    def matches(self, line: str):
+        """按最靠左、最长取不重叠匹配：[(起点, 终点, 译文)]"""
+        low = line.lower()
+        if len(low) != len(line):       # 极少数字符小写后长度改变，位置对不上就不做匹配
+            return []
+        hits = sorted(self.matcher.find_all(low), key=lambda h: (h[0], h[0] - h[1]))
+        out, pos = [], 0
+        for start, end, idx in hits:
+            if start < pos:
+                continue
+            # 拉丁词条两端要求词边界
+            if (start and _WORD_CH.match(line[start]) and _WORD_CH.match(line[start - 1])) or \
+               (end < len(line) and _WORD_CH.match(line[end - 1]) and _WORD_CH.match(line[end])):
+                continue
+            out.append((start, end, self._tgts[idx]))
+            pos = end
+        return out
+
+    def translate_line(self, line: str):
+        """整行可离线翻译时返回译文，否则返回 None"""
+        hit = self.exact.get(_norm(line))
+        if hit is not None:
+            return hit
+        ms = self.matches(line)
+        if not ms:
+            return None
+        parts, pos = [], 0
+        for start, end, tgt in ms:
+            if _LETTER.search(line[pos:start]):
+                return None             # 词条之间还有未收录的文字
+            parts += [line[pos:start], tgt]
+            pos = end
+        if _LETTER.search(line[pos:]):
+            return None
+        parts.append(line[pos:])
+        return _CJK_GAP.sub("", "".join(parts)).strip()
+
+    def protect(self, line: str):
+        """把行内词条换成占位符，返回 (替换后的行, {序号: 译文})；没有词条返回 None"""
+        if "{" in line:
+            return None
+        ms = self.matches(line)
+        if not ms:
+            return None
+        parts, holes, pos = [], {}, 0
+        for n, (start, end, tgt) in enumerate(ms, 1):
+            parts += [line[pos:start], f"{{{n}}}"]
+            holes[n] = tgt
+            pos = end
+        parts.append(line[pos:])
+        return "".join(parts), holes
+
+    @staticmethod
+    def restore(translated: str, holes: dict):
+        """占位符换回词库译文；有占位符丢失或多出时返回 None（调用方按原文重译该行）"""
+        found = [int(m.group(1)) for m in _HOLE_RE.finditer(translated)]
+        if sorted(found) != sorted(holes):
+            return None
+        return Glossary.fill(translated, holes)
+
+    @staticmethod
+    def fill(translated: str, holes: dict) -> str:
+        """尽量换回：认得的占位符换成词库译文，不认得的原样保留"""
+        return _CJK_GAP.sub("", _HOLE_RE.sub(
+            lambda m: holes.get(int(m.group(1)), m.group(0)), translated))
+
+
+def load_tsv(path: str, default_lang: str = "zh") -> dict:
+    """{目标语言: {归一化原文: 译文}}"""
+    name = os.path.basename(path).split(".")
+    file_lang = name[-2] if len(name) >= 3 else default_lang
+    out = {}
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for raw in f:
+            if not raw.strip() or raw.lstrip().startswith("#"):
+                continue
+            cols = raw.rstrip("\r\n").split("\t")
+            if len(cols) < 2 or not cols[0].strip() or not cols[1].strip():
+                continue
+            lang = cols[2].strip() if len(cols) > 2 and cols[2].strip() else file_lang
+            out.setdefault(lang, {})[_norm(cols[0])] = cols[1].strip()
+    return out
+
+
+def glossary_dir() -> str:
+    return os.path.join(paths.write_dir(create=False), "glossary")
+
+
+def _files():
+    files = []
+    d = glossary_dir()
+    if os.path.isdir(d):
+        files += sorted(os.path.join(d, n) for n in os.listdir(d) if n.lower().endswith(".tsv"))
+    files += load_config().get("glossary", {}).get("files", [])
+    return files
+
+
+_state = {"sig": None, "by_lang": {}}
+_lock  = threading.Lock()
+
+
+def _signature(files):
+    sig = []
+    for p in files:
+        try:
+            st = os.stat(p)
+            sig.append((p, st.st_mtime_ns, st.st_size))
+        except OSError:
+            pass
+    return tuple(sig)
+
+
+def version():
+    """词库文件签名（文件增删改后变化），用作翻译缓存键的一部分"""
+    return _signature(_files())
+
+
+def get(target_lang: str):
+    """目标语言的 Glossary；没有词条时返回 None"""
+    files = _files()
+    sig = _signature(files)
+    if sig != _state["sig"]:
+        with _lock:
+            if sig != _state["sig"]:
+                merged = {}
+                for p, _, _ in sig:
+                    try:
+                        for lang, pairs in load_tsv(p).items():
+                            merged.setdefault(lang, {}).update(pairs)
+                    except Exception:
+                        continue
+                _state["by_lang"] = {lang: Glossary(pairs) for lang, pairs in merged.items()}
+                _state["sig"] = sig
+    return _state["by_lang"].get(target_lang)
+
+
+def apply(plan, target_lang: str, enforce=None):
+    """
+    在 langdetect.Plan 上应用词库：整行可离线翻译的行不再发送（plan.fixed），
+    其余待译行中的词条换成占位符（plan.holes），merge() 时换回。返回离线翻译的行数。
+    """
+    gl = get(target_lang)
+    if gl is None:
+        return 0
+    if enforce is None:
+        enforce = load_config().get("glossary", {}).get("enforce", True)
+    n = 0
+    for i, line in enumerate(plan.lines):
+        if not plan.keep[i]:
+            continue
+        hit = gl.translate_line(line)
+        if hit is not None:
+            plan.keep[i] = False
+            plan.fixed[i] = hit
+            n += 1
+        elif enforce:
+            p = gl.protect(line)
+            if p is not None:
+                plan.holes[i] = p
+    return n
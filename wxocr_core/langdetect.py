@@ -0,0 +1,258 @@
+"""
+本地文字 / 语种检测
+====================================
+不联网、不依赖第三方库，逐行判断：
+
+  - 按 Unicode 区段统计各文字体系（汉字 / 假名 / 韩文 / 西里尔 / 泰文 / 拉丁 ...）的字符数，
+    假名 → ja，韩文 → ko，汉字 → zh（同一段里出现过假名的纯汉字行按 ja 算），西里尔 → ru，泰文 → th；
+  - 拉丁字母行用一个很小的模型在 en / fr / de / es / vi 之间打分：每种语言几十个高频字符三元组
+    （按名次加权）、十几个虚词，加特征字母（ß ä ñ é ơ ...）；置信度取第一名领先第二名的比例；
+  - 没有字母的行（数字、符号）以及 URL / 邮箱 / 路径 / 明显的代码行不需要翻译。
+
+plan() 据此给出一次翻译请求的计划：哪些行要发出去、源语言是否可以明确指定、
+结果如何按行拼回；已是目标语言或无需翻译的行原样保留。
+"""
+
+import re
+from collections import Counter
+
+# 文字体系 → Unicode 区段
+_SCRIPTS = {
+    "kana":     "぀-ヿㇰ-ㇿｦ-ﾟ",
+    "hangul":   "ᄀ-ᇿ㄰-㆏가-힯",
+    "han":      "㐀-䶿一-鿿豈-﫿",
+    "cyrillic": "Ѐ-ӿ",
+    "thai":     "฀-๿",
+    "latin":    "A-Za-zÀ-ÿĀ-ɏḀ-ỿ",
+}
+_SCRIPT_RE = re.compile("|".join(f"(?P<{k}>[{v}]+)" for k, v in _SCRIPTS.items()))
+_SCRIPT_LANG = {"kana": "ja", "hangul": "ko", "han": "zh", "cyrillic": "ru", "thai": "th"}
+
+_SKIP_RE = re.compile(
+    r"^\s*(?:[a-z][a-z0-9+.-]*://\S+"               # URL
+    r"|www\.\S+"
+    r"|[\w.+-]+@[\w-]+\.[\w.-]+"                    # 邮箱
+    r"|(?:[A-Za-z]:)?[\\/][\w .\\/-]*"              # 路径
+    r"|[\w-]+(?:\.[\w-]+)+\.[a-z]{2,4}"             # 文件名 / 域名
+    r")\s*$", re.I)
+_CODE_CHARS = set("{}()[];=<>_$#|&*/\\")
+
+# 拉丁语种：高频三元组（空格表示词边界，越靠前权重越高）+ 特征字母
+_TRIGRAMS = {
+    "en": [" th", "the", "he ", "ing", "ng ", " an", "and", "nd ", " to", "to ", " of", "of ",
+           "ion", "ed ", " in", "er ", "is ", "re ", "on ", "at ", "es ", " yo", "you", "ou ",
+           "tio", "ent", " is", "or ", "for", " fo", "hat", "tha", "it ", "all", "ter", "ll ",
+           " wh", "ve ", "ate", " be", "ss ", "ck ", "our", "ver", "ly ", "ers", "ile", "ted"],
+    "fr": [" de", "de ", "es ", " le", "le ", "ent", " la", "la ", "les", " et", "et ", "nt ",
+           "que", " qu", "ue ", " pa", "re ", "ur ", "ion", " co", "ous", " vo", "vou", "tio",
+           "men", " un", " en", "e d", "e l", "ne ", "eur", "ait", " du", "du ", "oir", "ez ",
+           "ée ", " ét", "des", " po", "ans", "eme", "ont", "ire", "our", "s d", "lle", "ier"],
+    "de": ["en ", "er ", "ch ", "der", "ie ", "ein", " de", "die", " di", "und", " un", "nd ",
+           "sch", "ich", "ung", "che", " ei", "den", "in ", "te ", "ten", "gen", "ine", " da",
+           "cht", "ist", " is", " zu", "auf", "ber", "nic", "ht ", "hen", " ve", "ver", "eit",
+           " ge", "ges", "ste", "n d", "lle", "ere", " mi", "mit", "ein", "ig ", "en.", "bei"],
+    "es": [" de", "de ", "os ", "la ", " la", "el ", " el", "es ", " qu", "que", "ue ", " en",
+           "en ", "ent", "as ", "aci", "ión", "ado", "con", " co", "los", " lo", "par", " pa",
+           "ara", "nte", "ien", "por", " po", " se", "al ", "ar ", "una", " un", "cio", "sta",
+           "est", " es", "ón ", "ida", "ada", "ero", " ha", "del", " de", "da ", "ndo", "tra"],
+    "vi": ["ng ", " nh", "nh ", "ch ", " kh", "ông", "ời", "ườ", "ngư", "khô", "hôn", "ủa",
+           "của", " củ", "ược", "ợc ", "và ", " và", "một", " mộ", "là ", " là", "các", " cá",
+           "ong", "tro", "ron", "ành", "nhữ", "ững", " đư", "được", " ng", "ên ", "ại ", "ới",
+           " tr", "ất ", "ến ", "iệ", "ệt", "ày ", " th", "ữn", "ột", "ân ", "anh", "ăn"],
+}
+_MARKS = {
+    "fr": set("éèêëàâçîïôûùœ"),
+    "de": set("äöüß"),
+    "es": set("ñ¿¡áíóú"),
+    "vi": set("ăâđêôơưạảấầẩẫậắằẳẵặẹẻẽếềểễệỉịọỏốồổỗộớờởỡợụủứừửữựỳỵỷỹ"),
+}
+_WORDS = {
+    "en": "the a an of to and is are in on you your not for with this that it be was error file".split(),
+    "fr": "le la les de des du un une est et en pas vous ne que qui pour sur avec dans au".split(),
+    "de": "der die das den dem und ist nicht ich sie ein eine mit zu keine kein auf für wird von".split(),
+    "es": "el la los las de del que no es un una y en por con para está se su al".split(),
+    "vi": "của và là không được có một những các tôi này cho với người đã".split(),
+}
+_WORD_W = 1.5
+_EN_WORDS = frozenset(_WORDS["en"])
+_WEIGHTS = {lang: {g: 1.0 - i / (2 * len(gs)) for i, g in enumerate(gs)} for lang, gs in _TRIGRAMS.items()}
+_MIN_SCORE = 1.0        # 拉丁行总分低于此值视为证据不足
+
+
+# 反查表：三元组 / 虚词 → 命中的语言，打分时每个三元组只查一次
+_GRAM_LANGS = {}
+for _lang, _table in _WEIGHTS.items():
+    for _g, _w in _table.items():
+        _GRAM_LANGS.setdefault(_g, []).append((_lang, _w))
+_WORD_LANGS = {}
+for _lang, _ws in _WORDS.items():
+    for _w in _ws:
+        _WORD_LANGS.setdefault(_w, []).append(_lang)
+
+
+def script_histogram(line: str) -> Counter:
+    """各文字体系的字符数"""
+    hist = Counter()
+    for m in _SCRIPT_RE.finditer(line):
+        hist[m.lastgroup] += m.end() - m.start()
+    return hist
+
+
+def _latin_scores(line: str) -> dict:
+    words = re.findall(r"\w+", line.lower())
+    text = " " + " ".join(words) + " "
+    scores = dict.fromkeys(_TRIGRAMS, 0.0)
+    for i in range(len(text) - 2):
+        for lang, w in _GRAM_LANGS.get(text[i:i + 3], ()):
+            scores[lang] += w
+    for w in words:
+        for lang in _WORD_LANGS.get(w, ()):
+            scores[lang] += _WORD_W
+    if not text.isascii():
+        for lang, marks in _MARKS.items():
+            scores[lang] += 2.0 * sum(1 for ch in text if ch in marks)
+    return scores
+
+
+def _needs_translation(line: str, hist: Counter) -> bool:
+    letters = sum(hist.values())
+    if not letters or _SKIP_RE.match(line):
+        return False
+    stripped = [ch for ch in line if not ch.isspace()]
+    symbols = sum(1 for ch in stripped if ch in _CODE_CHARS)
+    # 符号多、字母少：按代码处理（中文等非拉丁行不做这项判断）
+    return not (hist["latin"] == letters and symbols >= 2 and letters < 0.6 * len(stripped))
+
+
+def needs_translation(line: str) -> bool:
+    """含字母、且不是 URL / 邮箱 / 路径 / 代码的行"""
+    return _needs_translation(line, script_histogram(line))
+
+
+def _detect(line: str, hist: Counter, doc_has_kana: bool):
+    letters = sum(hist.values())
+    if not letters:
+        return None, 1.0
+    script, n = hist.most_common(1)[0]
+    if script == "han" and (hist["kana"] or doc_has_kana):
+        script = "kana"
+    if script != "latin":
+        return _SCRIPT_LANG[script], n / letters
+    scores = _latin_scores(line)
+    ranked = sorted(scores.values(), reverse=True)
+    best = max(scores, key=scores.get)
+    if ranked[0] < _MIN_SCORE:
+        # 短词（按钮、菜单项）证据不足：纯 ASCII 猜英文，但置信度不足以跳过翻译（Aceptar、Hola amigo）
+        return ("en", 0.3) if line.isascii() else (best, 0.3)
+    conf = (ranked[0] - ranked[1]) / ranked[0] * (n / letters)
+    if best == "en" and line.isascii() and _EN_WORDS.intersection(re.findall(r"\w+", line.lower())):
+        conf = max(conf, 0.6)   # 有英文虚词的 ASCII 行：法 / 德 / 西 / 越的句子几乎总带重音字母
+    return best, conf
+
+
+def detect(line: str, doc_has_kana: bool = False):
+    """返回 (语言代码, 置信度 0~1)；没有字母时返回 (None, 1.0)"""
+    return _detect(line, script_histogram(line), doc_has_kana)
+
+
+class Plan:
+    """
+    一次翻译请求的计划：
+      send    要发给翻译引擎的文本（只含需要翻译的行）
+      source  所有待译行一致且可信时为明确的源语言，否则 "auto"
+      merge() 把引擎返回的译文按行拼回原文位置，行数对不上时返回 None
+    词库（glossary.apply）与翻译记忆（tm.apply）会再填入 fixed（离线译好的行）
+    与 holes（发送前换成占位符的词条）。
+    """
+
+    def __init__(self, lines, keep, source):
+        self.lines  = lines
+        self.keep   = keep              # keep[i] 为 True 表示该行需要翻译
+        self.source = source
+        self.fixed  = {}                # 行号 → 离线译文
+        self.holes  = {}                # 行号 → (带占位符的行, {序号: 词库译文})
+        self.retry  = []                # merge 时占位符没能全部换回的行号，需要不带占位符重译
+        self._out   = None
+
+    @property
+    def skip_all(self) -> bool:
+        return not any(self.keep)
+
+    @property
+    def partial(self) -> bool:
+        """需要按行拆分 / 拼回（有不发送的行或占位符）"""
+        return not all(self.keep) or bool(self.holes)
+
+    @property
+    def send(self) -> str:
+        return "\n".join(self.holes[i][0] if i in self.holes else l
+                         for i, (l, k) in enumerate(zip(self.lines, self.keep)) if k)
+
+    def offline(self) -> str:
+        """全部行都不需要发送时的结果"""
+        return "\n".join(self.fixed.get(i, l) for i, l in enumerate(self.lines))
+
+    def pairs(self, result: str):
+        """按行拼回后的完整译文 → 本次发送的各行 [(原文, 译文)]；行数对不上时返回 []"""
+        out = [l.strip() for l in result.split("\n") if l.strip()]
+        if len(out) != len(self.lines):
+            return []
+        return [(l, t) for l, k, t in zip(self.lines, self.keep, out) if k]
+
+    def merge(self, translated: str):
+        out = [l.strip() for l in translated.split("\n") if l.strip()]
+        if len(out) != sum(self.keep):
+            return None
+        if self.holes:
+            from .glossary import Glossary
+        it = iter(out)
+        res, self.retry = [], []
+        for i, (l, k) in enumerate(zip(self.lines, self.keep)):
+            if not k:
+                res.append(self.fixed.get(i, l))
+                continue
+            t = next(it)
+            if i in self.holes:
+                restored = Glossary.restore(t, self.holes[i][1])
+                if restored is None:
+                    # 引擎弄丢 / 改坏了占位符：先换回还在的，再由调用方按原文重译这一行
+                    restored = Glossary.fill(t, self.holes[i][1])
+                    self.retry.append(i)
+                t = restored
+            res.append(t)
+        self._out = res
+        return "\n".join(res)
+
+    @property
+    def retry_text(self) -> str:
+        return "\n".join(self.lines[i] for i in self.retry)
+
+    def repair(self, translated: str):
+        """retry_text 的译文逐行替换进上次 merge 的结果；行数对不上返回 None"""
+        out = [l.strip() for l in translated.split("\n") if l.strip()]
+        if self._out is None or len(out) != len(self.retry):
+            return None
+        res = list(self._out)
+        for i, t in zip(self.retry, out):
+            res[i] = t
+        return "\n".join(res)
+
+
+def plan(text: str, target_lang: str, min_conf: float = 0.6) -> Plan:
+    """已是目标语言（置信度不低于 min_conf）或无需翻译的行不发送"""
+    lines = [l for l in text.split("\n") if l.strip()]
+    hists = [script_histogram(l) for l in lines]
+    doc_kana = any(h["kana"] for h in hists)
+    keep, sources = [], set()
+    for line, hist in zip(lines, hists):
+        if not _needs_translation(line, hist):
+            keep.append(False)
+            continue
+        lang, conf = _detect(line, hist, doc_kana)
+        if lang == target_lang and conf >= min_conf:
+            keep.append(False)
+            continue
+        keep.append(True)
+        sources.add(lang if conf >= min_conf else "auto")
+    source = sources.pop() if len(sources) == 1 else "auto"
+    return Plan(lines, keep, source)
@@ -0,0 +1,39 @@
+"""
+路径
+====================================
+资源目录（随程序分发的 WeChatOCR.exe 等）与可写目录（配置、临时图、日志）。
+导入本模块不创建任何目录；需要时调用 write_dir()。
+"""
+
+import os
+import sys
+
+
+def res_dir() -> str:
+    """资源目录：PyInstaller 单文件模式下为解压目录，否则为源码根目录"""
+    if getattr(sys, "frozen", False):
+        return sys._MEIPASS
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_dir(create: bool = True) -> str:
+    """可写目录：$WXOCR_HOME，否则 %APPDATA%/wechatocr"""
+    d = os.getenv("WXOCR_HOME")
+    if not d:
+        appdata = os.getenv("APPDATA") or os.path.expanduser("~\\AppData\\Roaming")
+        d = os.path.join(appdata, "wechatocr")
+    if create:
+        os.makedirs(d, exist_ok=True)
+    return d
+
+
+def config_path() -> str:
+    return os.path.join(write_dir(), "config.json")
+
+
+def wechatocr_exe() -> str:
+    return os.path.join(res_dir(), "path", "WeChatOCR", "WeChatOCR.exe")
+
+
+def wechat_lib_dir() -> str:
+    return os.path.join(res_dir(), "path")
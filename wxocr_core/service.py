@@ -0,0 +1,349 @@
+"""
+本机 OCR / 翻译服务
+====================================
+wcocr.init 只能由一个进程持有。托盘程序（或 python -m wxocr_core.service）启动本服务后，
+其他脚本通过 localhost HTTP 共用这一个已预热的引擎：
+
+  POST /ocr              请求体为图片原始字节；或 JSON {"path": "..."}；或 ?path=...
+  POST /translate        JSON {"text": "..."} 或 {"lines": [...]}，可选 "lang" / "engine"
+  POST /ocr+translate    同 /ocr，语言与引擎用查询参数或 JSON 字段 lang / engine
+  GET  /metrics          各端点次数、错误数、延迟分位数与批处理统计
+  GET  /health
+
+  - HTTP/1.1 长连接；只监听 127.0.0.1；
+  - 所有 OCR 由一个批处理线程串行调用引擎：短时间窗口内到达的多张小图
+    拼成一张只识别一次（见 batch.py），大图单独识别；
+  - ServiceClient 为带长连接的同步客户端。
+"""
+
+import io
+import os
+import json
+import time
+import queue
+import threading
+import urllib.parse
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import paths
+from .engine import default_engine, items_to_text
+from .translate import do_translate
+
+DEFAULT_PORT = 8765
+MAX_BODY     = 32 * 1024 * 1024
+BATCH_MAX_H  = 400          # 高度不超过此值且宽度不超过 BATCH_MAX_W 的图才参与拼接
+BATCH_MAX_W  = 1600
+
+
+# ─────────────────────────────────────────────
+#  微批处理
+# ─────────────────────────────────────────────
+class OcrBatcher:
+    """把并发的小图 OCR 请求合并成一次引擎调用"""
+
+    def __init__(self, engine=None, window_ms: float = 15, max_batch: int = 8, tmp_dir: str = None):
+        self.engine    = engine or default_engine()
+        self.window    = window_ms / 1000.0
+        self.max_batch = max_batch
+        tmp_dir        = tmp_dir or paths.write_dir()
+        self._tmp_one  = os.path.join(tmp_dir, "_temp_service.png")
+        self._tmp_many = os.path.join(tmp_dir, "_temp_service_batch.png")
+        self._q        = queue.Queue()
+        self.stats     = {"calls": 0, "images": 0, "batched": 0, "max_batch": 0}
+        self._thread   = threading.Thread(target=self._run, daemon=True, name="ocr-batcher")
+        self._thread.start()
+
+    def submit(self, path: str = None, data: bytes = None) -> Future:
+        fut = Future()
+        self._q.put((path, data, fut))
+        return fut
+
+    def ocr(self, path: str = None, data: bytes = None, timeout: float = 60):
+        return self.submit(path, data).result(timeout)
+
+    def _collect(self):
+        batch = [self._q.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            left = deadline - time.perf_counter()
+            if left <= 0:
+                break
+            try:
+                batch.append(self._q.get(timeout=left))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _open(path, data):
+        try:
+            from PIL import Image
+            return Image.open(path if path else io.BytesIO(data))
+        except Exception:
+            return None
+
+    def _single(self, path, data):
+        if path is None:
+            with open(self._tmp_one, "wb") as f:
+                f.write(data)
+            path = self._tmp_one
+        self.stats["calls"] += 1
+        return self.engine.ocr_raw(path)
+
+    def _run(self):
+        from .batch import pack_images, split_items
+        while True:
+            jobs = self._collect()
+            self.stats["images"] += len(jobs)
+            small, rest = [], []
+            for job in jobs:
+                img = self._open(job[0], job[1]) if len(jobs) > 1 else None
+                if img is not None and img.size[1] <= BATCH_MAX_H and img.size[0] <= BATCH_MAX_W:
+                    small.append((job, img))
+                else:
+                    rest.append(job)
+            if len(small) == 1:
+                rest.append(small.pop()[0])
+            if small:
+                try:
+                    canvas, slots = pack_images([img for _, img in small])
+                    canvas.save(self._tmp_many)
+                    self.stats["calls"] += 1
+                    self.stats["batched"] += len(small)
+                    self.stats["max_batch"] = max(self.stats["max_batch"], len(small))
+                    res = self.engine.ocr_raw(self._tmp_many)
+                    parts = [res] * len(small) if isinstance(res, str) else split_items(res, slots)
+                    for (job, _), part in zip(small, parts):
+                        job[2].set_result(part)
+                except Exception as e:
+                    for job, _ in small:
+                        if not job[2].done():
+                            job[2].set_exception(e)
+            for path, data, fut in rest:
+                try:
+                    fut.set_result(self._single(path, data))
+                except Exception as e:
+                    fut.set_exception(e)
+
+
+# ─────────────────────────────────────────────
+#  指标
+# ─────────────────────────────────────────────
+class Metrics:
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._lat  = {}         # endpoint -> deque[ms]
+        self._cnt  = {}         # endpoint -> [count, errors]
+        self._win  = window
+
+    def record(self, endpoint: str, ms: float, ok: bool):
+        with self._lock:
+            self._lat.setdefault(endpoint, deque(maxlen=self._win)).append(ms)
+            c = self._cnt.setdefault(endpoint, [0, 0])
+            c[0] += 1
+            c[1] += 0 if ok else 1
+
+    def snapshot(self) -> dict:
+        out = {}
+        with self._lock:
+            for ep, lat in self._lat.items():
+                vs = sorted(lat)
+                pick = lambda p: round(vs[min(len(vs) - 1, int(p / 100 * len(vs)))], 2)
+                out[ep] = {"count": self._cnt[ep][0], "errors": self._cnt[ep][1],
+                           "p50_ms": pick(50), "p90_ms": pick(90), "p99_ms": pick(99),
+                           "max_ms": round(vs[-1], 2)}
+        return out
+
+
+# ─────────────────────────────────────────────
+#  HTTP
+# ─────────────────────────────────────────────
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"       # 长连接
+    server_version   = "wxocr"
+
+    def log_message(self, fmt, *args):
+        log = self.server.log
+        if log:
+            log(fmt % args)
+
+    # ── 工具 ──
+    def _send(self, code: int, obj):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if code >= 400:
+            # 出错时请求体可能没读完（过大 / 格式不对），剩下的字节不能当成下一个请求解析
+            self.close_connection = True
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        if n > MAX_BODY:
+            raise ValueError("请求体过大")
+        return self.rfile.read(n) if n else b""
+
+    def _args(self):
+        """返回 (参数字典, 图片字节或 None)：JSON 请求体读入参数，其余视为图片"""
+        url = urllib.parse.urlsplit(self.path)
+        args = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+        body = self._body()
+        ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip()
+        if ctype == "application/json":
+            obj = json.loads(body.decode("utf-8") or "{}")
+            if not isinstance(obj, dict):
+                raise ValueError("JSON 请求体必须是对象")
+            args.update(obj)
+            return url.path, args, None
+        return url.path, args, body or None
+
+    def _ocr(self, args, data):
+        path = args.get("path")
+        if not path and not data:
+            raise ValueError("需要图片字节或 path")
+        if path and not os.path.isfile(path):
+            raise ValueError(f"文件不存在: {path}")
+        res = self.server.batcher.ocr(path=path, data=None if path else data)
+        if isinstance(res, str):
+            raise RuntimeError(res)
+        return res
+
+    # ── 路由 ──
+    def do_GET(self):
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/health":
+            return self._send(200, {"ok": True, "engine_ready": self.server.batcher.engine.ready})
+        if path == "/metrics":
+            return self._send(200, {"endpoints": self.server.metrics.snapshot(),
+                                    "batcher": dict(self.server.batcher.stats)})
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        t0 = time.perf_counter()
+        endpoint, ok = urllib.parse.urlsplit(self.path).path, False
+        try:
+            endpoint, args, data = self._args()
+            lang   = args.get("lang", "zh")
+            engine = args.get("engine", "腾讯翻译")
+            if endpoint == "/ocr":
+                items = self._ocr(args, data)
+                out = {"items": items, "text": items_to_text(items)}
+            elif endpoint == "/translate":
+                text = args.get("text")
+                if text is None:
+                    text = "\n".join(args.get("lines") or [])
+                out = {"translation": do_translate(text, lang, engine=engine)}
+            elif endpoint == "/ocr+translate":
+                items = self._ocr(args, data)
+                text = items_to_text(items)
+                out = {"items": items, "text": text,
+                       "translation": do_translate(text, lang, engine=engine) if text else ""}
+            else:
+                return self._send(404, {"error": "not found"})
+            out["ms"] = round((time.perf_counter() - t0) * 1000, 2)
+            self._send(200, out)
+            ok = True
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+        finally:
+            self.server.metrics.record(endpoint, (time.perf_counter() - t0) * 1000, ok)
+
+
+class OcrService:
+    """在后台线程运行的本机服务；engine 传入托盘程序已有的引擎即可共用"""
+
+    def __init__(self, port: int = DEFAULT_PORT, engine=None, window_ms: float = 15,
+                 max_batch: int = 8, log=None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.batcher = OcrBatcher(engine, window_ms, max_batch)
+        self.httpd.metrics = Metrics()
+        self.httpd.log     = log
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True,
+                                        name="ocr-service")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ─────────────────────────────────────────────
+#  客户端
+# ─────────────────────────────────────────────
+class ServiceClient:
+    """同步客户端，复用一条长连接（非线程安全：每个线程各建一个）"""
+
+    def __init__(self, port: int = DEFAULT_PORT, timeout: float = 60):
+        import http.client
+        self._conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+
+    def _post(self, path: str, body: bytes, ctype: str):
+        for attempt in (0, 1):
+            try:
+                self._conn.request("POST", path, body=body, headers={"Content-Type": ctype})
+                resp = self._conn.getresponse()
+                obj = json.loads(resp.read().decode("utf-8"))
+                break
+            except (ConnectionError, OSError):
+                self._conn.close()          # 服务端关闭了空闲连接：重连一次
+                if attempt:
+                    raise
+        if resp.status != 200:
+            raise RuntimeError(obj.get("error", resp.status))
+        return obj
+
+    def ocr(self, image: bytes = None, path: str = None):
+        if image is not None:
+            return self._post("/ocr", image, "application/octet-stream")
+        return self._post("/ocr", json.dumps({"path": os.path.abspath(path)}).encode(), "application/json")
+
+    def translate(self, text: str, lang: str = "zh", engine: str = "腾讯翻译"):
+        body = json.dumps({"text": text, "lang": lang, "engine": engine}, ensure_ascii=False)
+        return self._post("/translate", body.encode("utf-8"), "application/json")
+
+    def ocr_translate(self, image: bytes = None, path: str = None, lang: str = "zh",
+                      engine: str = "腾讯翻译"):
+        qs = "?" + urllib.parse.urlencode({"lang": lang, "engine": engine})
+        if image is not None:
+            return self._post("/ocr+translate" + qs, image, "application/octet-stream")
+        body = json.dumps({"path": os.path.abspath(path)}).encode()
+        return self._post("/ocr+translate" + qs, body, "application/json")
+
+    def close(self):
+        self._conn.close()
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="本机 OCR / 翻译服务")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--window-ms", type=float, default=15, help="微批处理等待窗口")
+    ap.add_argument("--max-batch", type=int, default=8)
+    args = ap.parse_args(argv)
+    svc = OcrService(args.port, window_ms=args.window_ms, max_batch=args.max_batch).start()
+    print(f"wxocr 服务已启动: http://127.0.0.1:{svc.port}  (Ctrl+C 退出)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        svc.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""
+翻译记忆（模糊匹配）
+====================================
+游戏、软件界面里大量文字只差数字或名字（"Level 12 reached" / "Level 13 reached"），
+精确缓存命不中。这里逐行记住网络引擎的译文，下次遇到相近的行直接复用：
+
+  - 数字（12、3.5、50%、1/3）与格式占位符（{name}、%s、%d）先换成槽位，
+    原文模板相同即命中，按新的数字填回译文（"第 13 级"）；
+  - 模板不同时用 MinHash + LSH 分桶取候选（字符三元组单置换 MinHash，7 段 × 3 行），
+    三元组 Jaccard 最高的几个候选再逐字比较，相似度（difflib ratio）达到阈值（config tm.threshold，
+    默认 0.8）且逐词对比只有以下差异时才复用：
+      · 标点；
+      · 拉丁词里等长的形近字符替换（l/1/I、O/0、S/5 ...），加减前后缀（Lock / Unlock）不算；
+      · 首字母大写或带数字、且原样出现在译文里的拉丁词（人名、型号），在译文里替换成新词；
+    汉字 / 假名等一整串算一个词，有任何差异都不复用（只认模板精确命中）；
+  - 只记录首选引擎成功返回的行（降级结果不记），存于 <可写目录>/tm.tsv，
+    载入最新的 config tm.max_segments 条（默认 100000），文件超过两倍时载入时压缩。
+
+查询只做一次字典查找与最多几十个候选的比较，十万条记忆下单行查询在 1 毫秒以内。
+关闭：config "tm": {"enabled": false}。
+"""
+
+import os
+import re
+import zlib
+import threading
+from difflib import SequenceMatcher
+
+from . import paths
+from .config import load_config
+
+_SLOT_RE  = re.compile(r"(?<![A-Za-z])\d+(?:[.,:/]\d+)*%?(?![A-Za-z])|\{[^{}\s]*\}|%[sd]")
+_SPACE_RE = re.compile(r"\s+")
+_WORD_RE  = re.compile(r"\w+|[^\w\s]")
+_LETTER_RE = re.compile(r"[^\W\d_]")
+_LATIN_RE = re.compile(r"[A-Za-z0-9]+")
+# OCR 常见的形近字符；同组内互换视为错字
+_CONFUSABLE = {ch: g for g in ("l1Ii", "O0oQD", "S5s", "B8", "Z2z", "G6") for ch in g}
+_SLOT     = "\x01"
+
+_BANDS, _ROWS = 7, 3
+_K = _BANDS * _ROWS
+_BUCKET_SCAN = 256         # 每个桶只看最新的这么多条
+_MAX_CANDIDATES = 16       # 按命中桶数取前若干个候选计算三元组 Jaccard
+_MIN_JACCARD = 0.4         # 低于此值的候选不再逐字比较
+
+
+def template(line: str):
+    """(原样模板, 数字 / 占位符列表)；模板中的槽位为 \\x01"""
+    text = _SPACE_RE.sub(" ", line.strip())
+    return _SLOT_RE.sub(_SLOT, text), _SLOT_RE.findall(text)
+
+
+def _shingles(key: str):
+    s = f" {key} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _signature(shingles):
+    """
+    单置换 MinHash：哈希值按余数分到 _K 个桶，各桶取最小；空桶借用后面第一个非空桶（加偏移区分）。
+    用 crc32 而不是 hash()：str 的 hash 每次启动随机，同一句在不同会话里命中与否会不一样。
+    """
+    sig = [None] * _K
+    for s in shingles:
+        j, v = divmod(zlib.crc32(s.encode("utf-8")), _K)
+        j, v = v, j
+        cur = sig[j]
+        if cur is None or v < cur:
+            sig[j] = v
+    for j in range(_K):
+        if sig[j] is None:
+            for d in range(1, _K):
+                v = sig[(j + d) % _K]
+                if v is not None:
+                    sig[j] = v + (d << 32)
+                    break
+    return sig
+
+
+def _bands(sig):
+    return [hash((i,) + tuple(sig[i * _ROWS:(i + 1) * _ROWS])) for i in range(_BANDS)]
+
+
+def _jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _ocr_variant(old: str, new: str) -> bool:
+    """等长且每处不同都是形近字符（Leve1 / Level），增删字母不算"""
+    if len(old) != len(new):
+        return False
+    for x, y in zip(old, new):
+        if x != y and (x.lower() != y.lower()) and _CONFUSABLE.get(x, x) != _CONFUSABLE.get(y, y):
+            return False
+    return True
+
+
+def _name_like(word: str) -> bool:
+    return word[0].isupper() or any(ch.isdigit() for ch in word)
+
+
+def _whole_word(word: str):
+    return re.compile(r"(?<![A-Za-z0-9])" + re.escape(word) + r"(?![A-Za-z0-9])")
+
+
+class _Entry:
+    __slots__ = ("src", "key", "parts", "slots")
+
+    def __init__(self, src, key, parts, slots):
+        self.src   = src        # 原样模板
+        self.key   = key        # 小写模板（精确查找键）
+        self.parts = parts      # 译文模板：字符串与槽位序号交替
+        self.slots = slots      # 槽位数
+
+
+class Memory:
+    """单一目标语言的翻译记忆"""
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._entries  = []
+        self._by_key   = {}
+        self._buckets  = {}     # 分桶哈希 → 条目序号或序号列表
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def add(self, src_line: str, tgt_line: str) -> bool:
+        """记住一行译文；数字在译文中对不上时不记（无法安全地换数字）"""
+        src, nums = template(src_line)
+        tgt = _SPACE_RE.sub(" ", tgt_line.strip())
+        if not src.strip(_SLOT + " ") or not tgt or _SLOT in tgt:
+            return False
+        parts = [tgt]
+        if nums:
+            if len(set(nums)) != len(nums):
+                return False
+            pos = {n: i for i, n in enumerate(nums)}
+            parts, last = [], 0
+            for m in _SLOT_RE.finditer(tgt):
+                i = pos.get(m.group())
+                if i is not None:
+                    parts += [tgt[last:m.start()], i]
+                    last = m.end()
+            parts.append(tgt[last:])
+            if set(parts[1::2]) != set(range(len(nums))):
+                return False
+        key = src.lower()
+        entry = _Entry(src, key, parts, len(nums))
+        idx = self._by_key.get(key)
+        if idx is not None:
+            self._entries[idx] = entry  # 同一模板以最新译文为准
+            return True
+        idx = len(self._entries)
+        self._entries.append(entry)
+        self._by_key[key] = idx
+        for b in _bands(_signature(_shingles(key))):
+            cur = self._buckets.get(b)
+            if cur is None:
+                self._buckets[b] = idx
+            elif isinstance(cur, list):
+                cur.append(idx)
+            else:
+                self._buckets[b] = [cur, idx]
+        return True
+
+    @staticmethod
+    def _fill(entry, nums, swaps=()):
+        out = "".join(p if isinstance(p, str) else nums[p] for p in entry.parts)
+        for old, new in swaps:
+            out = _whole_word(old).sub(new.replace("\\", "\\\\"), out)
+        return out
+
+    def _candidates(self, sh):
+        hits = {}
+        for b in _bands(_signature(sh)):
+            cur = self._buckets.get(b)
+            if cur is None:
+                continue
+            for idx in (cur[-_BUCKET_SCAN:] if isinstance(cur, list) else (cur,)):
+                hits[idx] = hits.get(idx, 0) + 1
+        if len(hits) <= _MAX_CANDIDATES:
+            return hits
+        return sorted(hits, key=hits.get, reverse=True)[:_MAX_CANDIDATES]
+
+    def _swaps(self, src: str, entry):
+        """逐词对比查询与候选原文：返回需要在译文中替换的 [(旧词, 新词)]，有不可替换的差异时返回 None"""
+        a, b = _WORD_RE.findall(entry.src), _WORD_RE.findall(src)
+        tgt = "".join(p for p in entry.parts if isinstance(p, str))
+        swaps = []
+        for op, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+            if op == "equal":
+                continue
+            if op in ("insert", "delete"):
+                if any(_LETTER_RE.search(w) for w in a[i1:i2] + b[j1:j2]):
+                    return None
+                continue                        # 只多 / 少了标点
+            if i2 - i1 != j2 - j1:
+                return None
+            for old, new in zip(a[i1:i2], b[j1:j2]):
+                if old.lower() == new.lower():
+                    continue
+                if not (_LATIN_RE.fullmatch(old) and _LATIN_RE.fullmatch(new)):
+                    return None                 # 汉字等整串为一个词，差一个字也可能意思相反
+                if _ocr_variant(old, new):
+                    continue
+                if _name_like(old) and _name_like(new) and _whole_word(old).search(tgt):
+                    swaps.append((old, new))    # 原样出现在译文里的词（人名、型号）
+                    continue
+                return None
+        return swaps
+
+    def lookup(self, line: str):
+        """返回 (译文, 相似度)；没有足够相近的记忆时返回 None"""
+        src, nums = template(line)
+        key = src.lower()
+        idx = self._by_key.get(key)
+        if idx is not None:
+            return self._fill(self._entries[idx], nums), 1.0
+        if len(key) < 4:
+            return None
+        sh = _shingles(key)
+        scored = []
+        for idx in self._candidates(sh):
+            e = self._entries[idx]
+            if e.slots == len(nums):
+                j = _jaccard(sh, _shingles(e.key))
+                if j >= _MIN_JACCARD:
+                    scored.append((j, idx))
+        for _, idx in sorted(scored, reverse=True)[:3]:
+            e = self._entries[idx]
+            sim = SequenceMatcher(None, key, e.key, autojunk=False).ratio()
+            if sim < self.threshold:
+                continue
+            swaps = self._swaps(src, e)
+            if swaps is not None:
+                return self._fill(e, nums, swaps), sim
+        return None
+
+
+# ─────────────────────────────────────────────
+#  持久化
+# ─────────────────────────────────────────────
+def tm_path() -> str:
+    return os.path.join(paths.write_dir(create=False), "tm.tsv")
+
+
+_mems = {}
+_state = {"loaded": False}
+_lock = threading.Lock()
+
+
+def _settings():
+    cfg = load_config().get("tm", {})
+    return cfg.get("enabled", True), cfg.get("threshold", 0.8), cfg.get("max_segments", 100000)
+
+
+def _load(threshold: float, limit: int):
+    path = tm_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [l.rstrip("\n").split("\t") for l in f]
+    except OSError:
+        rows = []
+    rows = [r for r in rows if len(r) == 3]
+    if len(rows) > 2 * limit:
+        rows = rows[-limit:]
+        try:
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines("\t".join(r) + "\n" for r in rows)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    for lang, src, tgt in rows[-limit:]:
+        _mems.setdefault(lang, Memory(threshold)).add(src, tgt)
+
+
+def get(target_lang: str):
+    """目标语言的 Memory；未启用时返回 None"""
+    enabled, threshold, limit = _settings()
+    if not enabled:
+        return None
+    if not _state["loaded"]:
+        with _lock:
+            if not _state["loaded"]:
+                _load(threshold, limit)
+                _state["loaded"] = True
+    mem = _mems.get(target_lang)
+    if mem is None:
+        with _lock:
+            mem = _mems.setdefault(target_lang, Memory(threshold))
+    mem.threshold = threshold
+    return mem
+
+
+def apply(plan, target_lang: str) -> int:
+    """把记忆中足够相近的待译行改为离线译文（plan.fixed），返回命中行数"""
+    mem = get(target_lang)
+    if mem is None or not len(mem):
+        return 0
+    n = 0
+    for i, line in enumerate(plan.lines):
+        if not plan.keep[i]:
+            continue
+        hit = mem.lookup(line)
+        if hit is not None:
+            plan.keep[i] = False
+            plan.fixed[i] = hit[0]
+            plan.holes.pop(i, None)
+            n += 1
+    return n
+
+
+def remember(plan, result: str, target_lang: str) -> int:
+    """记住首选引擎本次译出的各行（按行拼回后的结果），返回新记的行数"""
+    mem = get(target_lang)
+    if mem is None:
+        return 0
+    pairs = plan.pairs(result)
+    if not pairs:
+        return 0
+    rows = []
+    with _lock:
+        for src, tgt in pairs:
+            if mem.add(src, tgt):
+                rows.append(f"{target_lang}\t{src.replace(chr(9), ' ')}\t{tgt.replace(chr(9), ' ')}\n")
+        if rows:
+            try:
+                paths.write_dir()
+                with open(tm_path(), "a", encoding="utf-8") as f:
+                    f.writelines(rows)
+            except OSError:
+                pass
+    return len(rows)
@@ -0,0 +1,393 @@
+"""
+翻译
+====================================
+纯标准库实现的各翻译引擎（零第三方依赖，国内直连）与按优先级降级的 do_translate；
+异步版本见 aio.py，与这里共用请求构造、响应解析和缓存。
+成功结果按 (引擎, 目标语言, 原文) 做进程内 LRU 缓存，重复截同一段文字不再请求网络；
+只差数字、名字的相近行由翻译记忆（tm.py）复用。
+urllib（连带 ssl / http.client）在第一次真正发请求时才导入，导入本模块很快。
+"""
+
+import json as _json
+import hmac, hashlib, time as _time
+import threading
+from collections import OrderedDict
+
+from .config import load_config
+
+
+class LRUCache:
+    """线程安全的小型 LRU"""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._d      = OrderedDict()
+        self._lock   = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            v = self._d.get(key)
+            if v is None:
+                self.misses += 1
+                return None
+            self._d.move_to_end(key)
+            self.hits += 1
+            return v
+
+    def put(self, key, value):
+        with self._lock:
+            self._d[key] = value
+            self._d.move_to_end(key)
+            while len(self._d) > self.maxsize:
+                self._d.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._d.clear()
+
+    def __len__(self):
+        return len(self._d)
+
+
+_cache = LRUCache(512)
+
+
+def cache_clear():
+    _cache.clear()
+
+
+LOCAL_ENGINE = "本地词库"       # 只查词库，未收录的行交给网络引擎（见 glossary.py）
+ENGINES = ["腾讯翻译", "百度翻译", "有道翻译", "MyMemory", LOCAL_ENGINE]
+
+# 语言代码映射
+_TENCENT_LANG = {
+    "zh": "zh", "en": "en", "ja": "ja", "ko": "ko",
+    "fr": "fr", "de": "de", "es": "es", "ru": "ru",
+    "th": "th", "vi": "vi",
+}
+_BAIDU_LANG   = {"zh":"zh","en":"en","ja":"jp","ko":"kor","fr":"fra","de":"de","es":"spa","ru":"ru","th":"th","vi":"vie"}
+_YOUDAO_LANG  = {"zh":"zh-CHS","en":"en","ja":"ja","ko":"ko","fr":"fr","de":"de","es":"es","ru":"ru","th":"th","vi":"vi"}
+_MYMEMORY_LANG = {"zh": "zh-CN"}
+
+
+# 每个引擎拆成“构造请求”与“解析响应”两步，同步（urllib）与异步（aio.py，asyncio 流）两条路径共用。
+# 构造函数返回 (url, 请求体 bytes 或 None, 请求头)；返回 None 表示该引擎不可用（如未配置密钥）。
+# from_lang 为 "auto" 或本地检测出的源语言（见 langdetect.py）。
+
+def _req_tencent(text: str, to_lang: str, from_lang: str = "auto"):
+    """腾讯云机器翻译 API，TC3-HMAC-SHA256 签名"""
+    cfg        = load_config().get("tencent", {})
+    secret_id  = cfg.get("secret_id",  "")
+    secret_key = cfg.get("secret_key", "")
+    region     = cfg.get("region", "ap-beijing")
+    if not secret_id or not secret_key or "填入" in secret_id:
+        return None   # 密鑰未配置
+
+    to      = _TENCENT_LANG.get(to_lang, to_lang)
+    src     = _TENCENT_LANG.get(from_lang, "auto")
+    payload = _json.dumps({"SourceText": text[:2000], "Source": src,
+                           "Target": to, "ProjectId": 0}, ensure_ascii=False)
+    host    = "tmt.tencentcloudapi.com"
+    service = "tmt"
+    ts      = int(_time.time())
+    date    = _time.strftime("%Y-%m-%d", _time.gmtime(ts))
+
+    hp  = hashlib.sha256(payload.encode()).hexdigest()
+    ch  = f"content-type:application/json; charset=utf-8\nhost:{host}\n"
+    sh  = "content-type;host"
+    cr  = "\n".join(["POST", "/", "", ch, sh, hp])
+    cs  = f"{date}/{service}/tc3_request"
+    hcr = hashlib.sha256(cr.encode()).hexdigest()
+    s2s = "\n".join(["TC3-HMAC-SHA256", str(ts), cs, hcr])
+
+    def _h(key: bytes, msg: str) -> bytes:
+        return hmac.new(key, msg.encode(), hashlib.sha256).digest()
+
+    sk  = _h(_h(_h(("TC3"+secret_key).encode(), date), service), "tc3_request")
+    sig = hmac.new(sk, s2s.encode(), hashlib.sha256).hexdigest()
+    auth = (f"TC3-HMAC-SHA256 Credential={secret_id}/{cs}, "
+            f"SignedHeaders={sh}, Signature={sig}")
+    return (f"https://{host}", payload.encode(),
+            {"Authorization": auth,
+             "Content-Type": "application/json; charset=utf-8",
+             "Host": host, "X-TC-Action": "TextTranslate",
+             "X-TC-Timestamp": str(ts), "X-TC-Version": "2018-03-21",
+             "X-TC-Region": region})
+
+
+def _parse_tencent(obj) -> str:
+    return obj.get("Response", {}).get("TargetText", "")
+
+
+def _req_baidu(text: str, to_lang: str, from_lang: str = "auto"):
+    """百度翻译网页接口，国内直连，无需 API Key"""
+    import urllib.parse
+    to = _BAIDU_LANG.get(to_lang, to_lang)
+    data = urllib.parse.urlencode({
+        "query": text[:2000],
+        "from":  _BAIDU_LANG.get(from_lang, "auto"),
+        "to":    to,
+        "source": "txt",
+    }).encode("utf-8")
+    return ("https://fanyi.baidu.com/transapi", data,
+            {"Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+             "User-Agent":   "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+             "Referer":      "https://fanyi.baidu.com/",
+             "Origin":       "https://fanyi.baidu.com"})
+
+
+def _parse_baidu(obj) -> str:
+    parts = obj.get("data", [])
+    return "".join(p.get("dst", "") for p in parts) if parts else ""
+
+
+def _req_youdao(text: str, to_lang: str, from_lang: str = "auto"):
+    """有道翻译网页接口，国内直连，无需 API Key"""
+    import urllib.parse
+    to = _YOUDAO_LANG.get(to_lang, to_lang)
+    data = urllib.parse.urlencode({
+        "q":    text[:500],
+        "from": _YOUDAO_LANG.get(from_lang, "auto"),
+        "to":   to,
+    }).encode("utf-8")
+    return ("https://aidemo.youdao.com/trans", data,
+            {"Content-Type": "application/x-www-form-urlencoded",
+             "User-Agent":   "Mozilla/5.0",
+             "Referer":      "https://ai.youdao.com/"})
+
+
+def _parse_youdao(obj) -> str:
+    # 响应：{"translation": ["译文"]}
+    t = obj.get("translation", [])
+    if t and isinstance(t, list):
+        return t[0] if isinstance(t[0], str) else ""
+    return ""
+
+
+def _req_mymemory(text: str, to_lang: str, from_lang: str = "auto"):
+    """MyMemory 公开 API，境外备用"""
+    import urllib.parse
+    src = _MYMEMORY_LANG.get(from_lang, from_lang)
+    params = urllib.parse.urlencode({"q": text[:500], "langpair": f"{src}|{to_lang}"})
+    return (f"https://api.mymemory.translated.net/get?{params}", None,
+            {"User-Agent": "Mozilla/5.0"})
+
+
+def _parse_mymemory(obj) -> str:
+    return obj.get("responseData", {}).get("translatedText", "")
+
+
+# 引擎名 → (构造请求, 解析响应)
+_API = {
+    "腾讯翻译": (_req_tencent,   _parse_tencent),
+    "百度翻译": (_req_baidu,     _parse_baidu),
+    "有道翻译": (_req_youdao,    _parse_youdao),
+    "MyMemory": (_req_mymemory,  _parse_mymemory),
+}
+
+TIMEOUT = 10
+EMPTY_MSG = "（无内容可翻译）"
+FAIL_MSG = ("（已收到识别结果直接展示）\n\n[翻译失败：所有免费接口（百度/有道/MyMemory）均不可达或被频率限制，"
+            "请稍微检查网络后再试]")
+
+
+def _translate_sync(engine: str, text: str, to_lang: str, from_lang: str = "auto") -> str:
+    import urllib.request
+    build, parse = _API[engine]
+    try:
+        req = build(text, to_lang, from_lang)
+        if req is None:
+            return ""
+        url, data, headers = req
+        with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers),
+                                    timeout=TIMEOUT) as resp:
+            return parse(_json.loads(resp.read().decode("utf-8")))
+    except Exception:
+        return ""
+
+
+def _translate_tencent(text: str, to_lang: str, from_lang: str = "auto") -> str:
+    return _translate_sync("腾讯翻译", text, to_lang, from_lang)
+
+
+def _translate_baidu(text: str, to_lang: str, from_lang: str = "auto") -> str:
+    return _translate_sync("百度翻译", text, to_lang, from_lang)
+
+
+def _translate_youdao(text: str, to_lang: str, from_lang: str = "auto") -> str:
+    return _translate_sync("有道翻译", text, to_lang, from_lang)
+
+
+def _translate_mymemory(text: str, to_lang: str, from_lang: str = "auto") -> str:
+    return _translate_sync("MyMemory", text, to_lang, from_lang)
+
+
+def plan_request(text: str, target_lang: str, detect=None, trace=None):
+    """
+    发送前的本地处理，返回 langdetect.Plan；语种检测、词库与翻译记忆都不启用时返回 None。
+      - 语种检测（config translate.detect，默认开启）：已是目标语言、没有字母或是 URL / 代码的行不发送，
+        待译行语种一致时明确告诉引擎源语言；
+      - 词库（glossary.py）：整行能离线翻译的行不发送，其余行的词条换成占位符；
+      - 翻译记忆（tm.py）：与以前译过的行足够相近（只差数字、名字或 OCR 错字）的行直接复用旧译文。
+    """
+    from . import glossary, langdetect, tm
+    if detect is None:
+        detect = load_config().get("translate", {}).get("detect", True)
+    has_glossary = glossary.get(target_lang) is not None
+    has_tm = tm.get(target_lang) is not None
+    if not detect and not has_glossary and not has_tm:
+        return None
+    if detect:
+        plan = langdetect.plan(text, target_lang)
+    else:
+        lines = [l for l in text.split("\n") if l.strip()]
+        plan = langdetect.Plan(lines, [True] * len(lines), "auto")
+    offline = glossary.apply(plan, target_lang) if has_glossary else 0
+    reused  = tm.apply(plan, target_lang) if has_tm else 0
+    if trace is not None:
+        trace.mark("detect", send=sum(plan.keep), skip=len(plan.keep) - sum(plan.keep),
+                   glossary=offline, tm=reused, source=plan.source)
+    return plan
+
+
+def _cache_key(engine: str, target_lang: str, text: str):
+    from . import glossary
+    return (engine, target_lang, text, glossary.version())     # 词库改动后旧结果作废
+
+
+def engine_order(engine: str):
+    """(依次尝试的网络引擎, 成功时不加降级提示的引擎)；本地词库之后直接交给默认顺序的网络引擎"""
+    network = [e for e in ENGINES if e in _API]
+    if engine not in _API:
+        return network, network[0]
+    return [engine] + [e for e in network if e != engine], engine
+
+
+def remember(plan, result: str, target_lang: str):
+    """首选引擎的译文（已按行拼回）逐行记入翻译记忆"""
+    if plan is not None and not plan.skip_all:
+        from . import tm
+        tm.remember(plan, result, target_lang)
+
+
+def merge_result(plan, result: str) -> str:
+    """把只含待译行的译文按行拼回（保留降级提示行）；行数对不上时返回 None（调用方整段重发）"""
+    if plan is None or not plan.partial:
+        return result
+    tag = ""
+    if result.startswith("[降级至 ") and "\n" in result:
+        tag, result = result.split("\n", 1)
+        tag += "\n"
+    merged = plan.merge(result)
+    return tag + merged if merged is not None else None
+
+
+def do_translate(text: str, target_lang: str, engine: str = "腾讯翻译", trace=None,
+                 cache: bool = True, detect=None) -> str:
+    if not text.strip() or text.startswith("[OCR 错误]"):
+        return EMPTY_MSG
+    key = _cache_key(engine, target_lang, text)
+    if cache:
+        hit = _cache.get(key)
+        if hit is not None:
+            if trace is not None:
+                trace.mark("translate:cache")
+            return hit
+
+    plan = plan_request(text, target_lang, detect, trace)
+    if plan is not None and plan.skip_all:
+        result = plan.offline()             # 全部已是目标语言、无需翻译或词库已译：不请求网络
+        if cache:
+            _cache.put(key, result)
+        return result
+    send   = plan.send if plan is not None and plan.partial else text
+    source = plan.source if plan is not None else "auto"
+
+    funcs = {
+        "腾讯翻译": _translate_tencent,
+        "百度翻译": _translate_baidu,
+        "有道翻译": _translate_youdao,
+        "MyMemory": _translate_mymemory,
+    }
+    order, primary = engine_order(engine)
+    for eng in order:
+        fn = funcs.get(eng)
+        if fn:
+            result = fn(send, target_lang, source)
+            if trace is not None:
+                trace.mark(f"translate:{eng}", ok=bool(result and result.strip()))
+            if result and result.strip():
+                tag = f"[降级至 {eng}]\n" if eng != primary else ""
+                merged = merge_result(plan, tag + result)
+                if merged is None:
+                    # 引擎合并 / 拆分了行，拼不回去：整段原文重发一次，结果不缓存、不记忆
+                    full = fn(text, target_lang, "auto")
+                    if trace is not None:
+                        trace.mark(f"translate:{eng}", ok=bool(full and full.strip()), resend=True)
+                    if full and full.strip():
+                        return tag + full
+                    continue
+                result = merged
+                if plan is not None and plan.retry:
+                    # 占位符没换回的行按原文再译一次（一次请求），仍失败则保留只换回部分占位符的结果
+                    again = fn(plan.retry_text, target_lang, source)
+                    fixed = plan.repair(again) if again and again.strip() else None
+                    if fixed is not None:
+                        result = tag + fixed
+                if not tag:                     # 降级结果不缓存、不记忆：首选引擎恢复后应重新请求
+                    remember(plan, result, target_lang)
+                    if cache:
+                        _cache.put(key, result)
+                return result
+
+    return FAIL_MSG
+
+
+# ─────────────────────────────────────────────
+#  分块流式翻译
+# ─────────────────────────────────────────────
+def _strip_tag(result: str) -> str:
+    """去掉降级提示行，只留译文"""
+    return result.split("\n", 1)[1] if result.startswith("[降级至 ") and "\n" in result else result
+
+
+def _translate_chunk(chunk, target_lang, engine, trace, cache):
+    """
+    一块行整体翻译后按行拆回；全部失败返回 None。
+    行数对不上时不再逐行重发请求：整段译文放在首行、其余行为空串，由界面合并成一块显示。
+    """
+    res = do_translate("\n".join(chunk), target_lang, engine=engine, trace=trace, cache=cache)
+    if res == FAIL_MSG:
+        return None
+    body = _strip_tag(res)
+    out = [l.strip() for l in body.split("\n") if l.strip()]
+    if len(out) == len(chunk):
+        return out
+    return ["\n".join(out) or body.strip()] + [""] * (len(chunk) - 1)
+
+
+def iter_translate(lines, target_lang: str, engine: str = "腾讯翻译", chunk_lines: int = 12,
+                   workers: int = 3, trace=None, cache: bool = True):
+    """
+    逐块产出译文：(起始行号, 与该块逐行对应的译文列表)，某块所有引擎都失败时列表为 None；
+    译文行数与原文对不上的块，整段译文在首行，其余行为空串（见 _translate_chunk）。
+    不超过 chunk_lines 行时只发一次请求（与 do_translate 整段翻译相同，缓存也通用）；
+    更多行时分块并发请求，按完成先后产出，界面可以先画出先到的部分。
+    提前结束迭代会丢弃尚未开始的块。
+    """
+    lines = list(lines)
+    chunks = [(i, lines[i:i + chunk_lines]) for i in range(0, len(lines), max(1, chunk_lines))]
+    if len(chunks) <= 1:
+        for start, chunk in chunks:
+            yield start, _translate_chunk(chunk, target_lang, engine, trace, cache)
+        return
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wxocr-tr")
+    try:
+        futs = {pool.submit(_translate_chunk, chunk, target_lang, engine, trace, cache): start
+                for start, chunk in chunks}
+        for fut in as_completed(futs):
+            yield futs[fut], fut.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)